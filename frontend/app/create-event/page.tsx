@@ -6,6 +6,25 @@ import { Button } from '@/components/ui/button';
 import algosdk from 'algosdk';
 import { executeATC, dummySigner } from '@/utils/signer';
 import { useTxStatus } from '@/components/TxStatus';
+import { fetchTicketManagerSchema } from '@/utils/events';
+
+// EventFactory boxes (see smart-contracts/tools/factory.py)
+const APPROVAL_BOX = new TextEncoder().encode('approval');
+const CLEAR_BOX = new TextEncoder().encode('clear');
+const UPLOAD_BOX = new TextEncoder().encode('upload');
+const UPLOAD_SIZE = 16;
+// Leaves room for selector + bool + uint64 + length prefix under the 2048-byte arg limit
+const PROGRAM_CHUNK_SIZE = 2000;
+// Forwarded to the new event app for its ticket assets and boxes
+const EVENT_FUNDING = 1_000_000;
+
+const boxMbr = (name: Uint8Array, size: number) => 2500 + 400 * (name.length + size);
+
+// Box I/O quota is 1KB per reference: pad with empty references to cover totalBytes
+const boxRefs = (names: Uint8Array[], totalBytes: number) => {
+    const needed = Math.max(names.length, Math.ceil(totalBytes / 1024));
+    return [...names, ...Array(needed - names.length).fill(new Uint8Array())].map(name => ({ appIndex: 0, name }));
+};
 
 // Step indicator
 function StepIndicator({ steps, currentStep }: { steps: string[], currentStep: number }) {
@@ -58,7 +77,7 @@ export default function CreateEventPage() {
     const [createdAppId, setCreatedAppId] = useState<number | null>(null);
     const [copiedId, setCopiedId] = useState<'factory' | 'event' | null>(null);
 
-    const steps = ['Deploy', 'Initialize', 'Register'];
+    const steps = ['Sign', 'Create & Register'];
 
     const copyToClipboard = (text: string | number, type: 'factory' | 'event') => {
         navigator.clipboard.writeText(String(text));
@@ -102,19 +121,71 @@ export default function CreateEventPage() {
         }
     };
 
+    const compileProgram = async (algodClient: algosdk.Algodv2, path: string) => {
+        const source = await fetch(path).then(r => r.text());
+        const compiled = await algodClient.compile(source).do();
+        return new Uint8Array(atob(compiled.result).split('').map(x => x.charCodeAt(0)));
+    };
+
+    const onTxStatus = (s: { state: 'pending' | 'success' | 'failed'; message?: string; txId?: string; explorerUrl?: string }) => {
+        if (s.state === 'pending') setTxStatus({ state: 'pending', message: s.message, txId: s.txId, explorerUrl: s.explorerUrl });
+        if (s.state === 'success') setTxStatus({ state: 'success', message: s.message, txId: s.txId, explorerUrl: s.explorerUrl });
+        if (s.state === 'failed') setTxStatus({ state: 'failed', message: s.message });
+    };
+
+    // Store the TicketManager program in the factory's boxes (same steps as `python -m tools.factory upload-program`)
+    const uploadTicketManager = async (algodClient: algosdk.Algodv2, factoryId: number) => {
+        if (!activeAccount) return;
+        const approval = await compileProgram(algodClient, '/utils/contracts/ticket_manager_approval.teal');
+        const clear = await compileProgram(algodClient, '/utils/contracts/ticket_manager_clear.teal');
+        const factoryContract = new algosdk.ABIContract(await fetch('/utils/contracts/event_factory_contract.json').then(r => r.json()));
+        const params = await algodClient.getTransactionParams().do();
+        const atc = new algosdk.AtomicTransactionComposer();
+        atc.addTransaction({
+            txn: algosdk.makePaymentTxnWithSuggestedParamsFromObject({
+                from: activeAccount.address,
+                to: algosdk.getApplicationAddress(factoryId),
+                amount: boxMbr(APPROVAL_BOX, approval.length) + boxMbr(CLEAR_BOX, clear.length) + boxMbr(UPLOAD_BOX, UPLOAD_SIZE),
+                suggestedParams: params,
+            }),
+            signer: dummySigner,
+        });
+        atc.addMethodCall({
+            appID: factoryId,
+            method: factoryContract.getMethodByName('init_program'),
+            methodArgs: [approval.length, clear.length],
+            boxes: boxRefs([APPROVAL_BOX, CLEAR_BOX, UPLOAD_BOX], approval.length + clear.length + UPLOAD_SIZE),
+            sender: activeAccount.address,
+            signer: dummySigner,
+            suggestedParams: params,
+        });
+        // Chunks must land in order: the factory only accepts the next offset
+        for (const [isClear, name, program] of [[false, APPROVAL_BOX, approval], [true, CLEAR_BOX, clear]] as [boolean, Uint8Array, Uint8Array][]) {
+            for (let offset = 0; offset < program.length; offset += PROGRAM_CHUNK_SIZE) {
+                atc.addMethodCall({
+                    appID: factoryId,
+                    method: factoryContract.getMethodByName('write_program'),
+                    methodArgs: [isClear, offset, program.slice(offset, offset + PROGRAM_CHUNK_SIZE)],
+                    boxes: boxRefs([name, UPLOAD_BOX], program.length + UPLOAD_SIZE),
+                    sender: activeAccount.address,
+                    signer: dummySigner,
+                    suggestedParams: params,
+                    note: algosdk.encodeUint64(offset),
+                });
+            }
+        }
+        await executeATC(atc, algodClient, signTransactions, 4, onTxStatus);
+    };
+
     const deployFactory = async () => {
         if (!activeAccount) return;
         setIsLoading(true); setStatus('Deploying Event Factory...');
         try {
             const algodClient = new algosdk.Algodv2('', 'https://testnet-api.algonode.cloud', 443);
-            const approvalProgram = await fetch('/utils/contracts/event_factory_approval.teal').then(r => r.text());
-            const clearProgram = await fetch('/utils/contracts/event_factory_clear.teal').then(r => r.text());
-            const approvalBin = await algodClient.compile(approvalProgram).do();
-            const clearBin = await algodClient.compile(clearProgram).do();
+            const approvalBytes = await compileProgram(algodClient, '/utils/contracts/event_factory_approval.teal');
+            const clearBytes = await compileProgram(algodClient, '/utils/contracts/event_factory_clear.teal');
             const params = await algodClient.getTransactionParams().do();
-            const approvalBytes = new Uint8Array(atob(approvalBin.result).split('').map(x => x.charCodeAt(0)));
-            const clearBytes = new Uint8Array(atob(clearBin.result).split('').map(x => x.charCodeAt(0)));
-            const txn = algosdk.makeApplicationCreateTxnFromObject({ from: activeAccount.address, approvalProgram: approvalBytes, clearProgram: clearBytes, numGlobalByteSlices: 0, numGlobalInts: 1, numLocalByteSlices: 0, numLocalInts: 0, onComplete: algosdk.OnApplicationComplete.NoOpOC, suggestedParams: params, note: new TextEncoder().encode("Event Factory") });
+            const txn = algosdk.makeApplicationCreateTxnFromObject({ from: activeAccount.address, approvalProgram: approvalBytes, clearProgram: clearBytes, numGlobalByteSlices: 0, numGlobalInts: 1, numLocalByteSlices: 0, numLocalInts: 0, extraPages: Math.floor((approvalBytes.length + clearBytes.length - 1) / 2048), onComplete: algosdk.OnApplicationComplete.NoOpOC, suggestedParams: params, note: new TextEncoder().encode("Event Factory") });
             // Sign and send directly (no ATC needed for single txns)
             const encoded = algosdk.encodeUnsignedTransaction(txn);
             const signedTxns = await signTransactions([encoded]);
@@ -122,117 +193,85 @@ export default function CreateEventPage() {
             const ptx = await algosdk.waitForConfirmation(algodClient, txId, 4);
             const appId = ptx["application-index"];
             setFactoryAppId(appId);
+
+            setStatus('Uploading the event contract to the factory...');
+            await uploadTicketManager(algodClient, appId);
             setStatus(`✓ Factory deployed: ${appId}`);
         } catch (e: any) { console.error(e); setStatus(`Error: ${e.message}`); }
         finally { setIsLoading(false); }
     };
 
+    // One group: MBR + funding payment and EventFactory.create_event, which deploys,
+    // initializes, funds and registers the TicketManager
     const deployEvent = async () => {
         if (!activeAccount) { setStatus('Connect wallet first'); return; }
         if (!eventName.trim()) { setStatus('Enter an event name'); return; }
+        if (factoryAppId === 0) { setStatus('Enter a Factory ID or deploy a new factory first'); return; }
         setIsLoading(true); setCurrentStep(0); setCreatedAppId(null);
         try {
             const algodClient = new algosdk.Algodv2('', 'https://testnet-api.algonode.cloud', 443);
-            setStatus('Deploying smart contract...');
-            const approvalProgram = await fetch('/utils/contracts/ticket_manager_approval.teal').then(r => r.text());
-            const clearProgram = await fetch('/utils/contracts/ticket_manager_clear.teal').then(r => r.text());
-            const approvalBin = await algodClient.compile(approvalProgram).do();
-            const clearBin = await algodClient.compile(clearProgram).do();
-            const params = await algodClient.getTransactionParams().do();
-            const approvalProgramBytes = new Uint8Array(atob(approvalBin.result).split('').map(x => x.charCodeAt(0)));
-            const clearProgramBytes = new Uint8Array(atob(clearBin.result).split('').map(x => x.charCodeAt(0)));
-            const txn = algosdk.makeApplicationCreateTxnFromObject({ from: activeAccount.address, approvalProgram: approvalProgramBytes, clearProgram: clearProgramBytes, numGlobalByteSlices: 1, numGlobalInts: 4, numLocalByteSlices: 0, numLocalInts: 0, onComplete: algosdk.OnApplicationComplete.NoOpOC, suggestedParams: params, note: new TextEncoder().encode("Event Ticket Manager") });
-            // Sign and send directly
-            const encoded = algosdk.encodeUnsignedTransaction(txn);
-            const signedTxns = await signTransactions([encoded]);
-            const { txId } = await algodClient.sendRawTransaction(signedTxns.filter(t => t != null)).do();
-            const ptx = await algosdk.waitForConfirmation(algodClient, txId, 4);
-            const appId = ptx["application-index"];
-            setCurrentStep(1); setCreatedAppId(appId);
+            setStatus('Creating event...');
+            const facAppInfo = await algodClient.getApplicationByID(factoryAppId).do();
+            const globalState = facAppInfo.params["global-state"];
+            const countState = globalState?.find((s: any) => s.key === btoa("EventCount"));
+            const registryKey = algosdk.encodeUint64(countState ? countState.value.uint : 0);
+            const approvalLength = (await algodClient.getApplicationBoxByName(factoryAppId, APPROVAL_BOX).do()).value.length;
+            const clearLength = (await algodClient.getApplicationBoxByName(factoryAppId, CLEAR_BOX).do()).value.length;
+            const registryLength = 8 + new TextEncoder().encode(eventName).length;
 
-            setStatus('Initializing event...');
-            const contractJson = await fetch('/utils/contracts/ticket_manager_contract.json').then(r => r.json());
-            const contract = new algosdk.ABIContract(contractJson);
-            const method = contract.getMethodByName('create_event');
+            // Factory MBR for the new app and its registry box, plus the event app's own funding
+            // Extra pages cover approval and clear together
+            const extraPages = Math.floor((approvalLength + clearLength - 1) / 2048);
+            const schema = await fetchTicketManagerSchema();
+            const appMbr = 100_000 * (1 + extraPages) + 28_500 * schema.ints + 50_000 * schema.bytes;
+            const mbr = appMbr + boxMbr(registryKey, registryLength);
+
+            const factoryContract = new algosdk.ABIContract(await fetch('/utils/contracts/event_factory_contract.json').then(r => r.json()));
             const priceInMicroAlgos = Math.floor(parseFloat(price) * 1000000);
             const cancellationDeadlineTimestamp = Math.floor(new Date(cancellationDeadline).getTime() / 1000);
-            const initParams = await algodClient.getTransactionParams().do();
-            const atc = new algosdk.AtomicTransactionComposer();
-            const fundTxn = algosdk.makePaymentTxnWithSuggestedParamsFromObject({
+            const params = await algodClient.getTransactionParams().do();
+            const payTxn = algosdk.makePaymentTxnWithSuggestedParamsFromObject({
                 from: activeAccount.address,
-                to: algosdk.getApplicationAddress(appId),
-                amount: 1_000_000,
-                suggestedParams: initParams
+                to: algosdk.getApplicationAddress(factoryAppId),
+                amount: mbr + EVENT_FUNDING,
+                suggestedParams: params
             });
-            atc.addTransaction({ txn: fundTxn, signer: dummySigner });
+            const atc = new algosdk.AtomicTransactionComposer();
             atc.addMethodCall({
-                appID: appId,
-                method,
+                appID: factoryAppId,
+                method: factoryContract.getMethodByName('create_event'),
                 methodArgs: [
+                    eventName,
                     priceInMicroAlgos,
                     parseInt(supply),
-                    cancellationDeadlineTimestamp
+                    cancellationDeadlineTimestamp,
+                    { txn: payTxn, signer: dummySigner },
                 ],
+                boxes: boxRefs(
+                    [APPROVAL_BOX, CLEAR_BOX, UPLOAD_BOX, registryKey],
+                    approvalLength + clearLength + UPLOAD_SIZE + registryLength,
+                ),
                 sender: activeAccount.address,
                 signer: dummySigner,
-                suggestedParams: initParams
+                // Outer call + inner app create + inner funding payment
+                suggestedParams: { ...params, fee: 3 * algosdk.ALGORAND_MIN_TX_FEE, flatFee: true }
             });
-            await executeATC(atc, algodClient, signTransactions, 4, (s) => {
-                if (s.state === 'pending') setTxStatus({ state: 'pending', message: s.message, txId: s.txId, explorerUrl: s.explorerUrl });
-                if (s.state === 'success') setTxStatus({ state: 'success', message: s.message, txId: s.txId, explorerUrl: s.explorerUrl });
-                if (s.state === 'failed') setTxStatus({ state: 'failed', message: s.message });
-            });
-            setCurrentStep(2);
+            setCurrentStep(1);
+            const { txIDs } = await executeATC(atc, algodClient, signTransactions, 4, onTxStatus);
+            const callInfo = await algodClient.pendingTransactionInformation(txIDs[txIDs.length - 1]).do();
+            const appId = callInfo['inner-txns'][0]['application-index'];
 
-            if (factoryAppId !== 0) {
-                setStatus('Registering with factory...');
-                const facAppInfo = await algodClient.getApplicationByID(factoryAppId).do();
-                const globalState = facAppInfo.params["global-state"];
-                const countState = globalState?.find((s: any) => s.key === btoa("event_count")) ?? globalState?.find((s: any) => s.key === btoa("EventCount"));
-                const eventCount = countState ? countState.value.uint : 0;
-                const rawKey = algosdk.encodeUint64(eventCount);
-                // Contract uses just the integer count as key
-                const boxKey = rawKey;
-                const atcFactory = new algosdk.AtomicTransactionComposer();
-                const factoryParams = await algodClient.getTransactionParams().do();
-                const factoryAddr = algosdk.getApplicationAddress(factoryAppId);
-                const payTxn = algosdk.makePaymentTxnWithSuggestedParamsFromObject({ from: activeAccount.address, to: factoryAddr, amount: 200000, suggestedParams: factoryParams });
-                atcFactory.addTransaction({ txn: payTxn, signer: dummySigner });
-                // Use ABI for register_event to ensure correct selector
-                const factoryContractJson = await fetch('/utils/contracts/event_factory_contract.json').then(r => r.json());
-                const factoryContract = new algosdk.ABIContract(factoryContractJson);
-                const factoryMethod = factoryContract.getMethodByName('register_event');
-
-                atcFactory.addMethodCall({
-                    appID: factoryAppId,
-                    method: factoryMethod,
-                    methodArgs: [appId, eventName],
-                    boxes: [{ appIndex: 0, name: boxKey }],
-                    sender: activeAccount.address,
-                    signer: dummySigner,
-                    suggestedParams: { ...factoryParams, fee: 2000, flatFee: true }
-                });
-                await executeATC(atcFactory, algodClient, signTransactions, 4, (s) => {
-                    if (s.state === 'pending') setTxStatus({ state: 'pending', message: s.message, txId: s.txId, explorerUrl: s.explorerUrl });
-                    if (s.state === 'success') setTxStatus({ state: 'success', message: s.message, txId: s.txId, explorerUrl: s.explorerUrl });
-                    if (s.state === 'failed') setTxStatus({ state: 'failed', message: s.message });
-                });
-                setCurrentStep(3);
-                storeEventMetadata(appId);
-                saveDeployedEvent(appId, factoryAppId);
-                setStatus(`✓ Event created & registered! Ready to go.`);
-            } else {
-                setCurrentStep(3);
-                storeEventMetadata(appId);
-                saveDeployedEvent(appId, factoryAppId);
-                setStatus(`✓ Event created! (Not registered - No Factory ID found. Did you refresh?)`);
-            }
+            setCreatedAppId(appId);
+            setCurrentStep(2);
+            storeEventMetadata(appId);
+            saveDeployedEvent(appId, factoryAppId);
+            setStatus(`✓ Event created & registered! Ready to go.`);
         } catch (error: any) {
             console.error(error);
             if (error.message?.includes('4100') || error.message?.includes('Transaction request pending')) {
                 setStatus('Please check your wallet app to complete the pending transaction.');
             } else if (error.message.includes('invalid Box reference') || error.message.includes('box')) {
-                setStatus(`Error: Contract version mismatch. Please DEPLOY A NEW FACTORY to fix.`);
+                setStatus(`Error: This factory has no (or an incomplete) event contract upload. Please DEPLOY A NEW FACTORY to fix.`);
             } else {
                 setStatus(`Error: ${error.message}`);
             }
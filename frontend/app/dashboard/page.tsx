@@ -5,8 +5,18 @@ import { useWallet } from '@txnlab/use-wallet';
 import { Button } from '@/components/ui/button';
 import algosdk from 'algosdk';
 import { executeATC, dummySigner } from '@/utils/signer';
+import { ticketBoxRefs, decodeResalePrice, fetchTicketManagerSchema } from '@/utils/events';
 import { useTxStatus } from '@/components/TxStatus';
 
+type TicketStatus = 'pending' | 'claimed' | 'used' | 'listed' | 'cancelled';
+type StatusCounts = Record<TicketStatus, number>;
+
+function countStatuses(tickets: TicketInfo[]): StatusCounts {
+    const counts: StatusCounts = { pending: 0, claimed: 0, used: 0, listed: 0, cancelled: 0 };
+    for (const ticket of tickets) counts[ticket.status]++;
+    return counts;
+}
+
 interface Event {
     appId: number;
     name: string;
@@ -18,6 +28,8 @@ interface Event {
     day: string;
     location: string;
     revenue: number;
+    // Kept on chain by the contract; null for events without the counters
+    statusCounts: StatusCounts | null;
     cancellationDeadline: number;
     penaltyPercentage: number;
     royaltyPercentage: number;
@@ -27,7 +39,7 @@ interface TicketInfo {
     index: number;
     assetId: number;
     owner: string;
-    status: 'pending' | 'claimed' | 'used' | 'listed' | 'cancelled';
+    status: TicketStatus;
     resalePrice?: number;
 }
 
@@ -104,6 +116,8 @@ export default function DashboardPage() {
         try {
             const deployedEvents = JSON.parse(localStorage.getItem('deployedEvents') || '[]');
             const organizerEvents: Event[] = [];
+            // Events created before the status counters have 4 uints
+            const { ints: statusCounterUints } = await fetchTicketManagerSchema();
             
             for (const deployedEvent of deployedEvents) {
                 try {
@@ -129,6 +143,7 @@ export default function DashboardPage() {
                     const cancellationDeadline = getGlobalInt("cancellation_deadline");
                     const penaltyPercentage = getGlobalInt("penalty_percentage");
                     const royaltyPercentage = getGlobalInt("royalty_percentage");
+                    const hasCounters = (eventAppInfo.params["global-state-schema"]?.["num-uint"] ?? 0) >= statusCounterUints;
                     
                     let organizer = "";
                     if (organizerBase64) { 
@@ -150,7 +165,14 @@ export default function DashboardPage() {
                             date: deployedEvent.date,
                             day: deployedEvent.day,
                             location: deployedEvent.location,
-                            revenue: price * sold,
+                            revenue: hasCounters ? getGlobalInt("Revenue") : price * sold,
+                            statusCounts: hasCounters ? {
+                                pending: getGlobalInt("Pending"),
+                                claimed: getGlobalInt("Claimed"),
+                                used: getGlobalInt("Used"),
+                                listed: getGlobalInt("Listed"),
+                                cancelled: getGlobalInt("Cancelled"),
+                            } : null,
                             cancellationDeadline,
                             penaltyPercentage,
                             royaltyPercentage,
@@ -187,8 +209,11 @@ export default function DashboardPage() {
         const averagePrice = totalTickets > 0 ? totalRevenue / totalSold : 0;
         const sellThroughRate = totalTickets > 0 ? (totalSold / totalTickets) * 100 : 0;
         const activeEvents = events.filter(event => event.sold < event.supply).length;
-        const totalAttendees = totalSold; // Simplified - would be actual check-ins
-        const checkInRate = totalSold > 0 ? 85 : 0; // Simplified - would calculate from actual check-ins
+        // Attendance comes from the status counters; events without them are left out
+        const counted = events.filter(event => event.statusCounts);
+        const totalAttendees = counted.reduce((sum, event) => sum + event.statusCounts!.used, 0);
+        const admissible = counted.reduce((sum, event) => sum + event.sold - event.statusCounts!.cancelled, 0);
+        const checkInRate = admissible > 0 ? (totalAttendees / admissible) * 100 : 0;
         const resaleRevenue = 0; // Would track actual resale transactions
 
         setStats({
@@ -206,7 +231,7 @@ export default function DashboardPage() {
         });
     };
 
-    // Load tickets for a specific event
+    // Load tickets for a specific event (only the ticket table needs the boxes)
     const loadEventTickets = async (event: Event) => {
         setSelectedEvent(event);
         setIsLoading(true);
@@ -214,15 +239,17 @@ export default function DashboardPage() {
         
         try {
             const eventTickets: TicketInfo[] = [];
-            const ticketsPrefix = new TextEncoder().encode("tickets");
             const promises = [];
             
             for (let i = 1; i <= event.sold; i++) {
-                const rawKey = algosdk.encodeUint64(i);
-                const boxKey = new Uint8Array(ticketsPrefix.length + rawKey.length);
-                boxKey.set(ticketsPrefix, 0);
-                boxKey.set(rawKey, ticketsPrefix.length);
-                promises.push(algodClient.getApplicationBoxByName(event.appId, boxKey).do().then(box => ({ i, box })).catch(() => null));
+                // Compact box first, legacy box if the ticket is not migrated
+                const [compact, legacy] = ticketBoxRefs(i);
+                promises.push(
+                    algodClient.getApplicationBoxByName(event.appId, compact.name).do()
+                        .catch(() => algodClient.getApplicationBoxByName(event.appId, legacy.name).do())
+                        .then(box => ({ i, box }))
+                        .catch(() => null)
+                );
             }
             
             const results = await Promise.all(promises);
@@ -232,17 +259,16 @@ export default function DashboardPage() {
                 const assetId = algosdk.decodeUint64(box.value.slice(0, 8), 'safe');
                 const owner = algosdk.encodeAddress(box.value.slice(8, 40));
                 const statusByte = box.value[40];
-                const resalePriceBytes = box.value.slice(41, 49);
-                const resalePrice = algosdk.decodeUint64(resalePriceBytes, 'safe');
+                const resalePrice = decodeResalePrice(box.value);
                 
-                const status = statusByte === 0 ? 'pending' : statusByte === 1 ? 'claimed' : statusByte === 2 ? 'used' : statusByte === 3 ? 'listed' : 'cancelled';
+                const status: TicketStatus = statusByte === 0 ? 'pending' : statusByte === 1 ? 'claimed' : statusByte === 2 ? 'used' : statusByte === 3 ? 'listed' : 'cancelled';
                 
                 eventTickets.push({
                     index: i,
                     assetId: Number(assetId),
                     owner,
                     status,
-                    resalePrice: Number(resalePrice),
+                    resalePrice,
                 });
             }
             
@@ -283,6 +309,7 @@ export default function DashboardPage() {
             });
             
             setStatus('🎉 Attendee checked in successfully!');
+            loadOrganizerEvents(); // Refresh counters
             loadEventTickets(selectedEvent); // Refresh tickets
         } catch (e: any) {
             console.error('Error checking in attendee:', e);
@@ -351,6 +378,11 @@ export default function DashboardPage() {
         }
     };
 
+    // Counters of the freshest copy of the selected event; boxes only for older events
+    const selectedCounts = events.find(e => e.appId === selectedEvent?.appId)?.statusCounts
+        ?? selectedEvent?.statusCounts
+        ?? countStatuses(tickets);
+
     // Load events when wallet connects
     useEffect(() => {
         if (activeAccount) {
@@ -399,7 +431,7 @@ export default function DashboardPage() {
                         <StatCard
                             title="Total Attendees"
                             value={stats.totalAttendees.toString()}
-                            subtitle={`${stats.checkInRate}% check-in rate`}
+                            subtitle={`${stats.checkInRate.toFixed(1)}% check-in rate`}
                             trend={8}
                             icon={<svg className="w-6 h-6 text-purple-600" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path strokeLinecap="round" strokeLinejoin="round" strokeWidth={2} d="M17 20h5v-2a3 3 0 00-5.356-1.857M17 20H7m10 0v-2c0-.656-.126-1.283-.356-1.857M7 20H2v-2a3 3 0 015.356-1.857M7 20v-2c0-.656.126-1.283.356-1.857m0 0a5.002 5.002 0 019.288 0M15 7a3 3 0 11-6 0 3 3 0 016 0zm6 3a2 2 0 11-4 0 2 2 0 014 0zM7 10a2 2 0 11-4 0 2 2 0 014 0z" /></svg>}
                         />
@@ -554,19 +586,19 @@ export default function DashboardPage() {
                                 {/* Attendee Stats */}
                                 <div className="grid grid-cols-4 gap-4 mb-6">
                                     <div className="bg-green-50 rounded-lg p-3 text-center">
-                                        <p className="text-2xl font-bold text-green-600">{tickets.filter(t => t.status === 'used').length}</p>
+                                        <p className="text-2xl font-bold text-green-600">{selectedCounts.used}</p>
                                         <p className="text-xs text-green-700">Checked In</p>
                                     </div>
                                     <div className="bg-blue-50 rounded-lg p-3 text-center">
-                                        <p className="text-2xl font-bold text-blue-600">{tickets.filter(t => t.status === 'claimed').length}</p>
+                                        <p className="text-2xl font-bold text-blue-600">{selectedCounts.claimed}</p>
                                         <p className="text-xs text-blue-700">Ready</p>
                                     </div>
                                     <div className="bg-amber-50 rounded-lg p-3 text-center">
-                                        <p className="text-2xl font-bold text-amber-600">{tickets.filter(t => t.status === 'pending').length}</p>
+                                        <p className="text-2xl font-bold text-amber-600">{selectedCounts.pending}</p>
                                         <p className="text-xs text-amber-700">Pending</p>
                                     </div>
                                     <div className="bg-purple-50 rounded-lg p-3 text-center">
-                                        <p className="text-2xl font-bold text-purple-600">{tickets.filter(t => t.status === 'listed').length}</p>
+                                        <p className="text-2xl font-bold text-purple-600">{selectedCounts.listed}</p>
                                         <p className="text-xs text-purple-700">For Resale</p>
                                     </div>
                                 </div>
@@ -6,6 +6,7 @@ import { Button } from '@/components/ui/button';
 import { Card, CardContent, CardHeader, CardTitle, CardDescription } from '@/components/ui/card';
 import algosdk from 'algosdk';
 import { executeATC, dummySigner } from '@/utils/signer';
+import { ticketBoxKey, ticketBoxRefs, parseTicketBoxName, ticketBoxVersion, decodeResalePrice, REFUND_BOX_REF } from '@/utils/events';
 import { useTxStatus } from '@/components/TxStatus';
 import TxConfirm from '@/components/TxConfirm';
 
@@ -68,28 +69,19 @@ export default function EventDetailsPage({ params }: { params: { id: string } })
                     for (let k = 0; k < bin.length; k++) nameBytes[k] = bin.charCodeAt(k);
                 }
 
-                // Check if Ticket Box (value >= 49 for Resale support)
-                if (box.value.length < 49) continue;
-
-                // Extract Index if possible (Prefix "tickets")
-                // Box Name: "tickets" (7) + uint64 (8) = 15 bytes
-                let ticketIndex = 0;
-                if (nameBytes.length === 15) {
-                    const prefix = new TextDecoder().decode(nameBytes.slice(0, 7));
-                    if (prefix === "tickets") {
-                        ticketIndex = Number(algosdk.decodeUint64(nameBytes.slice(7), 'safe'));
-                    } else continue;
-                } else continue; // Only support new ticket boxes
+                // Ticket boxes only ("t" + uint32 or legacy "tickets" + uint64)
+                const ticketIndex = parseTicketBoxName(nameBytes);
+                if (ticketIndex === null) continue;
 
                 // Parse Value
-                // [AssetID 8][Owner 32][Status 1][Price 8]
+                // [AssetID 8][Owner 32][Status 1][Price 8 while Listed]
                 const status = box.value[40];
                 if (status === 3) { // Listed
-                    const price = algosdk.decodeUint64(box.value.slice(41, 49), 'safe');
                     const owner = algosdk.encodeAddress(box.value.slice(8, 40));
                     listed.push({
                         index: ticketIndex,
-                        price: Number(price),
+                        version: ticketBoxVersion(nameBytes),
+                        price: decodeResalePrice(box.value),
                         owner: owner
                     });
                 }
@@ -182,11 +174,7 @@ export default function EventDetailsPage({ params }: { params: { id: string } })
             const atc = new algosdk.AtomicTransactionComposer();
             const sp = { ...params, fee: 3000, flatFee: true };
 
-            const ticketsPrefix = new TextEncoder().encode("tickets");
-            const rawKey = algosdk.encodeUint64(currentSold);
-            const boxKey = new Uint8Array(ticketsPrefix.length + rawKey.length);
-            boxKey.set(ticketsPrefix, 0);
-            boxKey.set(rawKey, ticketsPrefix.length);
+            const boxKey = ticketBoxKey(currentSold);
 
             atc.addMethodCall({
                 appID: appId,
@@ -245,12 +233,6 @@ export default function EventDetailsPage({ params }: { params: { id: string } })
             // Total fee = 3000 (1000 outer + 2000 inner)
             const sp = { ...params, fee: 3000, flatFee: true };
 
-            const ticketsPrefix = new TextEncoder().encode("tickets");
-            const rawKey = algosdk.encodeUint64(ticket.index);
-            const boxKey = new Uint8Array(ticketsPrefix.length + rawKey.length);
-            boxKey.set(ticketsPrefix, 0);
-            boxKey.set(rawKey, ticketsPrefix.length);
-
             atc.addMethodCall({
                 appID: appId,
                 method: contract.getMethodByName('buy_resale_ticket'),
@@ -258,7 +240,7 @@ export default function EventDetailsPage({ params }: { params: { id: string } })
                     ticket.index,
                     { txn: paymentTxn, signer: dummySigner }
                 ],
-                boxes: [{ appIndex: 0, name: boxKey }],
+                boxes: [...ticketBoxRefs(ticket.index, ticket.version), REFUND_BOX_REF],
                 sender: activeAccount.address,
                 signer: dummySigner,
                 suggestedParams: sp
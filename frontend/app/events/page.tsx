@@ -6,6 +6,7 @@ import { useState } from 'react';
 import { Button } from '@/components/ui/button';
 import algosdk from 'algosdk';
 import { executeATC, dummySigner } from '@/utils/signer';
+import { ticketBoxKey } from '@/utils/events';
 import { useTxStatus } from '@/components/TxStatus';
 
 interface EventInfo {
@@ -208,12 +209,8 @@ export default function MarketplacePage() {
             const payTxn = algosdk.makePaymentTxnWithSuggestedParamsFromObject({ from: activeAccount.address, to: eventAppAddr, amount: currentPrice, suggestedParams: params });
             const atc = new algosdk.AtomicTransactionComposer();
             const sp = { ...params, fee: 3000, flatFee: true };
-            // Contract increments Sold first, then writes to "tickets" + newSold
-            const ticketsPrefix = new TextEncoder().encode("tickets");
-            const rawKey = algosdk.encodeUint64(currentSold);
-            const boxKey = new Uint8Array(ticketsPrefix.length + rawKey.length);
-            boxKey.set(ticketsPrefix, 0);
-            boxKey.set(rawKey, ticketsPrefix.length);
+            // Contract writes the new ticket to "t" + Sold before incrementing it
+            const boxKey = ticketBoxKey(currentSold);
             atc.addMethodCall({ appID: event.appId, method, methodArgs: [{ txn: payTxn, signer: dummySigner }], boxes: [{ appIndex: 0, name: boxKey }], sender: activeAccount.address, signer: dummySigner, suggestedParams: sp });
             await executeATC(atc, algodClient, signTransactions, 4, (s) => {
                 if (s.state === 'pending') setTxStatus({ state: 'pending', message: s.message, txId: s.txId, explorerUrl: s.explorerUrl });
@@ -10,7 +10,7 @@ import { useTxStatus } from '@/components/TxStatus';
 import TxConfirm from '@/components/TxConfirm';
 import ResaleModal from '@/components/ResaleModal';
 import RefundModal from '@/components/RefundModal';
-import { fetchAllEvents } from '@/utils/events';
+import { fetchAllEvents, ticketBoxRefs, parseTicketBoxName, ticketBoxVersion, decodeResalePrice, REFUND_BOX_REF } from '@/utils/events';
 
 interface Ticket {
     assetId: number;
@@ -18,6 +18,7 @@ interface Ticket {
     appId: number;
     status: 'pending' | 'claimed' | 'used' | 'listed' | 'cancelled';
     index: number;
+    version?: number | null; // ticket box layout, see ticketBoxVersion
     resalePrice?: number;
 }
 
@@ -156,24 +157,18 @@ export default function MyTicketsPage() {
                         if (!res) continue;
                         let { name, box } = res;
 
-                        // Parse Box Name to get Index
-                        // Box Name: "tickets" (7 bytes) + Index (8 bytes) = 15 bytes
-                        if (name.length !== 15) continue; // Ignore other boxes
-
-                        // Check prefix "tickets"
-                        const prefix = new TextDecoder().decode(name.slice(0, 7));
-                        if (prefix !== "tickets") continue;
-
-                        const ticketIndex = algosdk.decodeUint64(name.slice(7), 'safe');
+                        // Parse Box Name to get Index ("t" + uint32, or legacy "tickets" + uint64)
+                        const ticketIndex = parseTicketBoxName(name);
+                        if (ticketIndex === null) continue; // Ignore other boxes
 
                         // Parse Box Value
-                        // [AssetID 8][Owner 32][Status 1][ResalePrice 8]
+                        // [AssetID 8][Owner 32][Status 1][ResalePrice 8 while Listed]
                         if (box.value.length < 41) continue;
 
                         const assetId = algosdk.decodeUint64(box.value.slice(0, 8), 'safe');
                         const owner = algosdk.encodeAddress(box.value.slice(8, 40));
                         const statusByte = box.value[40];
-                        const resalePrice = box.value.length >= 49 ? algosdk.decodeUint64(box.value.slice(41, 49), 'safe') : 0;
+                        const resalePrice = decodeResalePrice(box.value);
 
                         // Match Criteria: Am I the Owner (Box Record) OR Do I hold the Asset?
                         const isOwner = owner === activeAccount.address;
@@ -187,6 +182,7 @@ export default function MyTicketsPage() {
 
                             myTickets.push({
                                 index: Number(ticketIndex),
+                                version: ticketBoxVersion(name),
                                 assetId: Number(assetId),
                                 eventName: info.name,
                                 appId: info.appId,
@@ -270,19 +266,19 @@ export default function MyTicketsPage() {
             atc.addTransaction({ txn: optInTxn, signer: dummySigner });
             const sp = await algodClient.getTransactionParams().do(); sp.fee = 2000; sp.flatFee = true;
 
-            // Fix: Use tickets prefix and ticket index
-            const ticketsPrefix = new TextEncoder().encode("tickets");
-            const rawKey = algosdk.encodeUint64(t.index);
-            const claimBoxKey = new Uint8Array(ticketsPrefix.length + rawKey.length);
-            claimBoxKey.set(ticketsPrefix, 0);
-            claimBoxKey.set(rawKey, ticketsPrefix.length);
+            // claim_ticket also writes the asset ID -> ticket index reverse box
+            const assetPrefix = new TextEncoder().encode("asset");
+            const assetKey = algosdk.encodeUint64(t.assetId);
+            const assetBoxKey = new Uint8Array(assetPrefix.length + assetKey.length);
+            assetBoxKey.set(assetPrefix, 0);
+            assetBoxKey.set(assetKey, assetPrefix.length);
 
             // Inner axfer: asset must be in foreign assets array; receiver must be in accounts array
             atc.addMethodCall({
                 appID: t.appId,
                 method,
                 methodArgs: [t.index],
-                boxes: [{ appIndex: 0, name: claimBoxKey }],
+                boxes: [...ticketBoxRefs(t.index, t.version), { appIndex: 0, name: assetBoxKey }, REFUND_BOX_REF],
                 appAccounts: [activeAccount.address],
                 appForeignAssets: [t.assetId],
                 sender: activeAccount.address,
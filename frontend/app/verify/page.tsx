@@ -5,6 +5,7 @@ import { useState } from 'react';
 import { Button } from '@/components/ui/button';
 import algosdk from 'algosdk';
 import { executeATC, dummySigner } from '@/utils/signer';
+import { ticketBoxRefs, ticketBoxVersion, REFUND_BOX_REF } from '@/utils/events';
 import { useTxStatus } from '@/components/TxStatus';
 
 export default function OrganizerDashboard() {
@@ -38,7 +39,6 @@ export default function OrganizerDashboard() {
         setIsLoading(true); setStatus("");
         try {
             const appID = parseInt(appId);
-            const ticketsPrefix = new TextEncoder().encode("tickets");
 
             // 1. Validate App & Fetch Global State
             let soldCount = 0;
@@ -63,18 +63,19 @@ export default function OrganizerDashboard() {
             // Resolve input to (ticketIndex, boxValue)
             let resolvedIndex: number | null = null;
             let boxValue: Uint8Array | null = null;
+            let boxVersion: number | null = null;
 
-            const tryBox = async (index: number): Promise<Uint8Array | null> => {
-                const rawKey = algosdk.encodeUint64(index);
-                const key = new Uint8Array(ticketsPrefix.length + rawKey.length);
-                key.set(ticketsPrefix, 0);
-                key.set(rawKey, ticketsPrefix.length);
-                try {
-                    const boxResp = await algodClient.getApplicationBoxByName(appID, key).do();
-                    return decodeBoxValue(boxResp.value);
-                } catch {
-                    return null;
+            // Compact "t" box first, then the legacy "tickets" box
+            const tryBox = async (index: number): Promise<{ value: Uint8Array, version: number | null } | null> => {
+                for (const { name } of ticketBoxRefs(index)) {
+                    try {
+                        const boxResp = await algodClient.getApplicationBoxByName(appID, name).do();
+                        return { value: decodeBoxValue(boxResp.value), version: ticketBoxVersion(name) };
+                    } catch {
+                        continue;
+                    }
                 }
+                return null;
             };
 
             // CASE A: Input is likely a Ticket Index
@@ -86,24 +87,46 @@ export default function OrganizerDashboard() {
                 }
 
                 const boxAtInput = await tryBox(ticketIdInput);
-                if (boxAtInput && boxAtInput.length >= 41) {
+                if (boxAtInput && boxAtInput.value.length >= 41) {
                     resolvedIndex = ticketIdInput;
-                    boxValue = boxAtInput;
+                    boxValue = boxAtInput.value;
+                    boxVersion = boxAtInput.version;
                 } else {
                     setStatus(`✗ Ticket #${ticketIdInput} box missing (Data inconsistency).`);
                     setIsLoading(false);
                     return;
                 }
             }
-            // CASE B: Input is likely an Asset ID (Scan all boxes)
+            // CASE B: Input is likely an Asset ID
             else {
+                // Reverse map box ('asset' + assetId -> index), written when the ticket is claimed
+                const assetPrefix = new TextEncoder().encode("asset");
+                const rawAssetKey = algosdk.encodeUint64(ticketIdInput);
+                const assetKey = new Uint8Array(assetPrefix.length + rawAssetKey.length);
+                assetKey.set(assetPrefix, 0);
+                assetKey.set(rawAssetKey, assetPrefix.length);
+                try {
+                    const indexBox = await algodClient.getApplicationBoxByName(appID, assetKey).do();
+                    const index = Number(algosdk.decodeUint64(decodeBoxValue(indexBox.value), 'safe'));
+                    const bv = await tryBox(index);
+                    if (bv && bv.value.length >= 41) {
+                        resolvedIndex = index;
+                        boxValue = bv.value;
+                        boxVersion = bv.version;
+                    }
+                } catch {
+                    // Not in the reverse map (older event): fall back to scanning
+                }
+            }
+            if (ticketIdInput >= 1000 && !boxValue) {
                 for (let i = 0; i < soldCount; i++) {
                     const bv = await tryBox(i);
-                    if (bv && bv.length >= 8) {
-                        const assetIdInBox = Number(algosdk.decodeUint64(bv.slice(0, 8), 'safe'));
+                    if (bv && bv.value.length >= 8) {
+                        const assetIdInBox = Number(algosdk.decodeUint64(bv.value.slice(0, 8), 'safe'));
                         if (assetIdInBox === ticketIdInput) {
                             resolvedIndex = i;
-                            boxValue = bv;
+                            boxValue = bv.value;
+                            boxVersion = bv.version;
                             break;
                         }
                     }
@@ -129,16 +152,11 @@ export default function OrganizerDashboard() {
                 return;
             }
 
-            const rawKey = algosdk.encodeUint64(resolvedIndex);
-            const boxKey = new Uint8Array(ticketsPrefix.length + rawKey.length);
-            boxKey.set(ticketsPrefix, 0);
-            boxKey.set(rawKey, ticketsPrefix.length);
-
             const contractJson = await fetch('/utils/contracts/ticket_manager_contract.json').then(r => r.json());
             const contract = new algosdk.ABIContract(contractJson);
             const method = contract.getMethodByName('check_in');
             const atc = new algosdk.AtomicTransactionComposer();
-            atc.addMethodCall({ appID, method, methodArgs: [resolvedIndex], boxes: [{ appIndex: 0, name: boxKey }], sender: activeAccount.address, signer: dummySigner, suggestedParams: await algodClient.getTransactionParams().do() });
+            atc.addMethodCall({ appID, method, methodArgs: [resolvedIndex], boxes: ticketBoxRefs(resolvedIndex, boxVersion), sender: activeAccount.address, signer: dummySigner, suggestedParams: await algodClient.getTransactionParams().do() });
             await executeATC(atc, algodClient, signTransactions, 4, (s) => {
                 if (s.state === 'pending') setTxStatus({ state: 'pending', message: s.message, txId: s.txId, explorerUrl: s.explorerUrl });
                 if (s.state === 'success') setTxStatus({ state: 'success', message: s.message, txId: s.txId, explorerUrl: s.explorerUrl });
@@ -167,7 +185,7 @@ export default function OrganizerDashboard() {
             const method = contract.getMethodByName('withdraw_funds');
             const atc = new algosdk.AtomicTransactionComposer();
             const sp = await algodClient.getTransactionParams().do(); sp.fee = 2000; sp.flatFee = true;
-            atc.addMethodCall({ appID: parseInt(appId), method, methodArgs: [amountMicro], sender: activeAccount.address, signer: dummySigner, suggestedParams: sp });
+            atc.addMethodCall({ appID: parseInt(appId), method, methodArgs: [amountMicro], boxes: [REFUND_BOX_REF], sender: activeAccount.address, signer: dummySigner, suggestedParams: sp });
             await executeATC(atc, algodClient, signTransactions, 4, (s) => {
                 if (s.state === 'pending') setTxStatus({ state: 'pending', message: s.message, txId: s.txId, explorerUrl: s.explorerUrl });
                 if (s.state === 'success') setTxStatus({ state: 'success', message: s.message, txId: s.txId, explorerUrl: s.explorerUrl });
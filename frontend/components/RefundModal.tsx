@@ -5,6 +5,7 @@ import { useWallet } from '@txnlab/use-wallet';
 import { Button } from '@/components/ui/button';
 import algosdk from 'algosdk';
 import { executeATC, dummySigner } from '@/utils/signer';
+import { ticketBoxRefs } from '@/utils/events';
 import { useTxStatus } from '@/components/TxStatus';
 
 interface Ticket {
@@ -13,6 +14,7 @@ interface Ticket {
     appId: number;
     status: 'pending' | 'claimed' | 'used' | 'listed' | 'cancelled';
     index: number;
+    version?: number | null; // ticket box layout, see ticketBoxVersion
 }
 
 interface RefundModalProps {
@@ -74,18 +76,13 @@ export default function RefundModal({ isOpen, ticket, onClose }: RefundModalProp
             const params = await algodClient.getTransactionParams().do();
             const sp = { ...params, fee: 3000, flatFee: true };
 
-            // Box Key: "tickets" + Index (8 bytes)
-            const ticketsPrefix = new TextEncoder().encode("tickets");
-            const rawKey = algosdk.encodeUint64(ticket.index);
-            const boxKey = new Uint8Array(ticketsPrefix.length + rawKey.length);
-            boxKey.set(ticketsPrefix, 0);
-            boxKey.set(rawKey, ticketsPrefix.length);
-
             atc.addMethodCall({
                 appID: ticket.appId,
                 method,
                 methodArgs: [ticket.index], // Pass Index here, NOT AssetID
-                boxes: [{ appIndex: 0, name: boxKey }],
+                boxes: ticketBoxRefs(ticket.index, ticket.version),
+                // Clawback and the complimentary-ticket check read the ticket ASA
+                appForeignAssets: [ticket.assetId],
                 sender: activeAccount.address,
                 signer: dummySigner,
                 suggestedParams: sp
@@ -5,6 +5,7 @@ import { useWallet } from '@txnlab/use-wallet';
 import { Button } from '@/components/ui/button';
 import algosdk from 'algosdk';
 import { executeATC, dummySigner } from '@/utils/signer';
+import { ticketBoxRefs, REFUND_BOX_REF } from '@/utils/events';
 import { useTxStatus } from '@/components/TxStatus';
 
 interface Ticket {
@@ -13,6 +14,7 @@ interface Ticket {
     appId: number;
     status: 'pending' | 'claimed' | 'used' | 'listed' | 'cancelled';
     index: number;
+    version?: number | null; // ticket box layout, see ticketBoxVersion
     resalePrice?: number;
 }
 
@@ -52,17 +54,11 @@ export default function ResaleModal({ isOpen, ticket, onClose }: ResaleModalProp
             const params = await algodClient.getTransactionParams().do();
             const sp = { ...params, fee: 2000, flatFee: true };
             
-            const ticketsPrefix = new TextEncoder().encode("tickets");
-            const rawKey = algosdk.encodeUint64(ticket.index);
-            const boxKey = new Uint8Array(ticketsPrefix.length + rawKey.length);
-            boxKey.set(ticketsPrefix, 0);
-            boxKey.set(rawKey, ticketsPrefix.length);
-            
             atc.addMethodCall({
                 appID: ticket.appId,
                 method,
                 methodArgs: [ticket.index, priceInMicroAlgos],
-                boxes: [{ appIndex: 0, name: boxKey }],
+                boxes: [...ticketBoxRefs(ticket.index, ticket.version), REFUND_BOX_REF],
                 sender: activeAccount.address,
                 signer: dummySigner,
                 suggestedParams: sp
@@ -102,17 +98,11 @@ export default function ResaleModal({ isOpen, ticket, onClose }: ResaleModalProp
             const params = await algodClient.getTransactionParams().do();
             const sp = { ...params, fee: 2000, flatFee: true };
             
-            const ticketsPrefix = new TextEncoder().encode("tickets");
-            const rawKey = algosdk.encodeUint64(ticket.index);
-            const boxKey = new Uint8Array(ticketsPrefix.length + rawKey.length);
-            boxKey.set(ticketsPrefix, 0);
-            boxKey.set(rawKey, ticketsPrefix.length);
-            
             atc.addMethodCall({
                 appID: ticket.appId,
                 method,
                 methodArgs: [ticket.index],
-                boxes: [{ appIndex: 0, name: boxKey }],
+                boxes: ticketBoxRefs(ticket.index, ticket.version),
                 sender: activeAccount.address,
                 signer: dummySigner,
                 suggestedParams: sp
@@ -32,6 +32,60 @@ function buildBoxKey(prefix: Uint8Array, key: Uint8Array): Uint8Array {
     return result;
 }
 
+// Compact (v2) ticket boxes: "t" + uint32 index -> [AssetID 8][Owner 32][Status 1],
+// plus [ResalePrice 8] while Listed. Legacy (v1) boxes use "tickets" + uint64
+// index and always hold the price; they stay valid until migrated.
+const TICKET_BOX_PREFIX = new TextEncoder().encode("t");
+
+function ticketBoxKey(index: number): Uint8Array {
+    return buildBoxKey(TICKET_BOX_PREFIX, algosdk.encodeUint64(index).slice(4));
+}
+
+function legacyTicketBoxKey(index: number): Uint8Array {
+    return buildBoxKey(TICKETS_BOX_PREFIX, algosdk.encodeUint64(index));
+}
+
+// The contract looks up the v2 key first and falls back to v1, so a ticket
+// only needs the v1 reference when it is not known to be migrated (version
+// from ticketBoxVersion on the box name it was read from)
+export function ticketBoxRefs(index: number, version?: number | null) {
+    const compact = { appIndex: 0, name: ticketBoxKey(index) };
+    if (version === 2) return [compact];
+    return [compact, { appIndex: 0, name: legacyTicketBoxKey(index) }];
+}
+
+// TicketManager creation schema (GLOBAL_NUM_UINTS / GLOBAL_NUM_BYTE_SLICES in
+// ticket_manager.py), exported into the contract JSON's ARC-56 "state" section
+export async function fetchTicketManagerSchema(): Promise<{ ints: number; bytes: number }> {
+    const spec = await fetch('/utils/contracts/ticket_manager_contract.json').then(r => r.json());
+    return spec.state.schema.global;
+}
+
+// Created by cancel_event; claim and resale calls check it, so they reference it
+export const REFUND_BOX_REF = { appIndex: 0, name: new TextEncoder().encode("refund") };
+
+// Ticket index for a ticket box name (either layout), null for other boxes
+export function parseTicketBoxName(name: Uint8Array): number | null {
+    if (name.length === 15 && new TextDecoder().decode(name.slice(0, 7)) === "tickets") {
+        return Number(algosdk.decodeUint64(name.slice(7), 'safe'));
+    }
+    if (name.length === 5 && name[0] === TICKET_BOX_PREFIX[0]) {
+        return Number(algosdk.decodeUint64(name.slice(1), 'safe'));
+    }
+    return null;
+}
+
+// Layout of a ticket box name: 2 (compact), 1 (legacy), null for other boxes
+export function ticketBoxVersion(name: Uint8Array): number | null {
+    if (parseTicketBoxName(name) === null) return null;
+    return name.length === 5 ? 2 : 1;
+}
+
+// Resale price field; absent from v2 boxes that are not Listed
+export function decodeResalePrice(value: Uint8Array): number {
+    return value.length >= 49 ? Number(algosdk.decodeUint64(value.slice(41, 49), 'safe')) : 0;
+}
+
 function decodeEventName(raw: Uint8Array): string {
     if (raw.length >= 2) {
         const nameLen = (raw[0] << 8) | raw[1];
@@ -121,4 +175,4 @@ export async function fetchAllEvents(
 }
 
 // Export box key builders for use in other components
-export { EVENTS_BOX_PREFIX, TICKETS_BOX_PREFIX, buildBoxKey };
+export { EVENTS_BOX_PREFIX, TICKETS_BOX_PREFIX, buildBoxKey, ticketBoxKey };
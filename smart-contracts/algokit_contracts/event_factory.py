@@ -1,7 +1,13 @@
 from pyteal import *
 
+try:
+    from .ticket_manager import GLOBAL_NUM_BYTE_SLICES, GLOBAL_NUM_UINTS
+except ImportError:  # run as a script by compile.py
+    from ticket_manager import GLOBAL_NUM_BYTE_SLICES, GLOBAL_NUM_UINTS
+
 # This contract acts as a Registry for all events created on the platform.
-# Organizers deploy their own TicketManager contract, then register it here.
+# Organizers create their TicketManager through create_event, which deploys
+# the uploaded program and registers it, so every entry is a genuine event.
 
 router = Router(
     "EventFactoryRepository",
@@ -13,9 +19,25 @@ router = Router(
 
 EVENT_COUNT = Bytes("EventCount")
 
+# TicketManager programs, uploaded once by the factory creator
+APPROVAL_BOX = Bytes("approval")
+CLEAR_BOX = Bytes("clear")
+PAGE_SIZE = Int(4096)  # Max bytes per ApprovalProgramPages entry
+
+# Upload progress: [ApprovalWritten 8][ClearWritten 8]. write_program only
+# appends, and create_event only deploys once both programs are complete.
+UPLOAD_BOX = Bytes("upload")
+
+def written_offset(clear):
+    return If(clear, Int(8), Int(0))
+
+# Lists an app deployed outside the factory. Creator only: the factory cannot
+# check what an external app runs, so only its operator vouches for it.
 @router.method
 def register_event(app_id: abi.Uint64, name: abi.String):
     return Seq(
+        Assert(Txn.sender() == Global.creator_address()),
+
         # Increment event count
         # Store in box: Key = Count, Value = {AppID, Name}
         # Or simpler: Just emit an event?
@@ -34,6 +56,119 @@ def register_event(app_id: abi.Uint64, name: abi.String):
         App.globalPut(EVENT_COUNT, current_count.load() + Int(1)),
     )
 
+@router.method
+def init_program(approval_size: abi.Uint64, clear_size: abi.Uint64):
+    return Seq(
+        Assert(Txn.sender() == Global.creator_address()),
+        # Re-uploading replaces the previous version
+        Pop(App.box_delete(APPROVAL_BOX)),
+        Pop(App.box_delete(CLEAR_BOX)),
+        Pop(App.box_delete(UPLOAD_BOX)),
+        Assert(App.box_create(APPROVAL_BOX, approval_size.get())),
+        Assert(App.box_create(CLEAR_BOX, clear_size.get())),
+        Assert(App.box_create(UPLOAD_BOX, Int(16))),
+    )
+
+@router.method
+def write_program(clear: abi.Bool, offset: abi.Uint64, chunk: abi.DynamicBytes):
+    return Seq(
+        Assert(Txn.sender() == Global.creator_address()),
+        # Chunks are written in order, so the counter is the complete prefix
+        Assert(offset.get() == Btoi(App.box_extract(UPLOAD_BOX, written_offset(clear.get()), Int(8)))),
+        If(clear.get())
+        .Then(App.box_replace(CLEAR_BOX, offset.get(), chunk.get()))
+        .Else(App.box_replace(APPROVAL_BOX, offset.get(), chunk.get())),
+        App.box_replace(UPLOAD_BOX, written_offset(clear.get()), Itob(offset.get() + Len(chunk.get()))),
+    )
+
+@router.method
+def create_event(
+    name: abi.String,
+    price: abi.Uint64,
+    supply: abi.Uint64,
+    deadline: abi.Uint64,
+    payment: abi.PaymentTransaction,
+    *,
+    output: abi.Uint64,
+):
+    approval_len = ScratchVar(TealType.uint64)
+    offset = ScratchVar(TealType.uint64)
+    mbr_before = ScratchVar(TealType.uint64)
+    mbr_cost = ScratchVar(TealType.uint64)
+    app_id = ScratchVar(TealType.uint64)
+    current_count = ScratchVar(TealType.uint64)
+
+    return Seq(
+        Assert(payment.get().receiver() == Global.current_application_address()),
+        (approval := App.box_length(APPROVAL_BOX)),
+        Assert(approval.hasValue()),
+        approval_len.store(approval.value()),
+        Assert(approval_len.load() > Int(0)),
+        (clear := App.box_get(CLEAR_BOX)),
+        Assert(clear.hasValue()),
+        # Never deploy a partly uploaded (zero-filled) program
+        Assert(Btoi(App.box_extract(UPLOAD_BOX, Int(0), Int(8))) == approval_len.load()),
+        Assert(Btoi(App.box_extract(UPLOAD_BOX, Int(8), Int(8))) == Len(clear.value())),
+        (mbr := AccountParam.minBalance(Global.current_application_address())),
+        mbr_before.store(mbr.value()),
+
+        # Inner Txn: Create TicketManager and run init_event in the same call
+        InnerTxnBuilder.Begin(),
+        InnerTxnBuilder.SetFields({
+            TxnField.type_enum: TxnType.ApplicationCall,
+            TxnField.on_completion: OnComplete.NoOp,
+            TxnField.clear_state_program_pages: [clear.value()],
+            # Extra pages cover approval and clear together
+            TxnField.extra_program_pages: (approval_len.load() + Len(clear.value()) - Int(1)) / Int(2048),
+            TxnField.global_num_uints: Int(GLOBAL_NUM_UINTS),
+            TxnField.global_num_byte_slices: Int(GLOBAL_NUM_BYTE_SLICES),
+            TxnField.application_args: [
+                MethodSignature("init_event(uint64,uint64,uint64,address)void"),
+                price.encode(),
+                supply.encode(),
+                deadline.encode(),
+                Txn.sender(),
+            ],
+            TxnField.fee: Int(0),
+        }),
+        For(offset.store(Int(0)), offset.load() < approval_len.load(), offset.store(offset.load() + PAGE_SIZE)).Do(
+            InnerTxnBuilder.SetField(
+                TxnField.approval_program_pages,
+                [App.box_extract(
+                    APPROVAL_BOX,
+                    offset.load(),
+                    If(approval_len.load() - offset.load() > PAGE_SIZE, PAGE_SIZE, approval_len.load() - offset.load()),
+                )],
+            ),
+        ),
+        InnerTxnBuilder.Submit(),
+        app_id.store(InnerTxn.created_application_id()),
+
+        # Register: same box layout as register_event
+        current_count.store(App.globalGet(EVENT_COUNT)),
+        App.box_put(Itob(current_count.load()), Concat(Itob(app_id.load()), name.get())),
+        App.globalPut(EVENT_COUNT, current_count.load() + Int(1)),
+
+        # Payment covers the factory's added MBR (app params + registry box);
+        # the rest funds the new event app
+        (mbr_after := AccountParam.minBalance(Global.current_application_address())),
+        mbr_cost.store(mbr_after.value() - mbr_before.load()),
+        Assert(payment.get().amount() >= mbr_cost.load()),
+        (app_address := AppParam.address(app_id.load())),
+        If(payment.get().amount() > mbr_cost.load()).Then(
+            InnerTxnBuilder.Begin(),
+            InnerTxnBuilder.SetFields({
+                TxnField.type_enum: TxnType.Payment,
+                TxnField.receiver: app_address.value(),
+                TxnField.amount: payment.get().amount() - mbr_cost.load(),
+                TxnField.fee: Int(0),
+            }),
+            InnerTxnBuilder.Submit(),
+        ),
+
+        output.set(app_id.load()),
+    )
+
 if __name__ == "__main__":
     import os
     import json
@@ -0,0 +1,150 @@
+"""
+ARC-4 codec for EventFactoryRepository, generated by tools.codegen from
+event_factory_contract.json. Do not edit: python compile.py regenerates it.
+"""
+
+import hashlib
+import struct
+from base64 import b32encode
+
+from algosdk.encoding import decode_address
+
+RETURN_PREFIX = bytes.fromhex("151f7c75")
+
+_U16 = struct.Struct(">H")
+_S0 = struct.Struct(">Q")
+
+
+def _address(v):
+    return v if isinstance(v, bytes) and len(v) == 32 else decode_address(v)
+
+
+def _encode_addresses(raw):
+    """Address strings of concatenated 32-byte keys (algosdk.encoding.encode_address)."""
+    keys = [raw[i:i + 32] for i in range(0, len(raw), 32)]
+    # Key + 4-byte checksum, zero-padded to 40 bytes so each one is exactly
+    # 64 base32 characters: a single b32encode call covers the whole array
+    text = b32encode(b"".join(k + hashlib.new("sha512_256", k).digest()[-4:] + bytes(4) for k in keys)).decode()
+    return [text[i:i + 58] for i in range(0, len(text), 64)]
+
+
+# uint64
+def _pack_uint64(v):
+    return _S0.pack(v)
+
+
+def _unpack_uint64(b):
+    return _S0.unpack(b)[0]
+
+
+# string
+def _pack_string(v):
+    raw = v.encode()
+    return _U16.pack(len(raw)) + raw
+
+
+def _unpack_string(b):
+    return b[2:2 + _U16.unpack_from(b)[0]].decode()
+
+
+# bool
+def _pack_bool(v):
+    return b"\x80" if v else b"\x00"
+
+
+def _unpack_bool(b):
+    return b == b"\x80"
+
+
+# byte[]
+def _pack_byte_array(v):
+    return _U16.pack(len(v)) + bytes(v)
+
+
+def _unpack_byte_array(b):
+    return list(b[2:2 + _U16.unpack_from(b)[0]])
+
+
+# register_event(uint64,string)void
+REGISTER_EVENT = bytes.fromhex("6359ac7e")
+
+
+def encode_register_event(app_id, name):
+    return [REGISTER_EVENT, _pack_uint64(app_id), _pack_string(name)]
+
+
+def decode_register_event(app_args):
+    return [_unpack_uint64(app_args[1]), _unpack_string(app_args[2])]
+
+
+# init_program(uint64,uint64)void
+INIT_PROGRAM = bytes.fromhex("d89de528")
+
+
+def encode_init_program(approval_size, clear_size):
+    return [INIT_PROGRAM, _pack_uint64(approval_size), _pack_uint64(clear_size)]
+
+
+def decode_init_program(app_args):
+    return [_unpack_uint64(app_args[1]), _unpack_uint64(app_args[2])]
+
+
+# write_program(bool,uint64,byte[])void
+WRITE_PROGRAM = bytes.fromhex("ac46e2d1")
+
+
+def encode_write_program(clear, offset, chunk):
+    return [WRITE_PROGRAM, _pack_bool(clear), _pack_uint64(offset), _pack_byte_array(chunk)]
+
+
+def decode_write_program(app_args):
+    return [_unpack_bool(app_args[1]), _unpack_uint64(app_args[2]), _unpack_byte_array(app_args[3])]
+
+
+# create_event(string,uint64,uint64,uint64,pay)uint64
+# Transaction arguments go in the group ahead of the call: payment (pay)
+CREATE_EVENT = bytes.fromhex("a25825ff")
+
+
+def encode_create_event(name, price, supply, deadline):
+    return [CREATE_EVENT, _pack_string(name), _pack_uint64(price), _pack_uint64(supply), _pack_uint64(deadline)]
+
+
+def decode_create_event(app_args):
+    return [_unpack_string(app_args[1]), _unpack_uint64(app_args[2]), _unpack_uint64(app_args[3]), _unpack_uint64(app_args[4])]
+
+
+def encode_create_event_return(value):
+    return RETURN_PREFIX + _pack_uint64(value)
+
+
+def decode_create_event_return(log):
+    if log[:4] != RETURN_PREFIX:
+        raise ValueError("not an ARC-4 return log")
+    return _unpack_uint64(log[4:])
+
+
+SELECTORS = {
+    "register_event": REGISTER_EVENT,
+    "init_program": INIT_PROGRAM,
+    "write_program": WRITE_PROGRAM,
+    "create_event": CREATE_EVENT,
+}
+
+# selector -> (method name, argument decoder)
+DECODERS = {
+    REGISTER_EVENT: ("register_event", decode_register_event),
+    INIT_PROGRAM: ("init_program", decode_init_program),
+    WRITE_PROGRAM: ("write_program", decode_write_program),
+    CREATE_EVENT: ("create_event", decode_create_event),
+}
+
+RETURN_DECODERS = {
+    "create_event": decode_create_event_return,
+}
+
+
+def decode_call(app_args):
+    """(method name, argument values) of an app call's ApplicationArgs."""
+    name, decode = DECODERS[app_args[0]]
+    return name, decode(app_args)
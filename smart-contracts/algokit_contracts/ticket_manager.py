@@ -19,6 +19,127 @@ SOLD = Bytes("Sold")
 ORGANIZER = Bytes("Organizer")
 DEADLINE = Bytes("Deadline")
 
+# Ticket counts per status and primary-sale revenue net of refunds. Events
+# created with the original 4-uint schema have no room for them, so they are
+# only maintained when the app was created with GLOBAL_NUM_UINTS.
+STATUS_KEYS = [Bytes("Pending"), Bytes("Claimed"), Bytes("Used"), Bytes("Listed"), Bytes("Cancelled")]
+REVENUE = Bytes("Revenue")
+GLOBAL_NUM_UINTS = 10  # Price, Supply, Sold, Deadline + 5 status counters + Revenue
+GLOBAL_NUM_BYTE_SLICES = 1  # Organizer
+NO_STATUS = Int(255)  # "from" status of a newly minted ticket
+
+@Subroutine(TealType.uint64)
+def has_status_counters() -> Expr:
+    return Seq(
+        (num_uints := AppParam.globalNumUint(Global.current_application_id())),
+        num_uints.value() >= Int(GLOBAL_NUM_UINTS),
+    )
+
+@Subroutine(TealType.bytes)
+def status_key(status: Expr) -> Expr:
+    return Cond(*[[status == Int(i), key] for i, key in enumerate(STATUS_KEYS)])
+
+@Subroutine(TealType.none)
+def count_status(old: Expr, new: Expr, n: Expr) -> Expr:
+    return If(has_status_counters()).Then(
+        If(old != NO_STATUS).Then(App.globalPut(status_key(old), App.globalGet(status_key(old)) - n)),
+        App.globalPut(status_key(new), App.globalGet(status_key(new)) + n),
+    )
+
+@Subroutine(TealType.none)
+def count_revenue(received: Expr, refunded: Expr) -> Expr:
+    return If(has_status_counters()).Then(
+        App.globalPut(REVENUE, App.globalGet(REVENUE) + received - refunded),
+    )
+
+class EventSnapshot(abi.NamedTuple):
+    price: abi.Field[abi.Uint64]
+    supply: abi.Field[abi.Uint64]
+    sold: abi.Field[abi.Uint64]
+    deadline: abi.Field[abi.Uint64]
+    organizer: abi.Field[abi.Address]
+    pending: abi.Field[abi.Uint64]
+    claimed: abi.Field[abi.Uint64]
+    used: abi.Field[abi.Uint64]
+    listed: abi.Field[abi.Uint64]
+    cancelled: abi.Field[abi.Uint64]
+    revenue: abi.Field[abi.Uint64]
+
+# Archive box kept after collect_tickets deletes terminal ticket boxes
+# Value: [Used 8][Cancelled 8][Collected 8][Used bitmap, 1 bit per ticket sold]
+ARCHIVE = Bytes("archive")
+ARCHIVE_HEADER = Int(24)
+
+# Reverse map box: 'asset' + Itob(asset_id) -> Itob(ticket index)
+# Written on claim: the asset ID does not exist yet when buy_ticket's box
+# references are chosen, and only claimed tickets can be checked in.
+ASSET_PREFIX = Bytes("asset")
+
+# Ticket box, compact (v2): 't' + 4-byte index -> [AssetID 8][Owner 32][Status 1]
+# with [ResalePrice 8] appended only while the ticket is Listed.
+# Legacy (v1): 'tickets' + Itob(index) -> always 49 bytes, rewritten to v2 by
+# migrate_tickets. Callers reference the v2 key, plus the v1 key for tickets
+# that have not been migrated yet.
+TICKET_PREFIX = Bytes("t")
+TICKET_PREFIX_V1 = Bytes("tickets")
+TICKET_RECORD_SIZE = Int(41)
+MAX_TICKET_INDEX = Int(0xFFFFFFFF)
+
+def ticket_key_v2(index):
+    return Concat(TICKET_PREFIX, Extract(Itob(index), Int(4), Int(4)))
+
+def ticket_key_v1(index):
+    return Concat(TICKET_PREFIX_V1, Itob(index))
+
+# Every ticket lookup goes through here: the v2 key keeps only the low 4
+# bytes of the index, so a larger index would alias another ticket.
+@Subroutine(TealType.bytes)
+def ticket_key(index: Expr) -> Expr:
+    return Seq(
+        Assert(index <= MAX_TICKET_INDEX),
+        (compact := App.box_length(ticket_key_v2(index))),
+        If(compact.hasValue(), ticket_key_v2(index), ticket_key_v1(index)),
+    )
+
+# Set by cancel_event; refund_batch only runs once it exists
+# Value: [Cursor 8][Refunded 8][RefundedAmount 8]
+REFUND = Bytes("refund")
+
+# Claims and resales stop once the event is called off: a resale buyer would
+# pay the seller any price for a ticket that only refunds Price.
+def assert_not_cancelled():
+    return Seq(
+        (refund := App.box_length(REFUND)),
+        Assert(Not(refund.hasValue())),
+    )
+
+# Once cancelled, the app's balance is owed to ticket holders until
+# refund_batch has moved the cursor past every sold ticket
+def assert_refunds_settled():
+    return Seq(
+        (refund := App.box_length(REFUND)),
+        If(refund.hasValue()).Then(
+            Assert(Btoi(App.box_extract(REFUND, Int(0), Int(8))) >= App.globalGet(SOLD)),
+        ),
+    )
+
+# Unit name of tickets minted by issue_tickets: never paid for, never refunded
+COMP_UNIT = Bytes("COMP")
+
+def ticket_refund(asset_id):
+    return Seq(
+        (unit := AssetParam.unitName(asset_id)),
+        If(And(unit.hasValue(), unit.value() == COMP_UNIT), Int(0), App.globalGet(PRICE)),
+    )
+
+def clear_resale_price(box_key):
+    # v2 boxes drop the price field, v1 boxes keep it zeroed
+    return If(
+        Len(box_key) == Len(TICKET_PREFIX) + Int(4),
+        App.box_resize(box_key, TICKET_RECORD_SIZE),
+        App.box_replace(box_key, TICKET_RECORD_SIZE, Itob(Int(0))),
+    )
+
 @router.method
 def create_event(price: abi.Uint64, supply: abi.Uint64, deadline: abi.Uint64):
     return Seq(
@@ -31,20 +152,23 @@ def create_event(price: abi.Uint64, supply: abi.Uint64, deadline: abi.Uint64):
         App.globalPut(DEADLINE, deadline.get()),
     )
 
-@router.method
-def buy_ticket(payment: abi.PaymentTransaction):
-    sold_count = App.globalGet(SOLD)
-    supply = App.globalGet(SUPPLY)
-    
+# Called by EventFactory.create_event in the inner app-create itself, so the
+# app is never observable uninitialized. The factory is the creator, hence
+# the explicit organizer.
+@router.method(no_op=CallConfig.CREATE)
+def init_event(price: abi.Uint64, supply: abi.Uint64, deadline: abi.Uint64, organizer: abi.Address):
     return Seq(
-        # Checks
-        Assert(payment.get().receiver() == Global.current_application_address()),
-        Assert(payment.get().amount() == App.globalGet(PRICE)),
-        Assert(sold_count < supply), 
-        
-        # Increment Sold
+        App.globalPut(PRICE, price.get()),
+        App.globalPut(SUPPLY, supply.get()),
+        App.globalPut(SOLD, Int(0)),
+        App.globalPut(ORGANIZER, organizer.get()),
+        App.globalPut(DEADLINE, deadline.get()),
+    )
+
+def mint_ticket(index, owner, unit_name=Bytes("TKT")):
+    return Seq(
+        Assert(index <= MAX_TICKET_INDEX),
 
-        
         # Inner Txn: Mint NFT
         InnerTxnBuilder.Begin(),
         InnerTxnBuilder.SetFields({
@@ -53,43 +177,79 @@ def buy_ticket(payment: abi.PaymentTransaction):
             TxnField.config_asset_decimals: Int(0),
             TxnField.config_asset_default_frozen: Int(0),
             TxnField.config_asset_name: Bytes("TICKET"),
-            TxnField.config_asset_unit_name: Bytes("TKT"),
+            TxnField.config_asset_unit_name: unit_name,
             TxnField.config_asset_clawback: Global.current_application_address(), # Enable Clawback for Resale
         }),
         InnerTxnBuilder.Submit(),
         
-        # Store Ticket Info in Box (Key: 'tickets' + index)
-        # Value: [AssetID 8][Owner 32][Status 1][ResalePrice 8]
-        # Total 49 bytes. Init Price = 0.
+        # Store Ticket Info in Box (Key: 't' + 4-byte index)
+        # Value: [AssetID 8][Owner 32][Status 1], 41 bytes.
+        # The resale price is only appended while Listed.
         App.box_put(
-            Concat(Bytes("tickets"), Itob(sold_count)), 
+            ticket_key_v2(index),
             Concat(
                 Itob(InnerTxn.created_asset_id()),
-                Txn.sender(),
+                owner,
                 Bytes("\x00"), # 0 = Pending
-                Itob(Int(0))   # Resale Price
             )
         ),
+    )
+
+@router.method
+def buy_ticket(payment: abi.PaymentTransaction):
+    sold_count = App.globalGet(SOLD)
+    supply = App.globalGet(SUPPLY)
+    
+    return Seq(
+        # Checks
+        Assert(payment.get().receiver() == Global.current_application_address()),
+        Assert(payment.get().amount() == App.globalGet(PRICE)),
+        Assert(sold_count < supply), 
+        
+        mint_ticket(sold_count, Txn.sender()),
         # Log AssetID for debugging
         Log(Concat(Bytes("AssetID:"), Itob(InnerTxn.created_asset_id()))),
 
         # Increment Sold
         App.globalPut(SOLD, sold_count + Int(1)),
+        count_status(NO_STATUS, Int(0), Int(1)),
+        count_revenue(payment.get().amount(), Int(0)),
+    )
+
+# Complimentary / sponsor tickets: minted Pending (unit name COMP) for each
+# recipient without a payment, at indexes Sold .. Sold + len - 1 (returns the first one).
+# The organizer funds the new assets' and boxes' minimum balance.
+@router.method
+def issue_tickets(recipients: abi.DynamicArray[abi.Address], *, output: abi.Uint64):
+    i = ScratchVar(TealType.uint64)
+    first = ScratchVar(TealType.uint64)
+
+    return Seq(
+        Assert(Txn.sender() == App.globalGet(ORGANIZER)),
+        first.store(App.globalGet(SOLD)),
+        Assert(first.load() + recipients.length() <= App.globalGet(SUPPLY)),
+        For(i.store(Int(0)), i.load() < recipients.length(), i.store(i.load() + Int(1))).Do(
+            (recipient := abi.Address()).set(recipients[i.load()]),
+            mint_ticket(first.load() + i.load(), recipient.get(), COMP_UNIT),
+        ),
+        App.globalPut(SOLD, first.load() + recipients.length()),
+        count_status(NO_STATUS, Int(0), recipients.length()),
+        output.set(first.load()),
     )
 
 @router.method
 def claim_ticket(ticket_index: abi.Uint64):
-    # Box Key: 'tickets' + index
-    box_key = Concat(Bytes("tickets"), Itob(ticket_index.get()))
-    
     # Create ScratchVars outside Seq
-    box_val = App.box_get(box_key)
+    box_key = ScratchVar(TealType.bytes)
+    box_val = App.box_get(box_key.load())
     asset_id = ScratchVar(TealType.uint64)
     owner = ScratchVar(TealType.bytes)
     status = ScratchVar(TealType.bytes)
     
     return Seq(
+        assert_not_cancelled(),
         # Read Box
+        box_key.store(ticket_key(ticket_index.get())),
         (box_val_result := box_val),
         Assert(box_val_result.hasValue()),
         
@@ -117,17 +277,19 @@ def claim_ticket(ticket_index: abi.Uint64):
         InnerTxnBuilder.Submit(),
         
         # Update Status to 'Claimed' (1)
-        App.box_replace(box_key, Int(40), Bytes("\x01")),
+        App.box_replace(box_key.load(), Int(40), Bytes("\x01")),
+        count_status(Int(0), Int(1), Int(1)),
+        App.box_put(Concat(ASSET_PREFIX, Itob(asset_id.load())), Itob(ticket_index.get())),
     )
 
 @router.method
 def check_in(ticket_index: abi.Uint64):
-    # Box Key
-    box_key = Concat(Bytes("tickets"), Itob(ticket_index.get()))
-    
+    box_key = ScratchVar(TealType.bytes)
+
     return Seq(
         # Read Box
-        (box_val := App.box_get(box_key)),
+        box_key.store(ticket_key(ticket_index.get())),
+        (box_val := App.box_get(box_key.load())),
         Assert(box_val.hasValue()),
         
         # Verify Organizer
@@ -138,13 +300,15 @@ def check_in(ticket_index: abi.Uint64):
         Assert(Extract(box_val.value(), Int(40), Int(1)) == Bytes("\x01")),
         
         # Update Status to 'Used' (2)
-        App.box_replace(box_key, Int(40), Bytes("\x02")),
+        App.box_replace(box_key.load(), Int(40), Bytes("\x02")),
+        count_status(Int(1), Int(2), Int(1)),
     )
 
 @router.method
 def withdraw_funds(amount: abi.Uint64):
     return Seq(
         Assert(Txn.sender() == App.globalGet(ORGANIZER)),
+        assert_refunds_settled(),
         InnerTxnBuilder.Begin(),
         InnerTxnBuilder.SetFields({
             TxnField.type_enum: TxnType.Payment,
@@ -164,12 +328,32 @@ def get_event_info(*, output: abi.Tuple3[abi.Uint64, abi.Uint64, abi.Uint64]):
         output.set(price, supply, sold),
     )
 
+# Everything a dashboard polls, in one call. Status counts and revenue read
+# 0 on events created before they were tracked (see GLOBAL_NUM_UINTS).
+@router.method
+def get_event_snapshot(*, output: EventSnapshot):
+    return Seq(
+        (price := abi.Uint64()).set(App.globalGet(PRICE)),
+        (supply := abi.Uint64()).set(App.globalGet(SUPPLY)),
+        (sold := abi.Uint64()).set(App.globalGet(SOLD)),
+        (deadline := abi.Uint64()).set(App.globalGet(DEADLINE)),
+        (organizer := abi.Address()).set(App.globalGet(ORGANIZER)),
+        (pending := abi.Uint64()).set(App.globalGet(STATUS_KEYS[0])),
+        (claimed := abi.Uint64()).set(App.globalGet(STATUS_KEYS[1])),
+        (used := abi.Uint64()).set(App.globalGet(STATUS_KEYS[2])),
+        (listed := abi.Uint64()).set(App.globalGet(STATUS_KEYS[3])),
+        (cancelled := abi.Uint64()).set(App.globalGet(STATUS_KEYS[4])),
+        (revenue := abi.Uint64()).set(App.globalGet(REVENUE)),
+        output.set(price, supply, sold, deadline, organizer, pending, claimed, used, listed, cancelled, revenue),
+    )
+
 
 @router.method
 def cancel_ticket(ticket_index: abi.Uint64):
-    box_key = Concat(Bytes("tickets"), Itob(ticket_index.get()))
+    box_key = ScratchVar(TealType.bytes)
     return Seq(
-        (box_val := App.box_get(box_key)),
+        box_key.store(ticket_key(ticket_index.get())),
+        (box_val := App.box_get(box_key.load())),
         Assert(box_val.hasValue()),
         
         # Verify Deadline
@@ -199,25 +383,272 @@ def cancel_ticket(ticket_index: abi.Uint64):
             InnerTxnBuilder.Submit(),
         ),
 
-        # Refund Price
-        InnerTxnBuilder.Begin(),
-        InnerTxnBuilder.SetFields({
-            TxnField.type_enum: TxnType.Payment,
-            TxnField.receiver: Txn.sender(),
-            TxnField.amount: App.globalGet(PRICE),
-            TxnField.fee: Int(0),
-        }),
-        InnerTxnBuilder.Submit(),
+        # Refund Price (nothing for complimentary tickets)
+        (refund := ScratchVar(TealType.uint64)).store(ticket_refund(asset_id.load())),
+        If(refund.load() > Int(0)).Then(
+            InnerTxnBuilder.Begin(),
+            InnerTxnBuilder.SetFields({
+                TxnField.type_enum: TxnType.Payment,
+                TxnField.receiver: Txn.sender(),
+                TxnField.amount: refund.load(),
+                TxnField.fee: Int(0),
+            }),
+            InnerTxnBuilder.Submit(),
+        ),
 
         # Update Status to Cancelled (4)
-        App.box_replace(box_key, Int(40), Bytes("\x04")),
+        App.box_replace(box_key.load(), Int(40), Bytes("\x04")),
+        count_status(Btoi(status.load()), Int(4), Int(1)),
+        count_revenue(Int(0), refund.load()),
+    )
+
+# Calls the whole event off: no further sales (Supply is capped at Sold) and
+# refund_batch becomes available to settle every ticket.
+@router.method
+def cancel_event():
+    return Seq(
+        Assert(Txn.sender() == App.globalGet(ORGANIZER)),
+        assert_not_cancelled(),
+        Pop(App.box_create(REFUND, Int(24))),
+        App.globalPut(SUPPLY, App.globalGet(SOLD)),
+    )
+
+# Refunds tickets start .. start + count - 1 (capped at Sold) of a cancelled
+# event in index order: claws the ASA back from its owner if they still hold
+# it, pays Price to the owner on record and marks the ticket Cancelled.
+# Cancelled and collected tickets are skipped, so pages can be retried. Anyone
+# may drive it; the refund cursor only advances over contiguous pages.
+@router.method
+def refund_batch(start: abi.Uint64, count: abi.Uint64, *, output: abi.Uint64):
+    i = ScratchVar(TealType.uint64)
+    end = ScratchVar(TealType.uint64)
+    box_key = ScratchVar(TealType.bytes)
+    asset_id = ScratchVar(TealType.uint64)
+    owner = ScratchVar(TealType.bytes)
+    amount = ScratchVar(TealType.uint64)
+    refunded = ScratchVar(TealType.uint64)
+    paid = ScratchVar(TealType.uint64)
+    cursor = ScratchVar(TealType.uint64)
+
+    return Seq(
+        (refund := App.box_length(REFUND)),
+        Assert(refund.hasValue()),
+
+        end.store(start.get() + count.get()),
+        If(end.load() > App.globalGet(SOLD)).Then(end.store(App.globalGet(SOLD))),
+        refunded.store(Int(0)),
+        paid.store(Int(0)),
+
+        For(i.store(start.get()), i.load() < end.load(), i.store(i.load() + Int(1))).Do(
+            box_key.store(ticket_key(i.load())),
+            (box_val := App.box_get(box_key.load())),
+            # And() evaluates both sides, so the status is only read once the box exists
+            If(box_val.hasValue()).Then(If(GetByte(box_val.value(), Int(40)) != Int(4)).Then(
+                asset_id.store(Btoi(Extract(box_val.value(), Int(0), Int(8)))),
+                owner.store(Extract(box_val.value(), Int(8), Int(32))),
+                count_status(GetByte(box_val.value(), Int(40)), Int(4), Int(1)),
+
+                # Claimed / Listed / Used: the owner holds the ASA
+                (holding := AssetHolding.balance(owner.load(), asset_id.load())),
+                If(And(holding.hasValue(), holding.value() == Int(1))).Then(
+                    InnerTxnBuilder.Begin(),
+                    InnerTxnBuilder.SetFields({
+                        TxnField.type_enum: TxnType.AssetTransfer,
+                        TxnField.xfer_asset: asset_id.load(),
+                        TxnField.asset_sender: owner.load(),
+                        TxnField.asset_receiver: Global.current_application_address(),
+                        TxnField.asset_amount: Int(1),
+                        TxnField.fee: Int(0),
+                    }),
+                    InnerTxnBuilder.Submit(),
+                ),
+
+                amount.store(ticket_refund(asset_id.load())),
+                If(amount.load() > Int(0)).Then(
+                    InnerTxnBuilder.Begin(),
+                    InnerTxnBuilder.SetFields({
+                        TxnField.type_enum: TxnType.Payment,
+                        TxnField.receiver: owner.load(),
+                        TxnField.amount: amount.load(),
+                        TxnField.fee: Int(0),
+                    }),
+                    InnerTxnBuilder.Submit(),
+                ),
+
+                App.box_replace(box_key.load(), Int(40), Bytes("\x04")),
+                clear_resale_price(box_key.load()),
+                refunded.store(refunded.load() + Int(1)),
+                paid.store(paid.load() + amount.load()),
+            )),
+        ),
+
+        cursor.store(Btoi(App.box_extract(REFUND, Int(0), Int(8)))),
+        If(And(start.get() <= cursor.load(), end.load() > cursor.load())).Then(cursor.store(end.load())),
+        App.box_replace(REFUND, Int(0), Itob(cursor.load())),
+        App.box_replace(REFUND, Int(8), Itob(Btoi(App.box_extract(REFUND, Int(8), Int(8))) + refunded.load())),
+        App.box_replace(REFUND, Int(16), Itob(Btoi(App.box_extract(REFUND, Int(16), Int(8))) + paid.load())),
+        count_revenue(Int(0), paid.load()),
+        output.set(cursor.load()),
+    )
+
+@router.method
+def collect_tickets(indexes: abi.DynamicArray[abi.Uint64], *, output: abi.Uint64):
+    i = ScratchVar(TealType.uint64)
+    index = ScratchVar(TealType.uint64)
+    box_key = ScratchVar(TealType.bytes)
+    status = ScratchVar(TealType.bytes)
+    collected = ScratchVar(TealType.uint64)
+    counter = ScratchVar(TealType.uint64)
+    archive_size = ScratchVar(TealType.uint64)
+
+    return Seq(
+        Assert(Txn.sender() == App.globalGet(ORGANIZER)),
+        # Refunds and resales are over once the deadline has passed
+        Assert(Global.latest_timestamp() >= App.globalGet(DEADLINE)),
+        # A cancelled event keeps its tickets until every one has been refunded
+        assert_refunds_settled(),
+
+        # One bit per ticket sold, not per Supply, so the box stays inside the
+        # call's I/O quota; grown if tickets were sold since the last collect
+        archive_size.store(ARCHIVE_HEADER + (App.globalGet(SOLD) + Int(7)) / Int(8)),
+        (archive := App.box_length(ARCHIVE)),
+        If(Not(archive.hasValue())).Then(
+            Pop(App.box_create(ARCHIVE, archive_size.load())),
+        ).ElseIf(archive.value() < archive_size.load()).Then(
+            App.box_resize(ARCHIVE, archive_size.load()),
+        ),
+
+        collected.store(Int(0)),
+        For(i.store(Int(0)), i.load() < indexes.length(), i.store(i.load() + Int(1))).Do(
+            (elem := abi.Uint64()).set(indexes[i.load()]),
+            index.store(elem.get()),
+            box_key.store(ticket_key(index.load())),
+            (box_val := App.box_get(box_key.load())),
+            # Already collected or never sold: skip, so retried pages are harmless
+            If(box_val.hasValue()).Then(
+                status.store(Extract(box_val.value(), Int(40), Int(1))),
+                # Only Used (2) and Cancelled (4) are terminal
+                If(Or(status.load() == Bytes("\x02"), status.load() == Bytes("\x04"))).Then(
+                    # Used: set the ticket's bit so attendance survives the box
+                    If(status.load() == Bytes("\x02")).Then(
+                        App.box_replace(
+                            ARCHIVE,
+                            ARCHIVE_HEADER + index.load() / Int(8),
+                            SetByte(
+                                App.box_extract(ARCHIVE, ARCHIVE_HEADER + index.load() / Int(8), Int(1)),
+                                Int(0),
+                                GetByte(App.box_extract(ARCHIVE, ARCHIVE_HEADER + index.load() / Int(8), Int(1)), Int(0))
+                                | (Int(1) << (index.load() % Int(8))),
+                            ),
+                        ),
+                    ),
+                    # Used counter at 0, Cancelled counter at 8
+                    counter.store(If(status.load() == Bytes("\x02"), Int(0), Int(8))),
+                    App.box_replace(
+                        ARCHIVE,
+                        counter.load(),
+                        Itob(Btoi(App.box_extract(ARCHIVE, counter.load(), Int(8))) + Int(1)),
+                    ),
+                    Pop(App.box_delete(box_key.load())),
+                    Pop(App.box_delete(Concat(ASSET_PREFIX, Extract(box_val.value(), Int(0), Int(8))))),
+                    collected.store(collected.load() + Int(1)),
+                ),
+            ),
+        ),
+
+        App.box_replace(
+            ARCHIVE,
+            Int(16),
+            Itob(Btoi(App.box_extract(ARCHIVE, Int(16), Int(8))) + collected.load()),
+        ),
+        output.set(collected.load()),
+    )
+
+@router.method
+def get_ticket_by_asset(
+    asset_id: abi.Uint64,
+    *,
+    output: abi.Tuple4[abi.Uint64, abi.Address, abi.Uint8, abi.Uint64],
+):
+    # Returns (index, owner, status, resale_price)
+    return Seq(
+        (index_val := App.box_get(Concat(ASSET_PREFIX, Itob(asset_id.get())))),
+        Assert(index_val.hasValue()),
+        (index := abi.Uint64()).set(Btoi(index_val.value())),
+        (box_val := App.box_get(ticket_key(index.get()))),
+        Assert(box_val.hasValue()),
+        (owner := abi.Address()).set(Extract(box_val.value(), Int(8), Int(32))),
+        (status := abi.Uint8()).set(GetByte(box_val.value(), Int(40))),
+        (resale_price := abi.Uint64()).set(
+            If(
+                Len(box_val.value()) > TICKET_RECORD_SIZE,
+                Btoi(Extract(box_val.value(), TICKET_RECORD_SIZE, Int(8))),
+                Int(0),
+            )
+        ),
+        output.set(index, owner, status, resale_price),
+    )
+
+# Migration for tickets sold before the reverse map existed
+@router.method
+def backfill_asset_index(indexes: abi.DynamicArray[abi.Uint64], *, output: abi.Uint64):
+    i = ScratchVar(TealType.uint64)
+    written = ScratchVar(TealType.uint64)
+
+    return Seq(
+        Assert(Txn.sender() == App.globalGet(ORGANIZER)),
+        written.store(Int(0)),
+        For(i.store(Int(0)), i.load() < indexes.length(), i.store(i.load() + Int(1))).Do(
+            (elem := abi.Uint64()).set(indexes[i.load()]),
+            (box_val := App.box_get(ticket_key(elem.get()))),
+            If(box_val.hasValue()).Then(
+                App.box_put(Concat(ASSET_PREFIX, Extract(box_val.value(), Int(0), Int(8))), Itob(elem.get())),
+                written.store(written.load() + Int(1)),
+            ),
+        ),
+        output.set(written.load()),
+    )
+
+# Rewrites v1 ticket boxes in the compact v2 layout. Indexes without a v1
+# box are skipped, so retried pages are harmless.
+@router.method
+def migrate_tickets(indexes: abi.DynamicArray[abi.Uint64], *, output: abi.Uint64):
+    i = ScratchVar(TealType.uint64)
+    index = ScratchVar(TealType.uint64)
+    migrated = ScratchVar(TealType.uint64)
+
+    return Seq(
+        Assert(Txn.sender() == App.globalGet(ORGANIZER)),
+        migrated.store(Int(0)),
+        For(i.store(Int(0)), i.load() < indexes.length(), i.store(i.load() + Int(1))).Do(
+            (elem := abi.Uint64()).set(indexes[i.load()]),
+            index.store(elem.get()),
+            (box_val := App.box_get(ticket_key_v1(index.load()))),
+            If(box_val.hasValue()).Then(
+                Assert(index.load() <= MAX_TICKET_INDEX),
+                Pop(App.box_delete(ticket_key_v1(index.load()))),
+                App.box_put(
+                    ticket_key_v2(index.load()),
+                    # Listed (3) tickets keep their price
+                    If(
+                        GetByte(box_val.value(), Int(40)) == Int(3),
+                        box_val.value(),
+                        Extract(box_val.value(), Int(0), TICKET_RECORD_SIZE),
+                    ),
+                ),
+                migrated.store(migrated.load() + Int(1)),
+            ),
+        ),
+        output.set(migrated.load()),
     )
 
 @router.method
 def list_for_resale(ticket_index: abi.Uint64, price: abi.Uint64):
-    box_key = Concat(Bytes("tickets"), Itob(ticket_index.get()))
+    box_key = ScratchVar(TealType.bytes)
     return Seq(
-        (box_val := App.box_get(box_key)),
+        assert_not_cancelled(),
+        box_key.store(ticket_key(ticket_index.get())),
+        (box_val := App.box_get(box_key.load())),
         Assert(box_val.hasValue()),
         # Check Owner match
         Assert(Txn.sender() == Extract(box_val.value(), Int(8), Int(32))),
@@ -225,36 +656,42 @@ def list_for_resale(ticket_index: abi.Uint64, price: abi.Uint64):
         Assert(Extract(box_val.value(), Int(40), Int(1)) == Bytes("\x01")),
         
         # Update Status to Listed (3)
-        App.box_replace(box_key, Int(40), Bytes("\x03")),
-        # Update Price
-        App.box_replace(box_key, Int(41), Itob(price.get())),
+        App.box_replace(box_key.load(), Int(40), Bytes("\x03")),
+        count_status(Int(1), Int(3), Int(1)),
+        # Update Price (grows a v2 box by the price field; no-op size for v1)
+        App.box_resize(box_key.load(), TICKET_RECORD_SIZE + Int(8)),
+        App.box_replace(box_key.load(), TICKET_RECORD_SIZE, Itob(price.get())),
     )
 
 @router.method
 def delist_resale_ticket(ticket_index: abi.Uint64):
-    box_key = Concat(Bytes("tickets"), Itob(ticket_index.get()))
+    box_key = ScratchVar(TealType.bytes)
     return Seq(
-        (box_val := App.box_get(box_key)),
+        box_key.store(ticket_key(ticket_index.get())),
+        (box_val := App.box_get(box_key.load())),
         Assert(box_val.hasValue()),
         Assert(Txn.sender() == Extract(box_val.value(), Int(8), Int(32))),
         # Check Status == Listed (3)
         Assert(Extract(box_val.value(), Int(40), Int(1)) == Bytes("\x03")),
         
         # Update Status to Claimed (1)
-        App.box_replace(box_key, Int(40), Bytes("\x01")),
+        App.box_replace(box_key.load(), Int(40), Bytes("\x01")),
+        count_status(Int(3), Int(1), Int(1)),
         # Reset Price
-        App.box_replace(box_key, Int(41), Itob(Int(0))),
+        clear_resale_price(box_key.load()),
     )
 
 @router.method
 def buy_resale_ticket(ticket_index: abi.Uint64, payment: abi.PaymentTransaction):
-    box_key = Concat(Bytes("tickets"), Itob(ticket_index.get()))
+    box_key = ScratchVar(TealType.bytes)
     owner = ScratchVar(TealType.bytes)
     price = ScratchVar(TealType.uint64)
     asset_id = ScratchVar(TealType.uint64)
     
     return Seq(
-        (box_val := App.box_get(box_key)),
+        assert_not_cancelled(),
+        box_key.store(ticket_key(ticket_index.get())),
+        (box_val := App.box_get(box_key.load())),
         Assert(box_val.hasValue()),
         
         owner.store(Extract(box_val.value(), Int(8), Int(32))),
@@ -291,9 +728,10 @@ def buy_resale_ticket(ticket_index: abi.Uint64, payment: abi.PaymentTransaction)
         InnerTxnBuilder.Submit(),
         
         # Update Box: Owner = Buyer, Status = 1 (Claimed), Price = 0
-        App.box_replace(box_key, Int(8), Txn.sender()),
-        App.box_replace(box_key, Int(40), Bytes("\x01")),
-        App.box_replace(box_key, Int(41), Itob(Int(0))),
+        App.box_replace(box_key.load(), Int(8), Txn.sender()),
+        App.box_replace(box_key.load(), Int(40), Bytes("\x01")),
+        count_status(Int(3), Int(1), Int(1)),
+        clear_resale_price(box_key.load()),
     )
 
 if __name__ == "__main__":
@@ -310,5 +748,11 @@ if __name__ == "__main__":
     with open("ticket_manager_clear.teal", "w") as f:
         f.write(clear_program)
 
+    # Creation schema in the ARC-56 "state" shape, for the factory's callers
+    spec = contract.dictify()
+    spec["state"] = {"schema": {
+        "global": {"ints": GLOBAL_NUM_UINTS, "bytes": GLOBAL_NUM_BYTE_SLICES},
+        "local": {"ints": 0, "bytes": 0},
+    }}
     with open("ticket_manager_contract.json", "w") as f:
-        json.dump(contract.dictify(), f, indent=4)
+        json.dump(spec, f, indent=4)
@@ -0,0 +1,470 @@
+"""
+ARC-4 codec for TicketManager, generated by tools.codegen from
+ticket_manager_contract.json. Do not edit: python compile.py regenerates it.
+"""
+
+import hashlib
+import struct
+from base64 import b32encode
+
+from algosdk.encoding import decode_address
+
+RETURN_PREFIX = bytes.fromhex("151f7c75")
+
+_U16 = struct.Struct(">H")
+_S0 = struct.Struct(">Q")
+_S1 = struct.Struct(">QQQ")
+_S2 = struct.Struct(">QQQQ32sQQQQQQ")
+_S3 = struct.Struct(">Q32sBQ")
+
+
+def _address(v):
+    return v if isinstance(v, bytes) and len(v) == 32 else decode_address(v)
+
+
+def _encode_addresses(raw):
+    """Address strings of concatenated 32-byte keys (algosdk.encoding.encode_address)."""
+    keys = [raw[i:i + 32] for i in range(0, len(raw), 32)]
+    # Key + 4-byte checksum, zero-padded to 40 bytes so each one is exactly
+    # 64 base32 characters: a single b32encode call covers the whole array
+    text = b32encode(b"".join(k + hashlib.new("sha512_256", k).digest()[-4:] + bytes(4) for k in keys)).decode()
+    return [text[i:i + 58] for i in range(0, len(text), 64)]
+
+
+# uint64
+def _pack_uint64(v):
+    return _S0.pack(v)
+
+
+def _unpack_uint64(b):
+    return _S0.unpack(b)[0]
+
+
+# address
+def _pack_address(v):
+    return _address(v)
+
+
+def _unpack_address(b):
+    return _encode_addresses(b)[0]
+
+
+# address[]
+def _pack_address_array(v):
+    return _U16.pack(len(v)) + b"".join(map(_address, v))
+
+
+def _unpack_address_array(b):
+    return _encode_addresses(b[2:2 + 32 * _U16.unpack_from(b)[0]])
+
+
+# (uint64,uint64,uint64)
+def _pack_tuple0(v):
+    return _S1.pack(v[0], v[1], v[2])
+
+
+def _unpack_tuple0(b):
+    a0, a1, a2 = _S1.unpack(b)
+    return [a0, a1, a2]
+
+
+# (uint64,uint64,uint64,uint64,address,uint64,uint64,uint64,uint64,uint64,uint64)
+def _pack_tuple1(v):
+    return _S2.pack(v[0], v[1], v[2], v[3], _address(v[4]), v[5], v[6], v[7], v[8], v[9], v[10])
+
+
+def _unpack_tuple1(b):
+    a0, a1, a2, a3, a4, a5, a6, a7, a8, a9, a10 = _S2.unpack(b)
+    return [a0, a1, a2, a3, _encode_addresses(a4)[0], a5, a6, a7, a8, a9, a10]
+
+
+# uint64[]
+def _pack_uint64_array(v):
+    return _U16.pack(len(v)) + struct.pack(f">{len(v)}Q", *v)
+
+
+def _unpack_uint64_array(b):
+    return list(struct.unpack_from(f">{_U16.unpack_from(b)[0]}Q", b, 2))
+
+
+# (uint64,address,uint8,uint64)
+def _pack_tuple2(v):
+    return _S3.pack(v[0], _address(v[1]), v[2], v[3])
+
+
+def _unpack_tuple2(b):
+    a0, a1, a2, a3 = _S3.unpack(b)
+    return [a0, _encode_addresses(a1)[0], a2, a3]
+
+
+# create_event(uint64,uint64,uint64)void
+CREATE_EVENT = bytes.fromhex("f97e1370")
+
+
+def encode_create_event(price, supply, deadline):
+    return [CREATE_EVENT, _pack_uint64(price), _pack_uint64(supply), _pack_uint64(deadline)]
+
+
+def decode_create_event(app_args):
+    return [_unpack_uint64(app_args[1]), _unpack_uint64(app_args[2]), _unpack_uint64(app_args[3])]
+
+
+# init_event(uint64,uint64,uint64,address)void
+INIT_EVENT = bytes.fromhex("5fa7d5e1")
+
+
+def encode_init_event(price, supply, deadline, organizer):
+    return [INIT_EVENT, _pack_uint64(price), _pack_uint64(supply), _pack_uint64(deadline), _pack_address(organizer)]
+
+
+def decode_init_event(app_args):
+    return [_unpack_uint64(app_args[1]), _unpack_uint64(app_args[2]), _unpack_uint64(app_args[3]), _unpack_address(app_args[4])]
+
+
+# buy_ticket(pay)void
+# Transaction arguments go in the group ahead of the call: payment (pay)
+BUY_TICKET = bytes.fromhex("653680b8")
+
+
+def encode_buy_ticket():
+    return [BUY_TICKET]
+
+
+def decode_buy_ticket(app_args):
+    return []
+
+
+# issue_tickets(address[])uint64
+ISSUE_TICKETS = bytes.fromhex("3b65f537")
+
+
+def encode_issue_tickets(recipients):
+    return [ISSUE_TICKETS, _pack_address_array(recipients)]
+
+
+def decode_issue_tickets(app_args):
+    return [_unpack_address_array(app_args[1])]
+
+
+def encode_issue_tickets_return(value):
+    return RETURN_PREFIX + _pack_uint64(value)
+
+
+def decode_issue_tickets_return(log):
+    if log[:4] != RETURN_PREFIX:
+        raise ValueError("not an ARC-4 return log")
+    return _unpack_uint64(log[4:])
+
+
+# claim_ticket(uint64)void
+CLAIM_TICKET = bytes.fromhex("eca5246a")
+
+
+def encode_claim_ticket(ticket_index):
+    return [CLAIM_TICKET, _pack_uint64(ticket_index)]
+
+
+def decode_claim_ticket(app_args):
+    return [_unpack_uint64(app_args[1])]
+
+
+# check_in(uint64)void
+CHECK_IN = bytes.fromhex("26fe2cdb")
+
+
+def encode_check_in(ticket_index):
+    return [CHECK_IN, _pack_uint64(ticket_index)]
+
+
+def decode_check_in(app_args):
+    return [_unpack_uint64(app_args[1])]
+
+
+# withdraw_funds(uint64)void
+WITHDRAW_FUNDS = bytes.fromhex("ba90ab54")
+
+
+def encode_withdraw_funds(amount):
+    return [WITHDRAW_FUNDS, _pack_uint64(amount)]
+
+
+def decode_withdraw_funds(app_args):
+    return [_unpack_uint64(app_args[1])]
+
+
+# get_event_info()(uint64,uint64,uint64)
+GET_EVENT_INFO = bytes.fromhex("ad9661f1")
+
+
+def encode_get_event_info():
+    return [GET_EVENT_INFO]
+
+
+def decode_get_event_info(app_args):
+    return []
+
+
+def encode_get_event_info_return(value):
+    return RETURN_PREFIX + _pack_tuple0(value)
+
+
+def decode_get_event_info_return(log):
+    if log[:4] != RETURN_PREFIX:
+        raise ValueError("not an ARC-4 return log")
+    return _unpack_tuple0(log[4:])
+
+
+# get_event_snapshot()(uint64,uint64,uint64,uint64,address,uint64,uint64,uint64,uint64,uint64,uint64)
+GET_EVENT_SNAPSHOT = bytes.fromhex("721b0032")
+
+
+def encode_get_event_snapshot():
+    return [GET_EVENT_SNAPSHOT]
+
+
+def decode_get_event_snapshot(app_args):
+    return []
+
+
+def encode_get_event_snapshot_return(value):
+    return RETURN_PREFIX + _pack_tuple1(value)
+
+
+def decode_get_event_snapshot_return(log):
+    if log[:4] != RETURN_PREFIX:
+        raise ValueError("not an ARC-4 return log")
+    return _unpack_tuple1(log[4:])
+
+
+# cancel_ticket(uint64)void
+CANCEL_TICKET = bytes.fromhex("0c5af95b")
+
+
+def encode_cancel_ticket(ticket_index):
+    return [CANCEL_TICKET, _pack_uint64(ticket_index)]
+
+
+def decode_cancel_ticket(app_args):
+    return [_unpack_uint64(app_args[1])]
+
+
+# cancel_event()void
+CANCEL_EVENT = bytes.fromhex("9f6e5a0c")
+
+
+def encode_cancel_event():
+    return [CANCEL_EVENT]
+
+
+def decode_cancel_event(app_args):
+    return []
+
+
+# refund_batch(uint64,uint64)uint64
+REFUND_BATCH = bytes.fromhex("79d76b42")
+
+
+def encode_refund_batch(start, count):
+    return [REFUND_BATCH, _pack_uint64(start), _pack_uint64(count)]
+
+
+def decode_refund_batch(app_args):
+    return [_unpack_uint64(app_args[1]), _unpack_uint64(app_args[2])]
+
+
+def encode_refund_batch_return(value):
+    return RETURN_PREFIX + _pack_uint64(value)
+
+
+def decode_refund_batch_return(log):
+    if log[:4] != RETURN_PREFIX:
+        raise ValueError("not an ARC-4 return log")
+    return _unpack_uint64(log[4:])
+
+
+# collect_tickets(uint64[])uint64
+COLLECT_TICKETS = bytes.fromhex("76ddf71c")
+
+
+def encode_collect_tickets(indexes):
+    return [COLLECT_TICKETS, _pack_uint64_array(indexes)]
+
+
+def decode_collect_tickets(app_args):
+    return [_unpack_uint64_array(app_args[1])]
+
+
+def encode_collect_tickets_return(value):
+    return RETURN_PREFIX + _pack_uint64(value)
+
+
+def decode_collect_tickets_return(log):
+    if log[:4] != RETURN_PREFIX:
+        raise ValueError("not an ARC-4 return log")
+    return _unpack_uint64(log[4:])
+
+
+# get_ticket_by_asset(uint64)(uint64,address,uint8,uint64)
+GET_TICKET_BY_ASSET = bytes.fromhex("5ff1a268")
+
+
+def encode_get_ticket_by_asset(asset_id):
+    return [GET_TICKET_BY_ASSET, _pack_uint64(asset_id)]
+
+
+def decode_get_ticket_by_asset(app_args):
+    return [_unpack_uint64(app_args[1])]
+
+
+def encode_get_ticket_by_asset_return(value):
+    return RETURN_PREFIX + _pack_tuple2(value)
+
+
+def decode_get_ticket_by_asset_return(log):
+    if log[:4] != RETURN_PREFIX:
+        raise ValueError("not an ARC-4 return log")
+    return _unpack_tuple2(log[4:])
+
+
+# backfill_asset_index(uint64[])uint64
+BACKFILL_ASSET_INDEX = bytes.fromhex("7481e885")
+
+
+def encode_backfill_asset_index(indexes):
+    return [BACKFILL_ASSET_INDEX, _pack_uint64_array(indexes)]
+
+
+def decode_backfill_asset_index(app_args):
+    return [_unpack_uint64_array(app_args[1])]
+
+
+def encode_backfill_asset_index_return(value):
+    return RETURN_PREFIX + _pack_uint64(value)
+
+
+def decode_backfill_asset_index_return(log):
+    if log[:4] != RETURN_PREFIX:
+        raise ValueError("not an ARC-4 return log")
+    return _unpack_uint64(log[4:])
+
+
+# migrate_tickets(uint64[])uint64
+MIGRATE_TICKETS = bytes.fromhex("1486b66e")
+
+
+def encode_migrate_tickets(indexes):
+    return [MIGRATE_TICKETS, _pack_uint64_array(indexes)]
+
+
+def decode_migrate_tickets(app_args):
+    return [_unpack_uint64_array(app_args[1])]
+
+
+def encode_migrate_tickets_return(value):
+    return RETURN_PREFIX + _pack_uint64(value)
+
+
+def decode_migrate_tickets_return(log):
+    if log[:4] != RETURN_PREFIX:
+        raise ValueError("not an ARC-4 return log")
+    return _unpack_uint64(log[4:])
+
+
+# list_for_resale(uint64,uint64)void
+LIST_FOR_RESALE = bytes.fromhex("ed3ed3ef")
+
+
+def encode_list_for_resale(ticket_index, price):
+    return [LIST_FOR_RESALE, _pack_uint64(ticket_index), _pack_uint64(price)]
+
+
+def decode_list_for_resale(app_args):
+    return [_unpack_uint64(app_args[1]), _unpack_uint64(app_args[2])]
+
+
+# delist_resale_ticket(uint64)void
+DELIST_RESALE_TICKET = bytes.fromhex("c58ce8e0")
+
+
+def encode_delist_resale_ticket(ticket_index):
+    return [DELIST_RESALE_TICKET, _pack_uint64(ticket_index)]
+
+
+def decode_delist_resale_ticket(app_args):
+    return [_unpack_uint64(app_args[1])]
+
+
+# buy_resale_ticket(uint64,pay)void
+# Transaction arguments go in the group ahead of the call: payment (pay)
+BUY_RESALE_TICKET = bytes.fromhex("db26dd61")
+
+
+def encode_buy_resale_ticket(ticket_index):
+    return [BUY_RESALE_TICKET, _pack_uint64(ticket_index)]
+
+
+def decode_buy_resale_ticket(app_args):
+    return [_unpack_uint64(app_args[1])]
+
+
+SELECTORS = {
+    "create_event": CREATE_EVENT,
+    "init_event": INIT_EVENT,
+    "buy_ticket": BUY_TICKET,
+    "issue_tickets": ISSUE_TICKETS,
+    "claim_ticket": CLAIM_TICKET,
+    "check_in": CHECK_IN,
+    "withdraw_funds": WITHDRAW_FUNDS,
+    "get_event_info": GET_EVENT_INFO,
+    "get_event_snapshot": GET_EVENT_SNAPSHOT,
+    "cancel_ticket": CANCEL_TICKET,
+    "cancel_event": CANCEL_EVENT,
+    "refund_batch": REFUND_BATCH,
+    "collect_tickets": COLLECT_TICKETS,
+    "get_ticket_by_asset": GET_TICKET_BY_ASSET,
+    "backfill_asset_index": BACKFILL_ASSET_INDEX,
+    "migrate_tickets": MIGRATE_TICKETS,
+    "list_for_resale": LIST_FOR_RESALE,
+    "delist_resale_ticket": DELIST_RESALE_TICKET,
+    "buy_resale_ticket": BUY_RESALE_TICKET,
+}
+
+# selector -> (method name, argument decoder)
+DECODERS = {
+    CREATE_EVENT: ("create_event", decode_create_event),
+    INIT_EVENT: ("init_event", decode_init_event),
+    BUY_TICKET: ("buy_ticket", decode_buy_ticket),
+    ISSUE_TICKETS: ("issue_tickets", decode_issue_tickets),
+    CLAIM_TICKET: ("claim_ticket", decode_claim_ticket),
+    CHECK_IN: ("check_in", decode_check_in),
+    WITHDRAW_FUNDS: ("withdraw_funds", decode_withdraw_funds),
+    GET_EVENT_INFO: ("get_event_info", decode_get_event_info),
+    GET_EVENT_SNAPSHOT: ("get_event_snapshot", decode_get_event_snapshot),
+    CANCEL_TICKET: ("cancel_ticket", decode_cancel_ticket),
+    CANCEL_EVENT: ("cancel_event", decode_cancel_event),
+    REFUND_BATCH: ("refund_batch", decode_refund_batch),
+    COLLECT_TICKETS: ("collect_tickets", decode_collect_tickets),
+    GET_TICKET_BY_ASSET: ("get_ticket_by_asset", decode_get_ticket_by_asset),
+    BACKFILL_ASSET_INDEX: ("backfill_asset_index", decode_backfill_asset_index),
+    MIGRATE_TICKETS: ("migrate_tickets", decode_migrate_tickets),
+    LIST_FOR_RESALE: ("list_for_resale", decode_list_for_resale),
+    DELIST_RESALE_TICKET: ("delist_resale_ticket", decode_delist_resale_ticket),
+    BUY_RESALE_TICKET: ("buy_resale_ticket", decode_buy_resale_ticket),
+}
+
+RETURN_DECODERS = {
+    "issue_tickets": decode_issue_tickets_return,
+    "get_event_info": decode_get_event_info_return,
+    "get_event_snapshot": decode_get_event_snapshot_return,
+    "refund_batch": decode_refund_batch_return,
+    "collect_tickets": decode_collect_tickets_return,
+    "get_ticket_by_asset": decode_get_ticket_by_asset_return,
+    "backfill_asset_index": decode_backfill_asset_index_return,
+    "migrate_tickets": decode_migrate_tickets_return,
+}
+
+
+def decode_call(app_args):
+    """(method name, argument values) of an app call's ApplicationArgs."""
+    name, decode = DECODERS[app_args[0]]
+    return name, decode(app_args)
@@ -42,3 +42,9 @@ if __name__ == "__main__":
             print(f"Successfully compiled and deployed {name}")
         else:
             print(f"Error: {relative_path} not found at {path}")
+
+    # TEAL -> PyTeal source maps for tools/profiler.py (needs its own process)
+    subprocess.run([sys.executable, "-m", "tools.sourcemaps"] + [name for _, name in contracts], check=True, cwd=current_dir)
+
+    # Specialized ARC-4 codecs (<name>_codec.py) from the contract JSON
+    subprocess.run([sys.executable, "-m", "tools.codegen"] + [name for _, name in contracts], check=True, cwd=current_dir)
@@ -0,0 +1,630 @@
+"""Just enough of the AVM to run the compiled contracts in tests.
+
+Interprets the TEAL the contracts compile to (the opcodes they actually emit),
+with global state, boxes, payments, assets and inner transactions. Box access
+is checked against the group's box references and I/O quota, and every
+account's minimum balance is checked when a group completes. Fees and opcode
+budgets are not modelled. A rejected group rolls back and raises AVMError,
+whose message matches what ticketing.is_logic_rejection looks for.
+
+Usage:
+    ledger = Ledger()
+    organizer = ledger.account(10_000_000)
+    app_id = ledger.create_app(organizer, "ticket_manager", "init_event", [1_000_000, 100, deadline, organizer])
+    ledger.call(organizer, app_id, "withdraw_funds", [amount])
+"""
+
+import ast
+import copy
+import os
+from hashlib import sha512
+
+from algosdk import abi, encoding, logic
+
+from tools.ticketing import BOX_IO_BUDGET, CONTRACTS_DIR, MAX_BOX_REFS, load_contract
+
+ZERO_ADDRESS = bytes(32)
+MAX_STEPS = 1_000_000
+
+ON_COMPLETION = {"NoOp": 0, "OptIn": 1, "CloseOut": 2, "ClearState": 3, "UpdateApplication": 4, "DeleteApplication": 5}
+TYPE_ENUM = {"pay": 1, "keyreg": 2, "acfg": 3, "axfer": 4, "afrz": 5, "appl": 6}
+NAMED_INTS = {**ON_COMPLETION, **TYPE_ENUM}
+ARRAY_FIELDS = ("ApplicationArgs", "ApprovalProgramPages", "ClearStateProgramPages", "Accounts", "Assets", "Applications")
+
+
+class AVMError(Exception):
+    def __init__(self, message):
+        super().__init__(f"logic eval error: {message}")
+
+
+def parse_teal(text):
+    ops, labels = [], {}
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith(("#pragma", "//")):
+            continue
+        if line.endswith(":"):
+            labels[line[:-1]] = len(ops)
+            continue
+        op, _, rest = line.partition(" ")
+        ops.append((op, rest))
+    return ops, labels
+
+
+def parse_bytes(literal):
+    if literal.startswith("0x"):
+        return bytes.fromhex(literal[2:])
+    if literal.startswith('"'):
+        return ast.literal_eval("b" + literal)
+    raise ValueError(f"unsupported byte literal {literal}")
+
+
+class Program:
+    def __init__(self, name):
+        with open(os.path.join(CONTRACTS_DIR, f"{name}_approval.teal")) as f:
+            self.ops, self.labels = parse_teal(f.read())
+        self.name = name
+
+
+class App:
+    def __init__(self, app_id, program, creator, num_uints, num_byte_slices, extra_pages):
+        self.id = app_id
+        self.program = program
+        self.creator = creator
+        self.num_uints = num_uints
+        self.num_byte_slices = num_byte_slices
+        self.extra_pages = extra_pages
+        self.state = {}
+        self.boxes = {}
+        self.address = encoding.decode_address(logic.get_application_address(app_id))
+
+
+class Account:
+    def __init__(self, balance=0):
+        self.balance = balance
+        self.holdings = {}
+        self.created_apps = set()
+
+
+class Ledger:
+    def __init__(self):
+        self.accounts = {}
+        self.apps = {}
+        self.assets = {}
+        # Uploaded program bytes -> Program, for inner app creates
+        self.programs = {}
+        self.timestamp = 1_700_000_000
+        self.next_id = 1000
+        self.logs = []
+
+    # Accounts and balances
+
+    def account(self, balance=0):
+        address = sha512(len(self.accounts).to_bytes(8, "big")).digest()[:32]
+        self.accounts[address] = Account(balance)
+        return address
+
+    def get_account(self, address):
+        return self.accounts.setdefault(address, Account())
+
+    def balance(self, address):
+        return self.get_account(address).balance
+
+    def holding(self, address, asset_id):
+        return self.get_account(address).holdings.get(asset_id)
+
+    def min_balance(self, address):
+        account = self.get_account(address)
+        total = 100_000 + 100_000 * len(account.holdings)
+        for app_id in account.created_apps:
+            app = self.apps[app_id]
+            total += 100_000 * (1 + app.extra_pages) + 28_500 * app.num_uints + 50_000 * app.num_byte_slices
+        app = self.app_by_address(address)
+        if app is not None:
+            total += sum(2500 + 400 * (len(name) + len(value)) for name, value in app.boxes.items())
+        if total == 100_000 and account.balance == 0:
+            return 0
+        return total
+
+    def app_by_address(self, address):
+        for app in self.apps.values():
+            if app.address == address:
+                return app
+        return None
+
+    def new_id(self):
+        self.next_id += 1
+        return self.next_id
+
+    def box(self, app_id, name):
+        return self.apps[app_id].boxes.get(name)
+
+    def global_state(self, app_id):
+        return {k.decode(): v for k, v in self.apps[app_id].state.items()}
+
+    # Building transactions
+
+    def method_args(self, program, method, args):
+        method = load_contract(program).get_method_by_name(method)
+        types = [arg.type for arg in method.args if not abi.is_abi_transaction_type(arg.type)]
+        return method, [method.get_selector()] + [t.encode(value) for t, value in zip(types, args)]
+
+    def payment(self, sender, receiver, amount):
+        return {"TypeEnum": TYPE_ENUM["pay"], "Sender": sender, "Receiver": receiver, "Amount": amount}
+
+    def opt_in(self, sender, asset_id):
+        self.group([{"TypeEnum": TYPE_ENUM["axfer"], "Sender": sender, "AssetReceiver": sender, "XferAsset": asset_id}])
+
+    def app_call(self, sender, app_id, method, args=(), boxes=(), on_completion=0):
+        program = self.apps[app_id].program.name
+        _, encoded = self.method_args(program, method, args)
+        return {
+            "TypeEnum": TYPE_ENUM["appl"], "Sender": sender, "ApplicationID": app_id,
+            "OnCompletion": on_completion, "ApplicationArgs": encoded, "Boxes": list(boxes),
+        }
+
+    def call(self, sender, app_id, method, args=(), boxes=(), pay=None, extra_refs=0):
+        """Call an ABI method, preceded by a payment to the app if pay is set; returns the decoded return value."""
+        boxes = list(boxes) + [(0, b"")] * extra_refs
+        call = self.app_call(sender, app_id, method, args, boxes)
+        txns = [call] if pay is None else [self.payment(sender, self.apps[app_id].address, pay), call]
+        logs = self.group(txns)[-1]
+        returns = load_contract(self.apps[app_id].program.name).get_method_by_name(method).returns
+        if returns.type == abi.Returns.VOID:
+            return None
+        return returns.type.decode(logs[-1][4:])
+
+    def create_app(self, creator, name, method, args, num_uints=10, num_byte_slices=1, extra_pages=3):
+        """Create an app by calling method, or as a bare call if method is None."""
+        app_id = self.new_id()
+        self.apps[app_id] = App(app_id, Program(name), creator, num_uints, num_byte_slices, extra_pages)
+        self.get_account(creator).created_apps.add(app_id)
+        encoded = self.method_args(name, method, args)[1] if method else []
+        txn = {"TypeEnum": TYPE_ENUM["appl"], "Sender": creator, "ApplicationID": 0, "ApplicationArgs": encoded}
+        try:
+            self.group([txn], creating=app_id)
+        except AVMError:
+            del self.apps[app_id]
+            self.get_account(creator).created_apps.discard(app_id)
+            raise
+        return app_id
+
+    # Execution
+
+    def group(self, txns, creating=None):
+        """Run txns atomically; returns each transaction's logs."""
+        snapshot = copy.deepcopy((self.accounts, {k: (a.state, a.boxes) for k, a in self.apps.items()}, self.assets, self.next_id))
+        apps_before = set(self.apps)
+        refs = [(t["ApplicationID"] or creating, n) if app == 0 else (app, n) for t in txns for app, n in t.get("Boxes", [])]
+        if len(txns) > 16 or any(len(t.get("Boxes", [])) > MAX_BOX_REFS for t in txns):
+            raise AVMError("too many transactions or box references")
+        ctx = {"group": txns, "refs": {r for r in refs if r[1]}, "quota": BOX_IO_BUDGET * len(refs), "touched": {}}
+        try:
+            logs = []
+            for i, txn in enumerate(txns):
+                logs.append(self.execute(txn, ctx, i, creating))
+            for address in self.accounts:
+                if self.accounts[address].balance < self.min_balance(address):
+                    raise AVMError(f"balance {self.accounts[address].balance} below min {self.min_balance(address)}")
+        except AVMError:
+            self.accounts, states, self.assets, self.next_id = snapshot
+            for app_id in set(self.apps) - apps_before:
+                if app_id != creating:
+                    del self.apps[app_id]
+            for app_id, (state, boxes) in states.items():
+                self.apps[app_id].state, self.apps[app_id].boxes = state, boxes
+            raise
+        return logs
+
+    def execute(self, txn, ctx, index, creating=None):
+        kind = txn["TypeEnum"]
+        sender = self.get_account(txn["Sender"])
+        if kind == TYPE_ENUM["pay"]:
+            if sender.balance < txn["Amount"]:
+                raise AVMError("overspend")
+            sender.balance -= txn["Amount"]
+            self.get_account(txn["Receiver"]).balance += txn["Amount"]
+            return []
+        if kind == TYPE_ENUM["axfer"]:
+            asset_id = txn["XferAsset"]
+            source = txn.get("AssetSender") or txn["Sender"]
+            if txn.get("AssetSender") and self.assets[asset_id]["clawback"] != txn["Sender"]:
+                raise AVMError("only the clawback can revoke")
+            receiver = self.get_account(txn["AssetReceiver"])
+            if source == txn["AssetReceiver"] and not txn.get("AssetAmount"):
+                receiver.holdings.setdefault(asset_id, 0)
+                return []
+            holdings = self.get_account(source).holdings
+            if asset_id not in receiver.holdings or holdings.get(asset_id, 0) < txn.get("AssetAmount", 0):
+                raise AVMError("asset not opted in or underflow")
+            holdings[asset_id] -= txn.get("AssetAmount", 0)
+            receiver.holdings[asset_id] += txn.get("AssetAmount", 0)
+            return []
+        if kind == TYPE_ENUM["acfg"]:
+            asset_id = self.new_id()
+            self.assets[asset_id] = {
+                "unit_name": txn.get("ConfigAssetUnitName", b""), "name": txn.get("ConfigAssetName", b""),
+                "total": txn.get("ConfigAssetTotal", 0), "clawback": txn.get("ConfigAssetClawback", ZERO_ADDRESS),
+                "creator": txn["Sender"],
+            }
+            sender.holdings[asset_id] = txn.get("ConfigAssetTotal", 0)
+            txn["CreatedAssetID"] = asset_id
+            return []
+        if kind == TYPE_ENUM["appl"]:
+            if not txn.get("ApplicationID") and creating is None:
+                creating = self.create_inner_app(txn)
+                txn["CreatedApplicationID"] = creating
+            app = self.apps[txn.get("ApplicationID") or creating]
+            logs = Evaluator(self, app, txn, ctx, index).run()
+            if txn.get("OnCompletion") == ON_COMPLETION["DeleteApplication"]:
+                del self.apps[app.id]
+                self.get_account(app.creator).created_apps.discard(app.id)
+            return logs
+        raise AVMError(f"unsupported transaction type {kind}")
+
+    def create_inner_app(self, txn):
+        approval = b"".join(txn.get("ApprovalProgramPages", []))
+        clear = b"".join(txn.get("ClearStateProgramPages", []))
+        extra_pages = txn.get("ExtraProgramPages", 0)
+        if not approval or extra_pages > 3 or len(approval) + len(clear) > 2048 * (1 + extra_pages):
+            raise AVMError(f"approval {len(approval)} + clear {len(clear)} bytes do not fit {extra_pages} extra pages")
+        if approval not in self.programs:
+            raise AVMError("unknown program bytes")
+        app_id = self.new_id()
+        self.apps[app_id] = App(
+            app_id, self.programs[approval], txn["Sender"],
+            txn.get("GlobalNumUint", 0), txn.get("GlobalNumByteSlice", 0), extra_pages,
+        )
+        self.get_account(txn["Sender"]).created_apps.add(app_id)
+        return app_id
+
+
+def as_int(value):
+    if not isinstance(value, int):
+        raise AVMError("expected uint64")
+    return value
+
+
+def as_bytes(value):
+    if not isinstance(value, bytes):
+        raise AVMError("expected bytes")
+    return value
+
+
+def itob(value):
+    return value.to_bytes(8, "big")
+
+
+class Evaluator:
+    def __init__(self, ledger, app, txn, ctx, index):
+        self.ledger = ledger
+        self.app = app
+        self.txn = txn
+        self.ctx = ctx
+        self.index = index
+        self.stack = []
+        self.scratch = [0] * 256
+        self.frames = []
+        self.logs = []
+        self.inner = None
+        self.last_inner = None
+
+    def pop(self):
+        if not self.stack:
+            raise AVMError("stack underflow")
+        return self.stack.pop()
+
+    def pop_int(self):
+        return as_int(self.pop())
+
+    def pop_bytes(self):
+        return as_bytes(self.pop())
+
+    def push(self, value):
+        if isinstance(value, bool):
+            value = int(value)
+        if isinstance(value, int) and not 0 <= value < 2**64:
+            raise AVMError("uint64 overflow")
+        self.stack.append(value)
+
+    def txn_field(self, txn, field, index=None):
+        if field == "GroupIndex":
+            return self.ctx["group"].index(txn) if txn is not self.txn else self.index
+        if field == "NumAppArgs":
+            return len(txn.get("ApplicationArgs", []))
+        if field == "ApplicationID" and txn is self.txn:
+            return txn.get("ApplicationID", 0)
+        value = txn.get(field)
+        if index is not None:
+            return txn.get(field, [])[index]
+        if value is None:
+            address_fields = ("Sender", "Receiver", "AssetReceiver", "AssetSender", "CloseRemainderTo")
+            return ZERO_ADDRESS if field in address_fields else 0
+        return value
+
+    def box_access(self, name, size=None):
+        key = (self.app.id, name)
+        if key not in self.ctx["refs"]:
+            raise AVMError(f"invalid Box reference {name!r}")
+        current = self.app.boxes.get(name)
+        touched = self.ctx["touched"]
+        touched[key] = max(touched.get(key, 0), size if size is not None else len(current or b""))
+        if sum(touched.values()) > self.ctx["quota"]:
+            raise AVMError(f"box read budget ({self.ctx['quota']}) exceeded")
+        return current
+
+    def run(self):
+        ops, labels = self.app.program.ops, self.app.program.labels
+        self.pc, steps = 0, 0
+        while True:
+            if self.pc >= len(ops):
+                raise AVMError("fell off the end of the program")
+            steps += 1
+            if steps > MAX_STEPS:
+                raise AVMError("step limit")
+            op, arg = ops[self.pc]
+            self.pc += 1
+            jump = self.step(op, arg)
+            if jump is None:
+                continue
+            if isinstance(jump, tuple):
+                if not jump[1]:
+                    raise AVMError(f"{self.app.program.name} rejected")
+                return self.logs
+            self.pc = labels[jump] if isinstance(jump, str) else jump
+
+    def step(self, op, arg):
+        s = self.stack
+        if op == "int":
+            self.push(NAMED_INTS[arg] if arg in NAMED_INTS else int(arg, 0))
+        elif op == "byte":
+            self.push(parse_bytes(arg))
+        elif op == "method":
+            sig = ast.literal_eval(arg)
+            self.push(abi.Method.from_signature(sig).get_selector())
+        elif op == "load":
+            self.push(self.scratch[int(arg)])
+        elif op == "store":
+            self.scratch[int(arg)] = self.pop()
+        elif op == "pop":
+            self.pop()
+        elif op == "dup":
+            self.push(s[-1])
+        elif op == "dupn":
+            s.extend([s[-1]] * int(arg))
+        elif op in ("==", "!="):
+            b, a = self.pop(), self.pop()
+            if type(a) is not type(b):
+                raise AVMError(f"{op} on mismatched types")
+            self.push((a == b) == (op == "=="))
+        elif op in ("<", ">", "<=", ">=", "&&", "||", "+", "-", "*", "/", "%", "|", "shl"):
+            b, a = self.pop_int(), self.pop_int()
+            if op in ("/", "%") and b == 0:
+                raise AVMError("divide by zero")
+            if op == "-" and b > a:
+                raise AVMError("- would result negative")
+            if op == "shl":
+                self.push((a << b) & (2**64 - 1))
+                return None
+            result = {
+                "<": a < b, ">": a > b, "<=": a <= b, ">=": a >= b, "&&": bool(a and b), "||": bool(a or b),
+                "+": a + b, "-": a - b, "*": a * b, "/": b and a // b, "%": b and a % b, "|": a | b,
+            }[op]
+            self.push(result)
+        elif op == "!":
+            self.push(self.pop_int() == 0)
+        elif op == "assert":
+            if not self.pop_int():
+                raise AVMError(f"assert failed at {self.app.program.name}:{self.pc}")
+        elif op == "err":
+            raise AVMError("err opcode executed")
+        elif op == "return":
+            return ("return", self.pop_int())
+        elif op == "b":
+            return arg
+        elif op == "bnz":
+            return arg if self.pop_int() else None
+        elif op == "bz":
+            return arg if not self.pop_int() else None
+        elif op == "callsub":
+            self.frames.append({"return": self.pc, "fp": len(s), "args": 0, "rets": 0, "proto": False})
+            return arg
+        elif op == "proto":
+            frame = self.frames[-1]
+            frame["args"], frame["rets"] = map(int, arg.split())
+            frame["proto"] = True
+        elif op == "frame_dig":
+            self.push(s[self.frames[-1]["fp"] + int(arg)])
+        elif op == "frame_bury":
+            value = self.pop()
+            s[self.frames[-1]["fp"] + int(arg)] = value
+        elif op == "retsub":
+            frame = self.frames.pop()
+            if frame["proto"]:
+                # Return values are the first R slots of the frame
+                fp = frame["fp"]
+                s[fp - frame["args"]:] = s[fp:fp + frame["rets"]]
+            return frame["return"]
+        elif op == "itob":
+            self.push(itob(self.pop_int()))
+        elif op == "btoi":
+            value = self.pop_bytes()
+            if len(value) > 8:
+                raise AVMError("btoi arg too long")
+            self.push(int.from_bytes(value, "big"))
+        elif op == "concat":
+            b, a = self.pop_bytes(), self.pop_bytes()
+            self.push(a + b)
+        elif op == "len":
+            self.push(len(self.pop_bytes()))
+        elif op == "extract":
+            start, length = map(int, arg.split())
+            value = self.pop_bytes()
+            end = len(value) if length == 0 else start + length
+            if end > len(value) or start > len(value):
+                raise AVMError("extract range beyond value")
+            self.push(value[start:end])
+        elif op == "extract3":
+            length, start, value = self.pop_int(), self.pop_int(), self.pop_bytes()
+            if start + length > len(value):
+                raise AVMError("extract3 range beyond value")
+            self.push(value[start:start + length])
+        elif op in ("extract_uint16", "extract_uint64"):
+            size = 2 if op == "extract_uint16" else 8
+            start, value = self.pop_int(), self.pop_bytes()
+            if start + size > len(value):
+                raise AVMError(f"{op} range beyond value")
+            self.push(int.from_bytes(value[start:start + size], "big"))
+        elif op == "getbyte":
+            i, value = self.pop_int(), self.pop_bytes()
+            if i >= len(value):
+                raise AVMError("getbyte index beyond value")
+            self.push(value[i])
+        elif op == "setbyte":
+            b, i, value = self.pop_int(), self.pop_int(), bytearray(self.pop_bytes())
+            if i >= len(value):
+                raise AVMError("setbyte index beyond value")
+            value[i] = b
+            self.push(bytes(value))
+        elif op == "getbit":
+            i, value = self.pop_int(), self.pop()
+            if isinstance(value, int):
+                self.push((value >> i) & 1)
+            else:
+                if i >= len(value) * 8:
+                    raise AVMError("getbit index beyond value")
+                self.push((value[i // 8] >> (7 - i % 8)) & 1)
+        elif op == "log":
+            value = self.pop_bytes()
+            self.logs.append(value)
+            self.ledger.logs.append(value)
+        elif op == "txn":
+            self.push(self.txn_field(self.txn, arg))
+        elif op == "txna":
+            field, i = arg.split()
+            self.push(self.txn_field(self.txn, field, int(i)))
+        elif op == "gtxns":
+            i = self.pop_int()
+            group = self.ctx["group"]
+            if i >= len(group):
+                raise AVMError("gtxns index beyond group")
+            self.push(self.txn_field(group[i], arg))
+        elif op == "global":
+            self.push(self.global_field(arg))
+        elif op == "app_global_get":
+            self.push(self.app.state.get(self.pop_bytes(), 0))
+        elif op == "app_global_put":
+            value, key = self.pop(), self.pop_bytes()
+            state = {**self.app.state, key: value}
+            uints = sum(isinstance(v, int) for v in state.values())
+            if uints > self.app.num_uints or len(state) - uints > self.app.num_byte_slices:
+                raise AVMError("store integer/bytes count exceeds schema")
+            self.app.state = state
+        elif op == "app_params_get":
+            app = self.ledger.apps.get(self.pop_int())
+            if app is None:
+                self.push(0)
+                self.push(0)
+            else:
+                self.push({"AppGlobalNumUint": app.num_uints, "AppAddress": app.address}[arg])
+                self.push(1)
+        elif op == "acct_params_get":
+            address = self.pop_bytes()
+            self.push({"AcctMinBalance": self.ledger.min_balance, "AcctBalance": self.ledger.balance}[arg](address))
+            self.push(int(address in self.ledger.accounts))
+        elif op == "asset_params_get":
+            asset = self.ledger.assets.get(self.pop_int())
+            self.push(asset[{"AssetUnitName": "unit_name"}[arg]] if asset else 0)
+            self.push(int(asset is not None))
+        elif op == "asset_holding_get":
+            asset_id, address = self.pop_int(), self.pop_bytes()
+            amount = self.ledger.holding(address, asset_id)
+            self.push(amount or 0)
+            self.push(int(amount is not None))
+        elif op.startswith("box_"):
+            self.box_op(op)
+        elif op == "itxn_begin":
+            self.inner = {"Sender": self.app.address}
+        elif op == "itxn_field":
+            value = self.pop()
+            if arg in ARRAY_FIELDS:
+                self.inner.setdefault(arg, []).append(value)
+            else:
+                self.inner[arg] = value
+        elif op == "itxn_submit":
+            inner, self.inner = self.inner, None
+            self.ledger.execute(inner, self.ctx, None)
+            self.last_inner = inner
+        elif op == "itxn":
+            self.push(self.last_inner.get(arg, 0))
+        else:
+            raise AVMError(f"unsupported opcode {op}")
+        return None
+
+    def global_field(self, field):
+        if field == "CurrentApplicationID":
+            return self.app.id
+        if field == "CurrentApplicationAddress":
+            return self.app.address
+        if field == "CreatorAddress":
+            return self.app.creator
+        if field == "LatestTimestamp":
+            return self.ledger.timestamp
+        if field == "GroupSize":
+            return len(self.ctx["group"])
+        if field == "ZeroAddress":
+            return ZERO_ADDRESS
+        if field == "MinTxnFee":
+            return 1000
+        raise AVMError(f"unsupported global {field}")
+
+    def box_op(self, op):
+        boxes = self.app.boxes
+        if op == "box_create":
+            size, name = self.pop_int(), self.pop_bytes()
+            current = self.box_access(name, size)
+            if current is not None and len(current) != size:
+                raise AVMError("box size mismatch")
+            if current is None:
+                boxes[name] = bytes(size)
+            self.push(current is None)
+        elif op == "box_get":
+            current = self.box_access(self.pop_bytes())
+            self.push(current if current is not None else b"")
+            self.push(current is not None)
+        elif op == "box_put":
+            value, name = self.pop_bytes(), self.pop_bytes()
+            current = self.box_access(name, len(value))
+            if current is not None and len(current) != len(value):
+                raise AVMError("box_put wrong size")
+            boxes[name] = value
+        elif op == "box_replace":
+            value, start, name = self.pop_bytes(), self.pop_int(), self.pop_bytes()
+            current = self.box_access(name)
+            if current is None or start + len(value) > len(current):
+                raise AVMError("box_replace out of bounds")
+            boxes[name] = current[:start] + value + current[start + len(value):]
+        elif op == "box_extract":
+            length, start, name = self.pop_int(), self.pop_int(), self.pop_bytes()
+            current = self.box_access(name)
+            if current is None or start + length > len(current):
+                raise AVMError("box_extract out of bounds")
+            self.push(current[start:start + length])
+        elif op == "box_len":
+            current = self.box_access(self.pop_bytes())
+            self.push(len(current or b""))
+            self.push(current is not None)
+        elif op == "box_del":
+            name = self.pop_bytes()
+            current = self.box_access(name)
+            boxes.pop(name, None)
+            self.push(current is not None)
+        elif op == "box_resize":
+            size, name = self.pop_int(), self.pop_bytes()
+            current = self.box_access(name, size)
+            if current is None:
+                raise AVMError("box_resize of missing box")
+            boxes[name] = (current + bytes(size))[:size]
+        else:
+            raise AVMError(f"unsupported opcode {op}")
+
@@ -0,0 +1,223 @@
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+
+from tools.algod_proxy import AppReadCache, serve, touched_apps
+
+APP_PATH = "/v2/applications/{}"
+BOX_PATH = "/v2/applications/{}/box?name=b64:dA=="
+PROXY_TOKEN = "proxy"
+ALICE = "alice"
+BOB = "bob"
+
+
+class FakeAlgod:
+    """algod over HTTP on a local port: status, blocks the test publishes, and
+    app/box reads whose responses can be held back until released."""
+
+    def __init__(self, tokens=(PROXY_TOKEN, ALICE, BOB), rnd=100):
+        self.tokens = set(tokens)
+        self.round = rnd
+        self.blocks = {}
+        self.reads = []  # (path, token) of app and box reads
+        self.release = threading.Event()
+        self.release.set()
+        self.started = threading.Event()
+        self._new_round = threading.Condition()
+
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                token = self.headers.get("X-Algo-API-Token")
+                if token not in fake.tokens:
+                    self._reply(401, {"message": "Invalid API Token"})
+                elif self.path == "/v2/status":
+                    self._reply(200, {"last-round": fake.round})
+                elif self.path.startswith("/v2/status/wait-for-block-after/"):
+                    after = int(self.path.rsplit("/", 1)[1])
+                    with fake._new_round:
+                        fake._new_round.wait_for(lambda: fake.round > after, timeout=0.5)
+                    self._reply(200, {"last-round": fake.round})
+                elif self.path.startswith("/v2/blocks/"):
+                    rnd = int(self.path.split("/")[3].split("?")[0])
+                    self._reply(200, {"block": fake.blocks.get(rnd, {})})
+                else:
+                    fake.reads.append((self.path, token))
+                    n = len(fake.reads)
+                    fake.started.set()
+                    fake.release.wait(5)
+                    self._reply(200, {"path": self.path, "n": n})
+
+            def _reply(self, status, body):
+                raw = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, args=(0.01,), daemon=True).start()
+
+    def publish(self, block):
+        with self._new_round:
+            self.blocks[self.round + 1] = block
+            self.round += 1
+            self._new_round.notify_all()
+        return self.round
+
+    def close(self):
+        self.release.set()
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def algod():
+    fake = FakeAlgod()
+    yield fake
+    fake.close()
+
+
+@pytest.fixture
+def proxy(algod):
+    server, cache, stop = serve(algod.url, port=0, token=PROXY_TOKEN)
+    threading.Thread(target=server.serve_forever, args=(0.01,), daemon=True).start()
+    proxy = SimpleNamespace(url=f"http://127.0.0.1:{server.server_address[1]}", cache=cache)
+    wait_until(lambda: metrics(proxy)["watching"])
+    yield proxy
+    stop.set()
+    server.shutdown()
+    server.server_close()
+
+
+def get(proxy, path, token=ALICE):
+    request = urllib.request.Request(proxy.url + path, headers={"X-Algo-API-Token": token})
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+
+
+def metrics(proxy):
+    return json.loads(get(proxy, "/proxy/metrics")[1])
+
+
+def publish(algod, proxy, block):
+    """Publish block and wait for the proxy's watcher to process it."""
+    rnd = algod.publish(block)
+    wait_until(lambda: metrics(proxy)["processed_round"] >= rnd)
+
+
+def inner_call_block(outer_app, inner_app):
+    return {
+        "txns": [
+            {
+                "txn": {"type": "appl", "apid": outer_app},
+                "dt": {"itx": [{"txn": {"type": "pay"}}, {"txn": {"type": "appl", "apid": inner_app}}]},
+            },
+            # Creation: the new ID is on the ApplyData
+            {"txn": {"type": "appl"}, "apid": 555},
+        ]
+    }
+
+
+def test_concurrent_reads_share_one_fetch(algod, proxy):
+    algod.release.clear()
+    path = BOX_PATH.format(7)
+    responses = []
+
+    def read():
+        responses.append(get(proxy, path))
+
+    threads = [threading.Thread(target=read) for _ in range(8)]
+    threads[0].start()
+    algod.started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    wait_until(lambda: proxy.cache.snapshot()["coalesced"] == 7)
+    algod.release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert algod.reads == [(path, ALICE)]
+    assert len(set(responses)) == 1 and len(responses) == 8
+    snapshot = metrics(proxy)
+    assert (snapshot["misses"], snapshot["coalesced"], snapshot["entries"]) == (1, 7, 1)
+
+    get(proxy, path)
+    assert metrics(proxy)["hits"] == 1 and len(algod.reads) == 1
+
+
+def test_responses_are_not_shared_across_tokens(algod, proxy):
+    path = APP_PATH.format(7)
+    assert get(proxy, path, ALICE)[0] == 200
+    assert get(proxy, path, BOB)[0] == 200
+    assert get(proxy, path, ALICE)[0] == 200
+    assert algod.reads == [(path, ALICE), (path, BOB)]
+
+    # A caller algod would reject never sees a cached response
+    status, body = get(proxy, path, "mallory")
+    assert status == 401 and b"Invalid API Token" in body
+    assert metrics(proxy)["entries"] == 2
+
+
+def test_touched_apps_walks_inner_calls():
+    assert touched_apps(inner_call_block(1, 2)) == {1, 2, 555}
+
+
+def test_inner_app_call_invalidates(algod, proxy):
+    for app_id in (1, 2, 3):
+        get(proxy, APP_PATH.format(app_id))
+        get(proxy, BOX_PATH.format(app_id))
+
+    publish(algod, proxy, inner_call_block(1, 2))
+    assert metrics(proxy)["invalidations"] == 4
+
+    for app_id in (1, 2, 3):
+        get(proxy, BOX_PATH.format(app_id))
+    assert [path for path, _ in algod.reads[6:]] == [BOX_PATH.format(1), BOX_PATH.format(2)]
+
+
+def test_fetch_racing_a_block_is_not_stored(algod, proxy):
+    algod.release.clear()
+    path = BOX_PATH.format(2)
+    thread = threading.Thread(target=get, args=(proxy, path))
+    thread.start()
+    algod.started.wait(5)
+    # The block lands while the fetch is in flight
+    publish(algod, proxy, inner_call_block(1, 2))
+    algod.release.set()
+    thread.join(5)
+
+    assert metrics(proxy)["entries"] == 0
+    get(proxy, path)
+    assert metrics(proxy)["entries"] == 1
+
+
+def test_touches_are_forgotten_once_no_fetch_predates_them():
+    cache = AppReadCache(upstream=None)
+    cache.resync(100)
+    for rnd in range(101, 1101):
+        cache.invalidate(rnd, {rnd, rnd + 1_000_000})
+    assert cache._touched == {}
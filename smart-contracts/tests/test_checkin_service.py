@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+from tools.checkin_service import CheckInService, GroupCommitJournal
+from tools.ticketing import CLAIMED, Ticket
+
+
+def service(tmp_path, tickets=4, queue_size=16):
+    gate = CheckInService(None, 1, None, None, str(tmp_path / "journal"), queue_size=queue_size)
+    for index in range(tickets):
+        gate._store(Ticket(index=index, asset_id=1000 + index, owner="", status=CLAIMED, resale_price=0))
+    gate.journal = GroupCommitJournal(gate.journal_path)
+    return gate
+
+
+def test_replay_skips_torn_and_malformed_lines(tmp_path):
+    path = tmp_path / "journal"
+    path.write_text("A 1\nA 2\nF 1\nA\nQ 3\nX 2\nA 3\nA 4")
+    assert GroupCommitJournal.replay(str(path)) == ([1, 2, 3], {1, 2})
+
+
+def test_concurrent_admits_of_one_ticket(tmp_path):
+    gate = service(tmp_path)
+
+    async def scan():
+        results = await asyncio.gather(gate.admit(2), gate.admit(2), gate.admit(3))
+        gate.journal.close()
+        return results
+
+    assert asyncio.run(scan()) == [(True, None), (False, "already-used"), (True, None)]
+    assert GroupCommitJournal.replay(gate.journal_path) == ([2, 3], set())
+
+
+def test_failed_commit_releases_the_ticket(tmp_path):
+    gate = service(tmp_path)
+
+    def broken(data):
+        raise OSError("disk full")
+
+    async def scan():
+        gate.journal.write, write = broken, gate.journal.write
+        with pytest.raises(OSError):
+            await gate.admit(1)
+        gate.journal.write = write
+        result = await gate.admit(1)
+        gate.journal.close()
+        return result
+
+    assert asyncio.run(scan()) == (True, None)
+    assert GroupCommitJournal.replay(gate.journal_path) == ([1], set())
+
+
+def test_full_queue_holds_the_scanner(tmp_path):
+    gate = service(tmp_path, queue_size=1)
+
+    async def scan():
+        assert await gate.admit(0) == (True, None)
+        # Journaled, but held until the chain writer takes from the queue
+        blocked = asyncio.create_task(gate.admit(1))
+        await asyncio.sleep(0.05)
+        assert not blocked.done()
+        assert gate.used.test(1)
+        assert gate.queue.get_nowait() == 0
+        assert await asyncio.wait_for(blocked, 1) == (True, None)
+        gate.journal.close()
+
+    asyncio.run(scan())
@@ -0,0 +1,49 @@
+import importlib
+
+import pytest
+from algosdk import abi, account
+
+from algokit_contracts.ticket_manager_codec import decode_issue_tickets, encode_issue_tickets
+from tools.codec_bench import sample
+from tools.codegen import RETURN_PREFIX, arg_type, codec_path, generate
+from tools.ticketing import load_contract
+
+CONTRACTS = ["ticket_manager", "event_factory"]
+
+
+def methods():
+    params = []
+    for name in CONTRACTS:
+        codec = importlib.import_module(f"algokit_contracts.{name}_codec")
+        params += [pytest.param(codec, m, id=f"{name}.{m.name}") for m in load_contract(name).methods]
+    return params
+
+
+@pytest.mark.parametrize("name", CONTRACTS)
+def test_codec_is_up_to_date(name):
+    with open(codec_path(name)) as f:
+        assert f.read() == generate(name)
+
+
+@pytest.mark.parametrize("codec, method", methods())
+@pytest.mark.parametrize("seed", [0, 1, 7])
+def test_codec_matches_algosdk(codec, method, seed):
+    types = [arg_type(a) for a in method.args if not abi.is_abi_transaction_type(a.type)]
+    args = [sample(t, seed + i) for i, t in enumerate(types)]
+    app_args = [method.get_selector()] + [t.encode(v) for t, v in zip(types, args)]
+    assert getattr(codec, f"encode_{method.name}")(*args) == app_args
+    assert getattr(codec, f"decode_{method.name}")(app_args) == [t.decode(raw) for t, raw in zip(types, app_args[1:])]
+    assert codec.decode_call(app_args)[0] == method.name
+
+    if method.returns.type != abi.Returns.VOID:
+        returns = method.returns.type
+        value = sample(returns, seed)
+        log = RETURN_PREFIX + returns.encode(value)
+        assert getattr(codec, f"encode_{method.name}_return")(value) == log
+        assert getattr(codec, f"decode_{method.name}_return")(log) == returns.decode(log[4:])
+
+
+@pytest.mark.parametrize("count", [0, 1, 5])
+def test_address_array_round_trip(count):
+    recipients = [account.generate_account()[1] for _ in range(count)]
+    assert decode_issue_tickets(encode_issue_tickets(recipients)) == [recipients]
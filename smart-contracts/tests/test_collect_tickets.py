@@ -0,0 +1,36 @@
+from tools import collect_tickets
+from tools.collect_tickets import ARCHIVE_BOX, archive_funding, archive_size
+from tools.ticketing import USED, Ticket, box_mbr, pack_tickets
+
+
+def test_archive_funding_covers_creation_and_growth():
+    assert archive_funding(None, 100) == box_mbr(len(ARCHIVE_BOX), 24 + 13)
+    assert archive_funding(bytes(archive_size(100)), 100) == 0
+    assert archive_funding(bytes(archive_size(100)), 120) == 400 * 2
+
+
+def test_first_group_pays_for_the_archive(monkeypatch):
+    payments = []
+
+    def fake_submit_groups(client, sender, signer, app_id, method, pages, call_args, fund=None, progress=None):
+        groups = [pages[i:i + 15] for i in range(0, len(pages), 15)]
+        payments.extend(fund(group) for group in groups)
+        return [len(page) for page in pages], 0, 0.0
+
+    monkeypatch.setattr(collect_tickets, "submit_groups", fake_submit_groups)
+    ticket = Ticket(index=0, asset_id=1000, owner="", status=USED, resale_price=0)
+    pages = [[ticket]] * 20
+    assert collect_tickets.submit(None, None, None, 1, pages, 100, funding=5000)[0] == 20
+    assert payments == [5000, None]
+
+
+def test_migrated_tickets_pack_more_per_call():
+    def tickets(version):
+        return [Ticket(index=i, asset_id=1000 + i, owner="", status=USED, resale_price=0, version=version) for i in range(12)]
+
+    def sizes(version):
+        return [len(page) for page in pack_tickets(tickets(version), fixed_boxes=2, fixed_bytes=archive_size(12) + 24)]
+
+    # Ticket box + reverse-map box, not the v1 key as well
+    assert sizes(2) == [3, 3, 3, 3]
+    assert sizes(None) == sizes(1) == [2] * 6
@@ -0,0 +1,73 @@
+import json
+import os
+
+from algokit_contracts.ticket_manager import GLOBAL_NUM_BYTE_SLICES, GLOBAL_NUM_UINTS
+from tests.avm import Ledger, Program
+from tools.factory import (
+    APPROVAL_BOX,
+    CHUNK_SIZE,
+    CLEAR_BOX,
+    DEFAULT_FUNDING,
+    UPLOAD_BOX,
+    UPLOAD_SIZE,
+    app_mbr,
+    extra_pages,
+)
+from tools.ticketing import BOX_IO_BUDGET, CONTRACTS_DIR, box_mbr
+
+
+def io_refs(named, size):
+    """Empty refs to add so named boxes can read size bytes."""
+    return max(0, -(-size // BOX_IO_BUDGET) - named)
+
+
+def test_upload_and_create_event_with_clear_on_an_extra_page():
+    # Approval alone fits three pages; approval + clear needs the fourth
+    approval = b"\x0a" + bytes(3 * 2048 - 11)
+    clear = b"\x0a" + bytes(99)
+    assert extra_pages(len(approval), len(clear)) == 3
+
+    ledger = Ledger()
+    creator = ledger.account(100_000_000)
+    factory_id = ledger.create_app(creator, "event_factory", None, (), num_uints=1, num_byte_slices=0, extra_pages=0)
+    factory = ledger.apps[factory_id].address
+    ledger.programs[approval] = Program("ticket_manager")
+
+    ledger.group([ledger.payment(
+        creator, factory,
+        100_000 + box_mbr(len(APPROVAL_BOX), len(approval)) + box_mbr(len(CLEAR_BOX), len(clear))
+        + box_mbr(len(UPLOAD_BOX), UPLOAD_SIZE),
+    )])
+    boxes = [(0, APPROVAL_BOX), (0, CLEAR_BOX), (0, UPLOAD_BOX)]
+    size = len(approval) + len(clear) + UPLOAD_SIZE
+    ledger.call(creator, factory_id, "init_program", [len(approval), len(clear)], boxes=boxes, extra_refs=io_refs(3, size))
+    for is_clear, name, program in ((False, APPROVAL_BOX, approval), (True, CLEAR_BOX, clear)):
+        for offset in range(0, len(program), CHUNK_SIZE):
+            ledger.call(
+                creator, factory_id, "write_program", [is_clear, offset, program[offset:offset + CHUNK_SIZE]],
+                boxes=[(0, name), (0, UPLOAD_BOX)], extra_refs=io_refs(2, len(program) + UPLOAD_SIZE),
+            )
+
+    organizer = ledger.account(10_000_000)
+    name = "Campus Fest"
+    registry_key = (0).to_bytes(8, "big")
+    mbr = app_mbr(extra_pages(len(approval), len(clear)), 10, 1) + box_mbr(len(registry_key), 8 + len(name))
+    boxes = [(0, APPROVAL_BOX), (0, CLEAR_BOX), (0, UPLOAD_BOX), (0, registry_key)]
+    size = len(approval) + len(clear) + UPLOAD_SIZE + 8 + len(name)
+    app_id = ledger.call(
+        organizer, factory_id, "create_event", [name, 1_000_000, 100, ledger.timestamp + 3600],
+        boxes=boxes, pay=mbr + DEFAULT_FUNDING, extra_refs=io_refs(4, size),
+    )
+
+    assert ledger.apps[app_id].extra_pages == 3
+    assert (ledger.apps[app_id].num_uints, ledger.apps[app_id].num_byte_slices) == (GLOBAL_NUM_UINTS, GLOBAL_NUM_BYTE_SLICES)
+    assert ledger.global_state(app_id)["Supply"] == 100
+    assert ledger.box(factory_id, registry_key) == app_id.to_bytes(8, "big") + name.encode()
+    assert ledger.balance(ledger.apps[app_id].address) == DEFAULT_FUNDING
+
+
+def test_contract_json_exports_the_creation_schema():
+    # The frontend reads it instead of copying GLOBAL_NUM_UINTS
+    with open(os.path.join(CONTRACTS_DIR, "ticket_manager_contract.json")) as f:
+        schema = json.load(f)["state"]["schema"]["global"]
+    assert schema == {"ints": GLOBAL_NUM_UINTS, "bytes": GLOBAL_NUM_BYTE_SLICES}
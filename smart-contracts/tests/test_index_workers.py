@@ -0,0 +1,64 @@
+import json
+import os
+
+from tools import index_workers
+from tools.index_workers import Coordinator, HashRing, run_once
+
+APPS = list(range(1000, 1040))
+CRASHING_APP = 1013
+FAILING_APP = 1021
+
+
+def fake_sync(client, app_id, out_dir):
+    marker = os.path.join(out_dir, "crashed")
+    if app_id == CRASHING_APP and not os.path.exists(marker):
+        # First worker to reach the app dies mid-pass; its replacement succeeds
+        open(marker, "w").close()
+        os._exit(1)
+    if app_id == FAILING_APP and os.path.exists(os.path.join(out_dir, "fail")):
+        raise RuntimeError("algod unavailable")
+    with open(os.path.join(out_dir, f"{app_id}.json"), "w") as f:
+        json.dump({"app_id": app_id}, f)
+    return 1
+
+
+def test_ring_moves_only_the_new_workers_apps():
+    ring = HashRing(["w0", "w1", "w2"])
+    before = {app: ring.owner(app) for app in APPS}
+    ring.add("w3")
+    moved = {app for app in APPS if ring.owner(app) != before[app]}
+    assert moved and all(ring.owner(app) == "w3" for app in moved)
+
+
+def patch_workers(monkeypatch):
+    # Workers are forked, so the patches carry into them
+    monkeypatch.setattr(index_workers, "sync_app", fake_sync)
+    monkeypatch.setattr(index_workers, "get_algod_client", lambda: None)
+    monkeypatch.setattr(index_workers, "list_registered_events", lambda client, factory_id, start: [
+        (i, app_id, f"event {i}") for i, app_id in enumerate(APPS) if i >= start
+    ])
+
+
+def test_once_respawns_a_worker_for_a_crashed_shard(monkeypatch, tmp_path):
+    patch_workers(monkeypatch)
+    coordinator = Coordinator(None, 1, str(tmp_path), interval=0.1, once=True)
+
+    passes, unsynced = run_once(coordinator, 3)
+
+    assert unsynced == set()
+    assert "w3" in passes
+    assert {int(name[:-5]) for name in os.listdir(tmp_path) if name.endswith(".json")} == set(APPS)
+
+
+
+def test_once_reports_apps_that_failed_to_sync(monkeypatch, tmp_path):
+    patch_workers(monkeypatch)
+    # No worker crashes this time, but FAILING_APP raises inside sync_app
+    open(tmp_path / "crashed", "w").close()
+    open(tmp_path / "fail", "w").close()
+    coordinator = Coordinator(None, 1, str(tmp_path), interval=0.1, once=True)
+
+    passes, unsynced = run_once(coordinator, 3)
+
+    assert unsynced == {FAILING_APP}
+    assert sum(apps for apps, _, _ in passes.values()) == len(APPS) - 1
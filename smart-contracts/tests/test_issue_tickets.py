@@ -0,0 +1,83 @@
+import base64
+from types import SimpleNamespace
+
+import pytest
+from algosdk import account, transaction
+from algosdk.error import AlgodHTTPError
+
+from tools import issue_tickets
+from tools.ticketing import Journal
+
+LAST_VALID = 1_001
+
+
+class FakeClient:
+    """algod for one issue() pass: send_transactions fails the way it is told to."""
+
+    def __init__(self, send_error=None, status_error=None):
+        self.send_error = send_error
+        self.status_error = status_error
+        self.sent = []
+
+    def suggested_params(self):
+        return transaction.SuggestedParams(
+            fee=0, first=1, last=LAST_VALID, gh=base64.b64encode(bytes(32)).decode(), min_fee=1000
+        )
+
+    def send_transactions(self, stxns):
+        self.sent.append(stxns[0].get_txid())
+        if self.send_error:
+            raise self.send_error
+        return self.sent[-1]
+
+    def status(self):
+        if self.status_error:
+            raise self.status_error
+        return {"last-round": 1}
+
+    def pending_transaction_info(self, txid):
+        return {"confirmed-round": 2}
+
+
+def run(tmp_path, monkeypatch, client):
+    monkeypatch.setattr(issue_tickets, "read_global_state", lambda client, app_id: {"Sold": 5, "Supply": 100})
+    private_key, sender = account.generate_account()
+    recipients = [account.generate_account()[1] for _ in range(3)]
+    path = str(tmp_path / "progress")
+    journal = Journal(path)
+    try:
+        return issue_tickets.issue(
+            client, 1, sender, SimpleNamespace(private_key=private_key), recipients, journal, [0, 1, 2],
+            workers=1, retries=0,
+        )
+    finally:
+        journal.close()
+
+
+def test_group_is_journaled_before_it_is_sent(tmp_path, monkeypatch):
+    # The process dies inside send_transactions: the next run must still
+    # know the group may have landed
+    client = FakeClient(send_error=ConnectionResetError())
+    with pytest.raises(ConnectionResetError):
+        run(tmp_path, monkeypatch, client)
+    assert issue_tickets.replay(str(tmp_path / "progress")) == (set(), [(0, 3, 5, client.sent[0], LAST_VALID)])
+
+
+def test_rejected_send_is_journaled(tmp_path, monkeypatch):
+    client = FakeClient(send_error=AlgodHTTPError("TransactionPool.Remember: rejected by logic", code=400))
+    with pytest.raises(RuntimeError, match="No group confirmed"):
+        run(tmp_path, monkeypatch, client)
+    assert issue_tickets.replay(str(tmp_path / "progress")) == (set(), [])
+
+
+def test_node_errors_while_settling_are_not_fatal(tmp_path, monkeypatch):
+    client = FakeClient(status_error=AlgodHTTPError("service unavailable", code=503))
+    with pytest.raises(RuntimeError, match="No group confirmed"):
+        run(tmp_path, monkeypatch, client)
+    _, sent = issue_tickets.replay(str(tmp_path / "progress"))
+    assert [txid for *_, txid, _ in sent] == client.sent
+
+
+def test_confirmed_group(tmp_path, monkeypatch):
+    assert run(tmp_path, monkeypatch, FakeClient())[0] == 3
+    assert issue_tickets.replay(str(tmp_path / "progress")) == ({0, 1, 2}, [])
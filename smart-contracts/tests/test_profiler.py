@@ -0,0 +1,88 @@
+import base64
+import os
+
+import pytest
+
+from tools.profiler import PUYA_SOURCES, ProgramMap, iter_traces, profile
+from tools.ticketing import CONTRACTS_DIR
+
+FACTORY_ID = 10
+EVENT_ID = 11
+CREATE_EVENT = bytes.fromhex("aabbccdd")
+INIT_EVENT = bytes.fromhex("11223344")
+
+
+def b64(raw):
+    return base64.b64encode(raw).decode()
+
+
+def steps(*pcs):
+    return [{"pc": pc} for pc in pcs]
+
+
+def simulate_response():
+    # EventFactory.create_event: pay the factory, then an inner app create running init_event
+    inner_create = {"txn": {"txn": {"type": "appl", "apaa": [b64(INIT_EVENT)]}}, "application-index": EVENT_ID}
+    inner_pay = {"txn": {"txn": {"type": "pay"}}}
+    return {
+        "txn-groups": [{
+            "txn-results": [
+                {"txn-result": {"txn": {"txn": {"type": "pay"}}}, "exec-trace": {}},
+                {
+                    "txn-result": {
+                        "txn": {"txn": {"type": "appl", "apid": FACTORY_ID, "apaa": [b64(CREATE_EVENT), b64(b"x")]}},
+                        "inner-txns": [inner_create, inner_pay],
+                    },
+                    "exec-trace": {
+                        "approval-program-trace": steps(1, 2, 3),
+                        "inner-trace": [{"approval-program-trace": steps(7, 8)}, {}],
+                    },
+                    "app-budget-consumed": 900,
+                },
+            ],
+        }],
+    }
+
+
+def test_simulate_walks_inner_app_calls():
+    traces = list(iter_traces(simulate_response()))
+    assert traces == [(CREATE_EVENT, [1, 2, 3], 900), (INIT_EVENT, [7, 8], None)]
+
+
+def test_simulate_filters_by_app_id():
+    assert list(iter_traces(simulate_response(), EVENT_ID)) == [(INIT_EVENT, [7, 8], None)]
+    assert list(iter_traces(simulate_response(), FACTORY_ID)) == [(CREATE_EVENT, [1, 2, 3], 900)]
+
+
+def test_dryrun_selector_comes_from_the_request():
+    request = {"txns": [{"txn": {"type": "appl", "apid": EVENT_ID, "apaa": [b64(INIT_EVENT)]}}]}
+    response = {"txns": [{"app-call-trace": steps(4, 5), "budget-consumed": 12}]}
+    assert list(iter_traces(response, EVENT_ID, request)) == [(INIT_EVENT, [4, 5], 12)]
+    assert list(iter_traces(response)) == [(None, [4, 5], 12)]
+    with pytest.raises(ValueError):
+        list(iter_traces(response, EVENT_ID))
+
+
+def test_budget_remainder_is_unattributed():
+    program = ProgramMap({pc: "int" for pc in range(10)}, {}, {}, set())
+    result = profile(simulate_response(), program, {CREATE_EVENT: "create_event"}, FACTORY_ID)
+    assert result["by_method"]["create_event"]["cost"] == 900
+    assert result["by_line"][("<unattributed>", None, None)]["cost"] == 897
+
+
+def test_puya_map_resolves_to_the_algorand_python_source():
+    program = ProgramMap.puya("ticket_manager")
+    source = os.path.join(CONTRACTS_DIR, PUYA_SOURCES["ticket_manager"])
+    assert program.contract_files == {source}
+    texts = {program.source_text(*program.frame(pc)[1]) for pc in program.ops if program.frame(pc)[1]}
+    assert "itxn.AssetConfig(" in texts
+
+
+def test_puya_map_rejects_a_mismatched_source(tmp_path):
+    short = tmp_path / "contract.py"
+    short.write_text("pass\n" * 10)
+    with pytest.raises(ValueError, match="wrong --source"):
+        ProgramMap.puya("ticket_manager", str(short))
+    # Its Algorand Python source is not in the tree
+    with pytest.raises(ValueError, match="pass --source"):
+        ProgramMap.puya("event_factory")
@@ -0,0 +1,106 @@
+from types import SimpleNamespace
+
+import pytest
+from algosdk import encoding
+from algosdk.error import AlgodHTTPError
+
+from tools import refund_event
+from tools.ticketing import CANCELLED, CLAIMED, Ticket
+
+OWNERS = [encoding.encode_address(bytes([i]) * 32) for i in range(4)]
+
+
+def tickets(count):
+    return {
+        i: Ticket(index=i, asset_id=1000 + i, owner=OWNERS[i % len(OWNERS)], status=CLAIMED, resale_price=0)
+        for i in range(count)
+    }
+
+
+class FakeNode:
+    """Stands in for ticketing.send_group: rejects any group holding an unpayable ticket."""
+
+    def __init__(self, unpayable=(), outages=0):
+        self.unpayable = set(unpayable)
+        self.outages = outages
+        self.refunded = set()
+        self.groups = 0
+        self.cursor = 0
+
+    def __call__(self, client, sender, signer, app_id, method, pages, call_args, fund=None):
+        self.groups += 1
+        calls = [call_args(page) for page in pages]
+        assert all(call["method_args"] == [page.start, page.count] for call, page in zip(calls, pages))
+        if self.outages:
+            self.outages -= 1
+            raise AlgodHTTPError("connection reset", code=503)
+        indexes = [i for page in pages for i, _ in page.tickets]
+        if self.unpayable & set(indexes):
+            raise AlgodHTTPError("TransactionPool.Remember: transaction rejected by logic", code=400)
+        self.refunded.update(i for page in pages for i, ticket in page.tickets if ticket is not None)
+        for page in pages:
+            if page.start <= self.cursor < page.start + page.count:
+                self.cursor = page.start + page.count
+        return SimpleNamespace(abi_results=[SimpleNamespace(return_value=self.cursor)])
+
+
+def run(monkeypatch, node, count):
+    monkeypatch.setattr(refund_event, "send_group", node)
+    monkeypatch.setattr(refund_event, "RETRY_DELAY", 0)
+    pages = refund_event.plan(tickets(count))
+    return refund_event.submit(None, OWNERS[0], None, 1, pages)
+
+
+def test_plan_packs_references():
+    pages = refund_event.plan(tickets(40))
+    assert [i for page in pages for i, _ in page.tickets] == list(range(40))
+    for page in pages:
+        assert page.refs() <= refund_event.MAX_BOX_REFS
+        assert len(page.accounts) <= refund_event.MAX_ACCOUNT_REFS
+        assert page.inner_txns == 2 * page.refunds
+
+
+def test_unpayable_ticket_is_isolated(monkeypatch):
+    node = FakeNode(unpayable={37})
+    failed = run(monkeypatch, node, 120)
+    assert failed == [37]
+    assert node.refunded == set(range(120)) - {37}
+
+
+def test_transient_errors_retry(monkeypatch):
+    node = FakeNode(outages=2)
+    assert run(monkeypatch, node, 10) == []
+    assert node.refunded == set(range(10))
+    assert node.groups == 3
+
+
+def test_persistent_outage_raises(monkeypatch):
+    node = FakeNode(outages=refund_event.MAX_RETRIES + 1)
+    with pytest.raises(AlgodHTTPError):
+        run(monkeypatch, node, 10)
+
+
+def test_settle_pages_collected_tickets(monkeypatch):
+    # 4..5 were collected before the event was called off: no box, nothing to
+    # refund, but the cursor still has to pass them to reach Sold
+    node = FakeNode()
+    sold = tickets(12)
+    collected = {4, 5}
+
+    def load_tickets(client, app_id, indexes):
+        return {
+            i: None if i in collected else sold[i]._replace(status=CANCELLED if i in node.refunded else CLAIMED)
+            for i in indexes
+        }
+
+    monkeypatch.setattr(refund_event, "send_group", node)
+    monkeypatch.setattr(refund_event, "load_tickets", load_tickets)
+    monkeypatch.setattr(refund_event, "refund_state", lambda client, app_id: {"cursor": node.cursor})
+    monkeypatch.setattr(refund_event, "read_global_state", lambda client, app_id: {"Sold": len(sold)})
+    pages = refund_event.plan(load_tickets(None, 1, range(len(sold))))
+    assert sum(page.refunds for page in pages) == len(sold) - len(collected)
+
+    state, failed, _ = refund_event.settle(None, OWNERS[0], None, 1)
+    assert failed == []
+    assert state["cursor"] == len(sold)
+    assert node.refunded == set(range(len(sold))) - collected
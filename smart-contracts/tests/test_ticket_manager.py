@@ -0,0 +1,173 @@
+from types import SimpleNamespace
+
+import pytest
+
+from tests.avm import AVMError, Ledger
+from tools.refund_event import REFUND_BOX
+from tools.ticketing import (
+    CANCELLED,
+    STATUS_NAMES,
+    USED,
+    asset_box_key,
+    decode_ticket,
+    parse_ticket_box_name,
+    ticket_box_key,
+    ticket_box_keys,
+)
+
+PRICE = 1_000_000
+ARCHIVE_BOX = b"archive"
+
+
+def refs(*indexes, version=None):
+    return [(0, name) for i in indexes for name in ticket_box_keys(i, version)]
+
+
+def new_event(supply=10):
+    ledger = Ledger()
+    organizer = ledger.account(100_000_000)
+    app_id = ledger.create_app(organizer, "ticket_manager", "init_event", [PRICE, supply, ledger.timestamp + 3600, organizer])
+    # Asset and box minimum balance for the minted tickets
+    ledger.group([ledger.payment(organizer, ledger.apps[app_id].address, 2_000_000)])
+    return SimpleNamespace(ledger=ledger, organizer=organizer, app_id=app_id)
+
+
+@pytest.fixture
+def event():
+    return new_event()
+
+
+def ticket(event, index):
+    return decode_ticket(index, event.ledger.box(event.app_id, ticket_box_key(index)))
+
+
+def sell(event, count, first=0):
+    """Buy and claim count tickets, one buyer each."""
+    ledger = event.ledger
+    buyers = []
+    for index in range(first, first + count):
+        buyer = ledger.account(5_000_000)
+        ledger.call(buyer, event.app_id, "buy_ticket", boxes=[(0, ticket_box_key(index))], pay=PRICE)
+        asset_id = ticket(event, index).asset_id
+        ledger.opt_in(buyer, asset_id)
+        boxes = refs(index) + [(0, asset_box_key(asset_id)), (0, REFUND_BOX)]
+        ledger.call(buyer, event.app_id, "claim_ticket", [index], boxes=boxes)
+        buyers.append(buyer)
+    return buyers
+
+
+def check_in(event, *indexes):
+    for index in indexes:
+        event.ledger.call(event.organizer, event.app_id, "check_in", [index], boxes=refs(index))
+
+
+def collect(event, indexes):
+    boxes = refs(*indexes, version=2) + [(0, ARCHIVE_BOX), (0, REFUND_BOX)]
+    boxes += [(0, asset_box_key(ticket(event, i).asset_id)) for i in indexes]
+    return event.ledger.call(event.organizer, event.app_id, "collect_tickets", [indexes], boxes=boxes)
+
+
+def test_refund_batch_skips_collected_tickets(event):
+    ledger = event.ledger
+    buyers = sell(event, 4)
+    check_in(event, 0, 1)
+    ledger.timestamp += 7200
+    assert collect(event, [0, 1]) == 2
+    ledger.call(event.organizer, event.app_id, "cancel_event", boxes=[(0, REFUND_BOX)])
+
+    balances = [ledger.balance(b) for b in buyers]
+    cursor = ledger.call(buyers[0], event.app_id, "refund_batch", [0, 4], boxes=refs(0, 1) + refs(2, 3, version=2) + [(0, REFUND_BOX)])
+    assert cursor == 4
+    assert [ledger.balance(b) - before for b, before in zip(buyers, balances)] == [0, 0, PRICE, PRICE]
+    assert [ticket(event, i).status for i in (2, 3)] == [CANCELLED, CANCELLED]
+
+
+def test_withdraw_and_collect_wait_for_the_refund_cursor(event):
+    ledger = event.ledger
+    buyers = sell(event, 3)
+    check_in(event, 0)
+    ledger.call(event.organizer, event.app_id, "cancel_event", boxes=[(0, REFUND_BOX)])
+    ledger.timestamp += 7200
+
+    with pytest.raises(AVMError):
+        ledger.call(event.organizer, event.app_id, "withdraw_funds", [PRICE], boxes=[(0, REFUND_BOX)])
+    with pytest.raises(AVMError):
+        collect(event, [0])
+
+    ledger.call(buyers[0], event.app_id, "refund_batch", [0, 3], boxes=refs(0, 1, 2) + [(0, REFUND_BOX)])
+    assert ticket(event, 0).status == CANCELLED
+    ledger.call(event.organizer, event.app_id, "withdraw_funds", [PRICE], boxes=[(0, REFUND_BOX)])
+    assert collect(event, [0, 1, 2]) == 3
+
+
+def test_withdraw_before_cancel(event):
+    sell(event, 1)
+    check_in(event, 0)
+    assert ticket(event, 0).status == USED
+    event.ledger.call(event.organizer, event.app_id, "withdraw_funds", [PRICE], boxes=[(0, REFUND_BOX)])
+
+
+def test_archive_is_sized_from_sold():
+    # A Supply-sized bitmap would be 512 MiB here
+    event = new_event(supply=2**32 - 1)
+    sell(event, 3)
+    check_in(event, 0, 2)
+    event.ledger.timestamp += 7200
+    assert collect(event, [0]) == 1
+    assert len(event.ledger.box(event.app_id, ARCHIVE_BOX)) == 24 + 1
+
+    # Sold after the first collect: the bitmap grows to cover them
+    sell(event, 8, first=3)
+    check_in(event, 10)
+    assert collect(event, [2, 10]) == 2
+    archive = event.ledger.box(event.app_id, ARCHIVE_BOX)
+    assert len(archive) == 24 + 2
+    assert archive[:8] == (3).to_bytes(8, "big")
+    assert archive[24:] == bytes([0b101, 0b100])
+
+
+def assert_counters_match_boxes(event):
+    app = event.ledger.apps[event.app_id]
+    counts = dict.fromkeys(range(len(STATUS_NAMES)), 0)
+    for name, value in app.boxes.items():
+        if parse_ticket_box_name(name) is not None:
+            counts[value[40]] += 1
+    # Collected tickets only survive as the archive's Used and Cancelled totals
+    archive = app.boxes.get(ARCHIVE_BOX, bytes(24))
+    counts[USED] += int.from_bytes(archive[0:8], "big")
+    counts[CANCELLED] += int.from_bytes(archive[8:16], "big")
+    state = event.ledger.global_state(event.app_id)
+    assert {status: state.get(name.capitalize(), 0) for status, name in STATUS_NAMES.items()} == counts
+
+
+def test_status_counters_follow_every_transition(event):
+    ledger = event.ledger
+    app_id = event.app_id
+
+    def step(sender, method, args=(), boxes=(), pay=None):
+        # Every call may check whether the event was cancelled
+        ledger.call(sender, app_id, method, args, boxes=list(boxes) + [(0, REFUND_BOX)], pay=pay)
+        assert_counters_match_boxes(event)
+
+    buyers = sell(event, 4)
+    assert_counters_match_boxes(event)
+    pending = ledger.account(5_000_000)
+    step(pending, "buy_ticket", boxes=[(0, ticket_box_key(4))], pay=PRICE)
+    guest = ledger.account(1_000_000)
+    step(event.organizer, "issue_tickets", [[guest]], boxes=[(0, ticket_box_key(5))])
+
+    step(buyers[0], "list_for_resale", [0, 2 * PRICE], boxes=refs(0))
+    step(buyers[0], "delist_resale_ticket", [0], boxes=refs(0))
+    step(buyers[1], "list_for_resale", [1, 2 * PRICE], boxes=refs(1))
+    reseller = ledger.account(5_000_000)
+    ledger.opt_in(reseller, ticket(event, 1).asset_id)
+    step(reseller, "buy_resale_ticket", [1], boxes=refs(1), pay=2 * PRICE)
+    step(buyers[2], "cancel_ticket", [2], boxes=refs(2))
+    step(pending, "cancel_ticket", [4], boxes=refs(4))
+    step(event.organizer, "check_in", [0], boxes=refs(0))
+
+    step(event.organizer, "cancel_event")
+    step(buyers[3], "refund_batch", [0, 6], boxes=refs(0, 1, 2, 3, 4, 5, version=2))
+    ledger.timestamp += 7200
+    collect(event, [0, 1, 2])
+    assert_counters_match_boxes(event)
@@ -0,0 +1,53 @@
+from types import SimpleNamespace
+
+from tools import ticketing
+from tools.ticketing import FUNDED_GROUP_CALLS, Journal, box_refs, submit_groups
+
+
+def test_journal_skips_a_torn_last_line(tmp_path):
+    path = str(tmp_path / "progress")
+    assert Journal.records(path) == []
+    journal = Journal(path)
+    journal.append("S", 0, 120, 7, "TXID", 1000)
+    journal.append("C", 0, 120, 7)
+    journal.write("S 120 24")
+    journal.close()
+    assert Journal.records(path) == [["S", "0", "120", "7", "TXID", "1000"], ["C", "0", "120", "7"]]
+
+
+def test_box_refs_pads_to_the_io_quota():
+    assert box_refs([b"a"], 3000) == [(0, b"a"), (0, b""), (0, b"")]
+
+
+def test_submit_groups_packs_calls_behind_the_payment(monkeypatch):
+    sent = []
+    balance = [100_000]
+
+    def fake_send(client, sender, signer, app_id, method, pages, call_args, fund=None):
+        sent.append((len(pages), fund))
+        balance[0] += fund or 0
+        return SimpleNamespace(abi_results=[SimpleNamespace(return_value=call_args(p)["method_args"][0]) for p in pages])
+
+    monkeypatch.setattr(ticketing, "send_group", fake_send)
+    monkeypatch.setattr(ticketing, "app_min_balance", lambda client, app_id: balance[0])
+    progress = []
+
+    returns, mbr_change, _ = submit_groups(
+        None, "sender", None, 1, None, list(range(40)),
+        lambda page: {"method_args": [page]},
+        fund=lambda group: 10 * len(group),
+        progress=lambda number, groups, returns: progress.append((number, groups, len(returns))),
+    )
+
+    assert returns == list(range(40))
+    assert sent == [(FUNDED_GROUP_CALLS, 150), (FUNDED_GROUP_CALLS, 150), (10, 100)]
+    assert mbr_change == 400
+    assert progress == [(1, 3, 15), (2, 3, 30), (3, 3, 40)]
+
+
+def test_submit_groups_stops_after_max_groups(monkeypatch):
+    sent = []
+    monkeypatch.setattr(ticketing, "send_group", lambda *args, **kwargs: sent.append(args[5]) or SimpleNamespace(abi_results=[]))
+    monkeypatch.setattr(ticketing, "app_min_balance", lambda client, app_id: 0)
+    submit_groups(None, "sender", None, 1, None, list(range(40)), dict, max_groups=2)
+    assert [len(pages) for pages in sent] == [16, 16]
@@ -0,0 +1,319 @@
+"""
+Read-through caching proxy for the algod app and box endpoints.
+
+Cached (everything else is passed straight through):
+  GET /v2/applications/{id}
+  GET /v2/applications/{id}/box?name=...
+  GET /v2/applications/{id}/boxes
+
+Identical concurrent requests share one upstream fetch, responses live in a
+bounded LRU, and a block watcher drops an app's entries as soon as a new round
+contains an app call (top-level or inner) to that app. Entries are keyed by
+path and a digest of the caller's token headers, so a response is only
+replayed to callers presenting the same credentials. Each fetch remembers
+the last round the watcher had processed when it started, so a response racing
+a block that touches the app is never stored after that block is seen. Only
+touches newer than the oldest in-flight fetch are kept for that check.
+
+Metrics are served as JSON at /proxy/metrics. Point the frontend's algod
+client (or any algosdk client) at the proxy instead of the node.
+
+Usage:
+    python -m tools.algod_proxy --upstream https://testnet-api.algonode.cloud --port 8980
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from tools.ticketing import DEFAULT_ALGOD_SERVER
+
+CACHED_PATH = re.compile(r"^/v2/applications/(\d+)(/box|/boxes)?$")
+FORWARDED_HEADERS = ("X-Algo-API-Token", "X-API-Key", "Accept")
+
+
+class Upstream:
+    def __init__(self, base_url, token="", timeout=10):
+        self.base_url = base_url.rstrip("/")
+        self.token = token
+        self.timeout = timeout
+
+    def get(self, path_and_query, headers=None):
+        headers = dict(headers or {})
+        # The caller's own token wins (Request would re-case the header name)
+        if self.token:
+            headers.setdefault("X-Algo-API-Token", self.token)
+        request = urllib.request.Request(self.base_url + path_and_query, headers=headers)
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return response.status, response.headers.get("Content-Type", "application/json"), response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.headers.get("Content-Type", "application/json"), e.read()
+
+    def get_json(self, path_and_query):
+        status, _, body = self.get(path_and_query)
+        if status != 200:
+            raise RuntimeError(f"GET {path_and_query} -> {status}: {body[:200]!r}")
+        return json.loads(body)
+
+
+def cache_key(path_and_query, headers):
+    # Responses are only shared between callers sending the same token, key and
+    # format; only a digest of the credentials is kept in memory
+    forwarded = "\n".join(headers.get(h, "") for h in FORWARDED_HEADERS)
+    return path_and_query, hashlib.sha256(forwarded.encode()).hexdigest()
+
+
+class Entry:
+    __slots__ = ("app_id", "round", "status", "content_type", "body")
+
+    def __init__(self, app_id, rnd, status, content_type, body):
+        self.app_id = app_id
+        self.round = rnd
+        self.status = status
+        self.content_type = content_type
+        self.body = body
+
+
+class AppReadCache:
+    def __init__(self, upstream, max_entries=10_000):
+        self.upstream = upstream
+        self.max_entries = max_entries
+        self.processed_round = 0
+        self.watching = False
+        self._synced_round = 0  # fetches stamped before the last resync are not stored
+
+        self._entries = OrderedDict()
+        self._touched = {}  # app_id -> last round with an app call to it, while a fetch may predate it
+        self._inflight = {}  # key -> (Event, [result], stamp)
+        self._lock = threading.Lock()
+        self.metrics = {
+            "hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "bypassed": 0,
+            "invalidations": 0,
+            "evictions": 0,
+            "upstream_errors": 0,
+            "rounds": 0,
+        }
+
+    def get(self, app_id, path_and_query, headers):
+        key = cache_key(path_and_query, headers)
+        with self._lock:
+            if not self.watching:
+                # Without the block watcher there is nothing to invalidate on
+                self.metrics["bypassed"] += 1
+                leader = None
+            else:
+                # Entries of a touched app are dropped as the block is seen
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    self.metrics["hits"] += 1
+                    return entry.status, entry.content_type, entry.body
+                if key in self._inflight:
+                    self.metrics["coalesced"] += 1
+                    leader = False
+                    event, result, _ = self._inflight[key]
+                else:
+                    self.metrics["misses"] += 1
+                    leader = True
+                    event, result, stamp = threading.Event(), [], self.processed_round
+                    self._inflight[key] = (event, result, stamp)
+
+        if leader is None:
+            return self.upstream.get(path_and_query, headers)
+        if not leader:
+            event.wait()
+            if result:
+                return result[0]
+            return self.upstream.get(path_and_query, headers)
+
+        try:
+            response = self.upstream.get(path_and_query, headers)
+        except Exception:
+            with self._lock:
+                self.metrics["upstream_errors"] += 1
+                del self._inflight[key]
+            event.set()
+            raise
+
+        status = response[0]
+        with self._lock:
+            del self._inflight[key]
+            # 404s are cached too: a missing box only appears via an app call
+            if (
+                status in (200, 404)
+                and self.watching
+                and stamp >= self._synced_round
+                and stamp >= self._touched.get(app_id, 0)
+            ):
+                self._entries[key] = Entry(app_id, stamp, *response)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.metrics["evictions"] += 1
+        result.append(response)
+        event.set()
+        return response
+
+    def resync(self, rnd):
+        with self._lock:
+            self.processed_round = rnd
+            self._synced_round = rnd
+            self.watching = True
+
+    def invalidate(self, rnd, app_ids):
+        with self._lock:
+            for app_id in app_ids:
+                self._touched[app_id] = rnd
+            stale = [key for key, entry in self._entries.items() if entry.app_id in app_ids]
+            for key in stale:
+                del self._entries[key]
+            self.metrics["invalidations"] += len(stale)
+            self.processed_round = rnd
+            # New fetches are stamped rnd, so only in-flight ones can predate a touch
+            oldest = min((stamp for _, _, stamp in self._inflight.values()), default=rnd)
+            self._touched = {a: r for a, r in self._touched.items() if r > oldest}
+            self.metrics["rounds"] += 1
+
+    def reset(self):
+        with self._lock:
+            self.watching = False
+            self._entries.clear()
+            self._touched.clear()
+
+    def snapshot(self):
+        with self._lock:
+            lookups = self.metrics["hits"] + self.metrics["misses"] + self.metrics["coalesced"]
+            return {
+                **self.metrics,
+                "entries": len(self._entries),
+                "hit_ratio": round(self.metrics["hits"] / lookups, 4) if lookups else 0.0,
+                "processed_round": self.processed_round,
+                "watching": self.watching,
+            }
+
+
+def touched_apps(block):
+    apps = set()
+
+    def walk(stxns):
+        for stxn in stxns or []:
+            txn = stxn.get("txn", {})
+            if txn.get("type") == "appl":
+                # apid is 0 on creation; the created ID sits on the ApplyData
+                apps.add(txn.get("apid") or stxn.get("apid", 0))
+            walk(stxn.get("dt", {}).get("itx"))
+
+    walk(block.get("txns"))
+    apps.discard(0)
+    return apps
+
+
+def watch_blocks(cache, stop):
+    upstream = cache.upstream
+    while not stop.is_set():
+        try:
+            last = upstream.get_json("/v2/status")["last-round"]
+            cache.resync(last)
+            while not stop.is_set():
+                status = upstream.get_json(f"/v2/status/wait-for-block-after/{last}")
+                for rnd in range(last + 1, status["last-round"] + 1):
+                    block = upstream.get_json(f"/v2/blocks/{rnd}?format=json")["block"]
+                    cache.invalidate(rnd, touched_apps(block))
+                last = status["last-round"]
+        except Exception as e:
+            # Rounds may have been missed: drop everything and start over
+            print(f"Block watcher error, cache disabled until resync: {e}")
+            cache.reset()
+            stop.wait(2)
+
+
+class ProxyHandler(BaseHTTPRequestHandler):
+    cache = None  # set by serve()
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        if parts.path == "/proxy/metrics":
+            self._reply(200, "application/json", json.dumps(self.cache.snapshot()).encode())
+            return
+
+        headers = {h: self.headers[h] for h in FORWARDED_HEADERS if self.headers.get(h)}
+        match = CACHED_PATH.match(parts.path)
+        try:
+            if match:
+                status, content_type, body = self.cache.get(int(match.group(1)), self.path, headers)
+            else:
+                status, content_type, body = self.cache.upstream.get(self.path, headers)
+        except Exception as e:
+            self._reply(502, "application/json", json.dumps({"message": f"upstream error: {e}"}).encode())
+            return
+        self._reply(status, content_type, body)
+
+    def _reply(self, status, content_type, body):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        # The frontend calls algod straight from the browser
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_OPTIONS(self):
+        self.send_response(204)
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("Access-Control-Allow-Headers", ", ".join(FORWARDED_HEADERS))
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(upstream_url, host="127.0.0.1", port=8980, token="", max_entries=10_000):
+    cache = AppReadCache(Upstream(upstream_url, token), max_entries)
+    stop = threading.Event()
+    threading.Thread(target=watch_blocks, args=(cache, stop), daemon=True).start()
+
+    handler = type("BoundProxyHandler", (ProxyHandler,), {"cache": cache})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server, cache, stop
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Caching read proxy for algod app/box endpoints")
+    parser.add_argument("--upstream", default=DEFAULT_ALGOD_SERVER)
+    parser.add_argument("--token", default="", help="Upstream algod API token")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8980)
+    parser.add_argument("--max-entries", type=int, default=10_000)
+    parser.add_argument("--metrics-interval", type=float, default=60, help="Seconds between metric log lines (0 = off)")
+    args = parser.parse_args()
+
+    server, cache, stop = serve(args.upstream, args.host, args.port, args.token, args.max_entries)
+    print(f"Proxying {args.upstream} on http://{args.host}:{args.port} (metrics at /proxy/metrics)")
+
+    if args.metrics_interval > 0:
+        def log_metrics():
+            while not stop.wait(args.metrics_interval):
+                print(f"[{time.strftime('%H:%M:%S')}] {json.dumps(cache.snapshot())}")
+
+        threading.Thread(target=log_metrics, daemon=True).start()
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        server.server_close()
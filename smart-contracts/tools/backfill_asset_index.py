@@ -0,0 +1,89 @@
+"""
+Backfill the asset ID -> ticket index reverse map for tickets claimed before
+claim_ticket started writing it, using TicketManager.backfill_asset_index.
+
+Each group starts with a payment covering the new boxes' minimum balance.
+Reports the app's minimum balance added.
+
+Usage:
+    python -m tools.backfill_asset_index --app-id 755123456 --dry-run
+    DEPLOYER_MNEMONIC="..." python -m tools.backfill_asset_index --app-id 755123456
+"""
+
+import argparse
+
+from tools.ticketing import (
+    ASSET_PREFIX,
+    PENDING,
+    asset_box_key,
+    box_mbr,
+    box_refs,
+    fetch_index_by_asset,
+    fetch_ticket,
+    get_algod_client,
+    get_signer,
+    list_ticket_versions,
+    load_contract,
+    pack_tickets,
+    submit_groups,
+    ticket_box_keys,
+    ticket_read_size,
+)
+
+ASSET_BOX_MBR = box_mbr(len(ASSET_PREFIX) + 8, 8)
+
+
+def plan(client, app_id):
+    missing = []
+    for index, version in list_ticket_versions(client, app_id).items():
+        ticket = fetch_ticket(client, app_id, index, version)
+        # Pending tickets get their entry from claim_ticket
+        if ticket is None or ticket.status == PENDING:
+            continue
+        if fetch_index_by_asset(client, app_id, ticket.asset_id) is None:
+            missing.append(ticket)
+    # Besides its ticket box, each ticket writes its reverse-map box
+    return pack_tickets(missing, per_ticket_boxes=1)
+
+
+def submit(client, sender, signer, app_id, pages):
+    def call_args(page):
+        return {
+            "method_args": [[ticket.index for ticket in page]],
+            "boxes": box_refs(
+                [key for ticket in page for key in ticket_box_keys(ticket.index, ticket.version)]
+                + [asset_box_key(ticket.asset_id) for ticket in page],
+                sum(ticket_read_size(ticket.version) + 8 for ticket in page),
+            ),
+        }
+
+    returns, mbr_change, _ = submit_groups(
+        client,
+        sender,
+        signer,
+        app_id,
+        load_contract("ticket_manager").get_method_by_name("backfill_asset_index"),
+        pages,
+        call_args,
+        fund=lambda group: sum(len(page) for page in group) * ASSET_BOX_MBR,
+        progress=lambda number, _, returns: print(f"  {sum(returns)} reverse-map entries written"),
+    )
+    return sum(returns), mbr_change
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill the asset ID -> ticket index reverse map")
+    parser.add_argument("--app-id", type=int, required=True, help="TicketManager app ID")
+    parser.add_argument("--dry-run", action="store_true", help="Only print what would be written")
+    args = parser.parse_args()
+
+    client = get_algod_client()
+    pages = plan(client, args.app_id)
+    missing = sum(len(page) for page in pages)
+    print(f"App {args.app_id}: {missing} claimed tickets without a reverse-map entry "
+          f"({missing * ASSET_BOX_MBR / 1_000_000:.6f} ALGO of box MBR)")
+
+    if not args.dry_run and pages:
+        sender, signer = get_signer()
+        written, added = submit(client, sender, signer, args.app_id, pages)
+        print(f"Backfilled {written} entries; app minimum balance up {added / 1_000_000:.6f} ALGO")
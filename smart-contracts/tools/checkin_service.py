@@ -0,0 +1,347 @@
+"""
+Door-gate check-in service for a single TicketManager event.
+
+Scanners connect over TCP and send one line per scan: either a ticket index
+("17") or an asset ID from the QR ("asset:755123456"). Every answer is decided
+from an in-memory copy of the ticket table plus a used-ticket bitset, so two
+gates can never admit the same ticket. Admissions are journaled (fsync, group
+commit) before the scanner gets ADMIT, and a background task flushes them to
+the contract as grouped `check_in` calls.
+
+Journal lines:  A <index>  admitted at the gate
+                F <index>  check_in confirmed on chain
+                X <index>  check_in rejected by the contract (logged, not retried)
+
+Network and algod errors are not rejections: the batch is retried with
+backoff until it goes through, so no admission is dropped.
+
+Usage:
+    DEPLOYER_MNEMONIC="..." python -m tools.checkin_service --app-id 755123456
+"""
+
+import argparse
+import asyncio
+import time
+
+from algosdk.atomic_transaction_composer import AtomicTransactionComposer
+
+from tools.ticketing import (
+    CLAIMED,
+    PENDING,
+    STATUS_NAMES,
+    USED,
+    Journal,
+    fetch_index_by_asset,
+    fetch_ticket,
+    fetch_tickets,
+    get_algod_client,
+    get_signer,
+    is_logic_rejection,
+    load_contract,
+    send_group,
+    ticket_box_keys,
+)
+
+# Backoff between retries of a batch that failed for a transient reason
+RETRY_DELAY = 1.0
+MAX_RETRY_DELAY = 30.0
+
+
+class Bitset:
+    def __init__(self, size=0):
+        self._bits = bytearray((size + 7) // 8)
+
+    def _grow(self, index):
+        needed = index // 8 + 1
+        if needed > len(self._bits):
+            self._bits.extend(bytes(needed - len(self._bits)))
+
+    def test(self, index):
+        byte = index >> 3
+        return byte < len(self._bits) and bool(self._bits[byte] & (1 << (index & 7)))
+
+    def set(self, index):
+        self._grow(index)
+        self._bits[index >> 3] |= 1 << (index & 7)
+
+    def clear(self, index):
+        if index >> 3 < len(self._bits):
+            self._bits[index >> 3] &= ~(1 << (index & 7)) & 0xFF
+
+
+class GroupCommitJournal(Journal):
+    def __init__(self, path):
+        super().__init__(path)
+        self._lines = []
+        self._waiters = []
+        self._flushing = None
+
+    @staticmethod
+    def replay(path):
+        admitted, settled = [], set()
+        for parts in Journal.records(path):
+            if len(parts) != 2 or not parts[1].isdigit():
+                continue
+            kind, index = parts[0], int(parts[1])
+            if kind == "A":
+                admitted.append(index)
+            elif kind in ("F", "X"):
+                settled.add(index)
+        return admitted, settled
+
+    async def commit(self, kind, index):
+        # Group commit: every line queued while a write+fsync is in flight
+        # goes out together in the next one.
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        self._lines.append(f"{kind} {index}\n")
+        self._waiters.append(waiter)
+        if self._flushing is None:
+            self._flushing = loop.create_task(self._flush())
+        await waiter
+
+    async def _flush(self):
+        loop = asyncio.get_running_loop()
+        try:
+            while self._lines:
+                lines, waiters = self._lines, self._waiters
+                self._lines, self._waiters = [], []
+                try:
+                    await loop.run_in_executor(None, self.write, "".join(lines))
+                except Exception as e:
+                    for waiter in waiters:
+                        waiter.set_exception(e)
+                else:
+                    for waiter in waiters:
+                        waiter.set_result(None)
+        finally:
+            self._flushing = None
+
+
+class CheckInService:
+    def __init__(self, client, app_id, sender, signer, journal_path,
+                 batch_size=AtomicTransactionComposer.MAX_GROUP_SIZE, queue_size=1024, flush_interval=0.5):
+        self.client = client
+        self.app_id = app_id
+        self.sender = sender
+        self.signer = signer
+        self.journal_path = journal_path
+        self.batch_size = min(batch_size, AtomicTransactionComposer.MAX_GROUP_SIZE)
+        self.flush_interval = flush_interval
+        self.method = load_contract("ticket_manager").get_method_by_name("check_in")
+
+        self.status = bytearray()
+        self.used = Bitset()
+        self.asset_to_index = {}
+        self.versions = {}
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.journal = None
+        self.stats = {"admitted": 0, "denied": 0, "errors": 0, "flushed": 0, "rejected": 0, "retries": 0, "batches": 0}
+
+    def _store(self, ticket):
+        if ticket.index >= len(self.status):
+            self.status.extend(bytes(ticket.index + 1 - len(self.status)))
+        self.status[ticket.index] = ticket.status
+        self.asset_to_index[ticket.asset_id] = ticket.index
+        self.versions[ticket.index] = ticket.version
+        if ticket.status == USED:
+            self.used.set(ticket.index)
+
+    async def load(self):
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        tickets = await loop.run_in_executor(None, fetch_tickets, self.client, self.app_id)
+        for ticket in tickets:
+            self._store(ticket)
+        print(f"Loaded {len(tickets)} tickets for app {self.app_id} in {time.perf_counter() - started:.2f}s")
+
+        admitted, settled = GroupCommitJournal.replay(self.journal_path)
+        unflushed = [index for index in dict.fromkeys(admitted) if index not in settled]
+        for index in admitted:
+            self.used.set(index)
+        self.journal = GroupCommitJournal(self.journal_path)
+        if unflushed:
+            print(f"Replaying {len(unflushed)} unflushed admissions from {self.journal_path}")
+        return unflushed
+
+    async def _refresh(self, index):
+        loop = asyncio.get_running_loop()
+        ticket = await loop.run_in_executor(None, fetch_ticket, self.client, self.app_id, index)
+        if ticket is not None:
+            self._store(ticket)
+        return ticket
+
+    async def resolve(self, token):
+        if token.startswith("asset:"):
+            asset_id = int(token[len("asset:"):])
+            if asset_id not in self.asset_to_index:
+                # Claimed after load(): one reverse-map lookup instead of a scan
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(None, fetch_index_by_asset, self.client, self.app_id, asset_id)
+            return self.asset_to_index[asset_id]
+        index = int(token)
+        if index < 0:
+            raise ValueError(token)
+        return index
+
+    async def admit(self, index):
+        # Fast path: pure in-memory decision
+        if self.used.test(index):
+            return False, "already-used"
+        if index >= len(self.status) or self.status[index] == PENDING:
+            # Slow path: bought or claimed after load(), re-read that one box
+            ticket = await self._refresh(index)
+            if ticket is None:
+                return False, "unknown-ticket"
+            # Another gate may have admitted it while we were waiting
+            if self.used.test(index):
+                return False, "already-used"
+        if self.status[index] != CLAIMED:
+            return False, STATUS_NAMES.get(self.status[index], "invalid-status")
+
+        # Taken before the commit so a concurrent scan of the same ticket is
+        # denied, and given back if the journal write fails. (A cancelled
+        # commit may still be written, so the bit stays set then.)
+        self.used.set(index)
+        try:
+            await self.journal.commit("A", index)
+        except Exception:
+            self.used.clear(index)
+            raise
+        # Blocks the scanner when the chain writer falls behind
+        await self.queue.put(index)
+        return True, None
+
+    async def handle_scanner(self, reader, writer):
+        while line := await reader.readline():
+            token = line.decode().strip()
+            if not token:
+                continue
+            if token == "stats":
+                reply = "STATS " + " ".join(f"{k}={v}" for k, v in self.stats.items()) + f" queued={self.queue.qsize()}"
+            else:
+                try:
+                    index = await self.resolve(token)
+                    if index is None:
+                        ok, reason = False, "unknown-asset"
+                    else:
+                        ok, reason = await self.admit(index)
+                except ValueError:
+                    reply = f"DENY {token} bad-request"
+                except Exception as e:
+                    # algod unreachable on the slow path: answer and keep the scanner connected
+                    print(f"Scan {token!r} failed: {e}")
+                    self.stats["errors"] += 1
+                    reply = f"DENY {token} unavailable"
+                else:
+                    self.stats["admitted" if ok else "denied"] += 1
+                    reply = f"ADMIT {index}" if ok else f"DENY {token} {reason}"
+            writer.write((reply + "\n").encode())
+            await writer.drain()
+        writer.close()
+
+    def _submit(self, indexes):
+        send_group(
+            self.client,
+            self.sender,
+            self.signer,
+            self.app_id,
+            self.method,
+            indexes,
+            lambda index: {"method_args": [index], "boxes": [(0, key) for key in ticket_box_keys(index, self.versions.get(index))]},
+        )
+
+    async def _settle(self, indexes):
+        loop = asyncio.get_running_loop()
+        delay = RETRY_DELAY
+        while True:
+            try:
+                await loop.run_in_executor(None, self._submit, indexes)
+                break
+            except Exception as e:
+                if not is_logic_rejection(e):
+                    print(f"check_in batch of {len(indexes)} failed ({e}); retrying in {delay:.0f}s")
+                    self.stats["retries"] += 1
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, MAX_RETRY_DELAY)
+                    continue
+                if len(indexes) > 1:
+                    # One bad ticket fails the whole group; isolate it
+                    for index in indexes:
+                        await self._settle([index])
+                    return
+                # An earlier attempt may have landed after its confirmation wait timed out
+                try:
+                    ticket = await self._refresh(indexes[0])
+                except Exception:
+                    ticket = None
+                if ticket is not None and ticket.status == USED:
+                    break
+                print(f"check_in({indexes[0]}) rejected: {e}")
+                self.stats["rejected"] += 1
+                await self.journal.commit("X", indexes[0])
+                return
+        self.stats["batches"] += 1
+        self.stats["flushed"] += len(indexes)
+        for index in indexes:
+            await self.journal.commit("F", index)
+
+    async def flush_forever(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            await self._settle(batch)
+            for _ in batch:
+                self.queue.task_done()
+
+    async def serve(self, host, port):
+        unflushed = await self.load()
+        flusher = asyncio.create_task(self.flush_forever())
+        for index in unflushed:
+            await self.queue.put(index)
+        server = await asyncio.start_server(self.handle_scanner, host, port)
+        print(f"Check-in service for app {self.app_id} listening on {host}:{port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            # Anything still queued stays "A" in the journal and is replayed on restart
+            flusher.cancel()
+            self.journal.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Door-gate check-in service")
+    parser.add_argument("--app-id", type=int, required=True, help="TicketManager app ID")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--journal", help="Journal path (default: checkin-<app-id>.journal)")
+    parser.add_argument("--batch-size", type=int, default=AtomicTransactionComposer.MAX_GROUP_SIZE)
+    parser.add_argument("--queue-size", type=int, default=1024)
+    parser.add_argument("--flush-interval", type=float, default=0.5, help="Seconds to wait to fill a batch")
+    args = parser.parse_args()
+
+    sender, signer = get_signer()
+    service = CheckInService(
+        get_algod_client(),
+        args.app_id,
+        sender,
+        signer,
+        args.journal or f"checkin-{args.app_id}.journal",
+        batch_size=args.batch_size,
+        queue_size=args.queue_size,
+        flush_interval=args.flush_interval,
+    )
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,128 @@
+"""
+Encode/decode throughput of the generated codecs (tools.codegen) against the
+generic algosdk path the AtomicTransactionComposer takes: Method.get_selector()
+plus ABIType.encode per argument, and ABIType.decode of the return log.
+
+Every method gets a representative argument set (8 recipients for
+issue_tickets, a 1KB chunk for write_program, ...). Before timing, the codec's
+output is checked byte for byte against algosdk, so the benchmark also fails
+if a codec is stale or wrong.
+
+Usage:
+    python -m tools.codec_bench
+    python -m tools.codec_bench ticket_manager --n 50000
+"""
+
+import argparse
+import importlib
+import time
+
+from algosdk import abi, encoding
+
+from tools.codegen import RETURN_PREFIX, arg_type, codec_path, generate
+from tools.ticketing import load_contract
+
+SAMPLE_ADDRESS = encoding.encode_address(bytes(range(32)))
+SAMPLE_NAME = "Summer Festival 2026"
+# Elements in a sample dynamic array, by element type
+ARRAY_LENGTHS = {"byte": 1024, "address": 8}
+
+
+def sample(t, seed=0):
+    if isinstance(t, abi.UintType):
+        return (1_000_003 + seed) % (1 << t.bit_size)
+    if isinstance(t, abi.ByteType):
+        return (0xAB + seed) % 256
+    if isinstance(t, abi.BoolType):
+        return True
+    if isinstance(t, abi.AddressType):
+        return SAMPLE_ADDRESS
+    if isinstance(t, abi.StringType):
+        return SAMPLE_NAME
+    if isinstance(t, abi.ArrayDynamicType):
+        return [sample(t.child_type, i) for i in range(ARRAY_LENGTHS.get(str(t.child_type), 8))]
+    if isinstance(t, abi.ArrayStaticType):
+        return [sample(t.child_type, i) for i in range(t.static_length)]
+    if isinstance(t, abi.TupleType):
+        return [sample(c, i) for i, c in enumerate(t.child_types)]
+    raise TypeError(f"No sample value for {t}")
+
+
+def rate(fn, n):
+    started = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return n / (time.perf_counter() - started)
+
+
+def cases(name):
+    """Per method: (name, (generic, codec) callables for encode, decode and return decode)."""
+    with open(codec_path(name)) as f:
+        if f.read() != generate(name):
+            raise SystemExit(f"{codec_path(name)} is out of date; run python compile.py")
+    codec = importlib.import_module(f"algokit_contracts.{name}_codec")
+    contract = load_contract(name)
+
+    for method in contract.methods:
+        types = [arg_type(a) for a in method.args if not abi.is_abi_transaction_type(a.type)]
+        args = [sample(t, i) for i, t in enumerate(types)]
+        encode = getattr(codec, f"encode_{method.name}")
+        decode = getattr(codec, f"decode_{method.name}")
+
+        def generic_encode(method=method, types=types, args=args):
+            return [method.get_selector()] + [t.encode(v) for t, v in zip(types, args)]
+
+        app_args = generic_encode()
+        generic_values = [t.decode(raw) for t, raw in zip(types, app_args[1:])]
+        if encode(*args) != app_args or decode(app_args) != generic_values:
+            raise SystemExit(f"{method.get_signature()}: codec does not match algosdk")
+
+        timings = {
+            "encode": (generic_encode, lambda encode=encode, args=args: encode(*args)),
+            "decode": (
+                lambda types=types, app_args=app_args: [t.decode(raw) for t, raw in zip(types, app_args[1:])],
+                lambda decode=decode, app_args=app_args: decode(app_args),
+            ),
+        }
+        if method.returns.type != abi.Returns.VOID:
+            returns = method.returns.type
+            value = sample(returns)
+            log = RETURN_PREFIX + returns.encode(value)
+            decode_return = getattr(codec, f"decode_{method.name}_return")
+            if getattr(codec, f"encode_{method.name}_return")(value) != log or decode_return(log) != returns.decode(log[4:]):
+                raise SystemExit(f"{method.get_signature()}: return codec does not match algosdk")
+            timings["return"] = (
+                lambda returns=returns, log=log: returns.decode(log[4:]) if log[:4] == RETURN_PREFIX else None,
+                lambda decode_return=decode_return, log=log: decode_return(log),
+            )
+        yield method.name, timings
+
+
+def run(name, n):
+    totals = {}
+    print(f"{load_contract(name).name} ({n} calls per measurement, calls/s generic -> codec)")
+    for method, timings in cases(name):
+        columns = []
+        for kind in ("encode", "decode", "return"):
+            if kind not in timings:
+                columns.append(f"{'':<36}")
+                continue
+            generic, fast = (rate(fn, n) for fn in timings[kind])
+            seconds = totals.setdefault(kind, [0.0, 0.0])
+            seconds[0] += 1 / generic
+            seconds[1] += 1 / fast
+            columns.append(f"{kind} {generic:>9,.0f} -> {fast:>10,.0f} ({fast / generic:4.1f}x)")
+        print(f"  {method:<22}" + "  ".join(columns).rstrip())
+    # One call of every method: the mix a bulk job sees, not the mean of ratios
+    summary = ", ".join(f"{kind} {g / f:.1f}x" for kind, (g, f) in totals.items())
+    print(f"  all methods: {summary}\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark generated ARC-4 codecs against algosdk")
+    parser.add_argument("contracts", nargs="*", default=["ticket_manager", "event_factory"])
+    parser.add_argument("--n", type=int, default=20000, help="Calls per measurement")
+    args = parser.parse_args()
+
+    for name in args.contracts:
+        run(name, args.n)
@@ -0,0 +1,281 @@
+"""
+Generate a specialized ARC-4 codec module for each contract, written next to
+the compiled artifacts as algokit_contracts/<name>_codec.py.
+
+algosdk encodes every argument by walking its ABIType and hashes the method
+signature again on every call. The generated module instead has each method
+selector as a constant and one precompiled struct.Struct per fixed-layout
+type, so encoding a call or decoding its return value is a single pack or
+unpack. Types with no fixed layout (e.g. bool inside a tuple) fall back to
+the algosdk ABIType, so every signature in the contract JSON is covered.
+
+Generated API, per method:
+    encode_<method>(*args)        -> app args, selector first
+    decode_<method>(app_args)     -> list of argument values
+    encode_<method>_return(value) -> log bytes (return prefix + value)
+    decode_<method>_return(log)   -> value (non-void methods only)
+Values use the same Python types as algosdk (addresses as strings, tuples
+and arrays as lists), so results compare equal with the generic path.
+
+compile.py runs this after compiling; tools/codec_bench.py measures it.
+
+Usage:
+    python -m tools.codegen ticket_manager event_factory
+"""
+
+import keyword
+import os
+import re
+import sys
+
+from algosdk import abi
+
+from tools.ticketing import CONTRACTS_DIR
+
+# ARC-4 prefix of a method's return value log
+RETURN_PREFIX = bytes.fromhex("151f7c75")
+# Arguments past the 15th are packed into a tuple; no contract here needs it
+MAX_APP_ARGS = 15
+
+STRUCT_CODES = {8: "B", 16: "H", 32: "I", 64: "Q"}
+
+
+def struct_code(t):
+    """struct format of a fixed-size leaf type, or None."""
+    if isinstance(t, abi.UintType):
+        return STRUCT_CODES.get(t.bit_size)
+    if isinstance(t, abi.ByteType):
+        return "B"
+    if isinstance(t, abi.AddressType):
+        return "32s"
+    return None
+
+
+def arg_type(arg):
+    # Reference arguments travel as a uint8 index into the foreign arrays
+    if abi.is_abi_reference_type(arg.type):
+        return abi.UintType(8)
+    return arg.type
+
+
+def slug(type_str, tuples):
+    if type_str.startswith("("):
+        tuples.setdefault(type_str, len(tuples))
+        return f"tuple{tuples[type_str]}"
+    return re.sub(r"\[(\d*)\]", lambda m: f"_array{m.group(1)}", type_str)
+
+
+class Emitter:
+    def __init__(self):
+        self.structs = {}  # format -> constant name
+        self.helpers = {}  # type string -> helper suffix
+        self.fallbacks = []
+        self.lines = []
+        self._tuples = {}
+
+    def struct(self, fmt):
+        if fmt not in self.structs:
+            self.structs[fmt] = f"_S{len(self.structs)}"
+        return self.structs[fmt]
+
+    def helper(self, t):
+        """Emit _pack_X / _unpack_X for t once; returns X."""
+        type_str = str(t)
+        if type_str in self.helpers:
+            return self.helpers[type_str]
+        name = slug(type_str, self._tuples)
+        self.helpers[type_str] = name
+        pack, unpack = self._bodies(t, type_str, name)
+        self.lines += [
+            f"# {type_str}",
+            f"def _pack_{name}(v):",
+            *[f"    {line}" for line in pack],
+            "",
+            "",
+            f"def _unpack_{name}(b):",
+            *[f"    {line}" for line in unpack],
+            "",
+            "",
+        ]
+        return name
+
+    def _bodies(self, t, type_str, name):
+        code = struct_code(t)
+        if isinstance(t, abi.AddressType):
+            return ["return _address(v)"], ["return _encode_addresses(b)[0]"]
+        if code:
+            s = self.struct(">" + code)
+            return [f"return {s}.pack(v)"], [f"return {s}.unpack(b)[0]"]
+        if isinstance(t, abi.BoolType):
+            return ['return b"\\x80" if v else b"\\x00"'], ['return b == b"\\x80"']
+        if isinstance(t, abi.StringType):
+            return (
+                ["raw = v.encode()", "return _U16.pack(len(raw)) + raw"],
+                ["return b[2:2 + _U16.unpack_from(b)[0]].decode()"],
+            )
+        if isinstance(t, abi.ArrayDynamicType) and isinstance(t.child_type, abi.ByteType):
+            # algosdk decodes byte[] to a list of ints
+            return (
+                ["return _U16.pack(len(v)) + bytes(v)"],
+                ["return list(b[2:2 + _U16.unpack_from(b)[0]])"],
+            )
+        if isinstance(t, abi.ArrayDynamicType) and isinstance(t.child_type, abi.AddressType):
+            return (
+                ['return _U16.pack(len(v)) + b"".join(map(_address, v))'],
+                ["return _encode_addresses(b[2:2 + 32 * _U16.unpack_from(b)[0]])"],
+            )
+        if isinstance(t, abi.ArrayDynamicType) and struct_code(t.child_type):
+            code = struct_code(t.child_type)
+            return (
+                [f'return _U16.pack(len(v)) + struct.pack(f">{{len(v)}}{code}", *v)'],
+                [f'return list(struct.unpack_from(f">{{_U16.unpack_from(b)[0]}}{code}", b, 2))'],
+            )
+        if isinstance(t, abi.TupleType) and all(struct_code(c) for c in t.child_types):
+            s = self.struct(">" + "".join(struct_code(c) for c in t.child_types))
+            fields = [f"a{i}" for i in range(len(t.child_types))]
+            packed = [
+                f"_address(v[{i}])" if isinstance(c, abi.AddressType) else f"v[{i}]"
+                for i, c in enumerate(t.child_types)
+            ]
+            values = [
+                f"_encode_addresses({f})[0]" if isinstance(c, abi.AddressType) else f
+                for f, c in zip(fields, t.child_types)
+            ]
+            return (
+                [f"return {s}.pack({', '.join(packed)})"],
+                [f"{', '.join(fields)}{',' * (len(fields) == 1)} = {s}.unpack(b)", f"return [{', '.join(values)}]"],
+            )
+        # No fixed layout: hand over to algosdk
+        constant = f"_T_{name}"
+        self.fallbacks.append((constant, type_str))
+        return [f"return {constant}.encode(v)"], [f"return {constant}.decode(b)"]
+
+
+def identifier(name):
+    name = re.sub(r"\W", "_", name)
+    return name + "_" if keyword.iskeyword(name) or not name.isidentifier() else name
+
+
+def generate(name):
+    with open(os.path.join(CONTRACTS_DIR, f"{name}_contract.json")) as f:
+        contract = abi.Contract.from_json(f.read())
+
+    emitter = Emitter()
+    body = []
+    tables = []  # (method name, selector constant, has return)
+    for method in contract.methods:
+        if any(method.name == seen for seen, _, _ in tables):
+            raise ValueError(f"{contract.name}: overloaded method {method.name} needs a distinct codec name")
+        app_args = [a for a in method.args if not abi.is_abi_transaction_type(a.type)]
+        if len(app_args) > MAX_APP_ARGS:
+            raise ValueError(f"{method.get_signature()}: more than {MAX_APP_ARGS} app arguments")
+
+        params = [identifier(a.name or f"arg{i}") for i, a in enumerate(app_args)]
+        helpers = [emitter.helper(arg_type(a)) for a in app_args]
+        returns = None if method.returns.type == abi.Returns.VOID else emitter.helper(method.returns.type)
+        constant = method.name.upper()
+        txn_args = [f"{a.name} ({a.type})" for a in method.args if abi.is_abi_transaction_type(a.type)]
+
+        body.append(f"# {method.get_signature()}")
+        if txn_args:
+            body.append(f"# Transaction arguments go in the group ahead of the call: {', '.join(txn_args)}")
+        body += [
+            f'{constant} = bytes.fromhex("{method.get_selector().hex()}")',
+            "",
+            "",
+            f"def encode_{method.name}({', '.join(params)}):",
+            f"    return [{', '.join([constant] + [f'_pack_{h}({p})' for h, p in zip(helpers, params)])}]",
+            "",
+            "",
+            f"def decode_{method.name}(app_args):",
+            f"    return [{', '.join(f'_unpack_{h}(app_args[{i + 1}])' for i, h in enumerate(helpers))}]",
+            "",
+            "",
+        ]
+        if returns:
+            body += [
+                f"def encode_{method.name}_return(value):",
+                f"    return RETURN_PREFIX + _pack_{returns}(value)",
+                "",
+                "",
+                f"def decode_{method.name}_return(log):",
+                "    if log[:4] != RETURN_PREFIX:",
+                '        raise ValueError("not an ARC-4 return log")',
+                f"    return _unpack_{returns}(log[4:])",
+                "",
+                "",
+            ]
+        tables.append((method.name, constant, returns is not None))
+
+    out = [
+        '"""',
+        f"ARC-4 codec for {contract.name}, generated by tools.codegen from",
+        f"{name}_contract.json. Do not edit: python compile.py regenerates it.",
+        '"""',
+        "",
+        "import hashlib",
+        "import struct",
+        "from base64 import b32encode",
+        "",
+    ]
+    if emitter.fallbacks:
+        out.append("from algosdk.abi import ABIType")
+    out += [
+        "from algosdk.encoding import decode_address",
+        "",
+        f'RETURN_PREFIX = bytes.fromhex("{RETURN_PREFIX.hex()}")',
+        "",
+        '_U16 = struct.Struct(">H")',
+    ]
+    out += [f'{constant} = struct.Struct("{fmt}")' for fmt, constant in emitter.structs.items()]
+    out += [f'{constant} = ABIType.from_string("{type_str}")' for constant, type_str in emitter.fallbacks]
+    out += [
+        "",
+        "",
+        "def _address(v):",
+        "    return v if isinstance(v, bytes) and len(v) == 32 else decode_address(v)",
+        "",
+        "",
+        "def _encode_addresses(raw):",
+        '    """Address strings of concatenated 32-byte keys (algosdk.encoding.encode_address)."""',
+        "    keys = [raw[i:i + 32] for i in range(0, len(raw), 32)]",
+        "    # Key + 4-byte checksum, zero-padded to 40 bytes so each one is exactly",
+        "    # 64 base32 characters: a single b32encode call covers the whole array",
+        '    text = b32encode(b"".join(k + hashlib.new("sha512_256", k).digest()[-4:] + bytes(4) for k in keys)).decode()',
+        "    return [text[i:i + 58] for i in range(0, len(text), 64)]",
+        "",
+        "",
+        *emitter.lines,
+        *body,
+        "SELECTORS = {",
+        *[f'    "{m}": {c},' for m, c, _ in tables],
+        "}",
+        "",
+        "# selector -> (method name, argument decoder)",
+        "DECODERS = {",
+        *[f'    {c}: ("{m}", decode_{m}),' for m, c, _ in tables],
+        "}",
+        "",
+        "RETURN_DECODERS = {",
+        *[f'    "{m}": decode_{m}_return,' for m, _, r in tables if r],
+        "}",
+        "",
+        "",
+        "def decode_call(app_args):",
+        '    """(method name, argument values) of an app call\'s ApplicationArgs."""',
+        "    name, decode = DECODERS[app_args[0]]",
+        "    return name, decode(app_args)",
+    ]
+    return "\n".join(out) + "\n"
+
+
+def codec_path(name):
+    return os.path.join(CONTRACTS_DIR, f"{name}_codec.py")
+
+
+if __name__ == "__main__":
+    for name in sys.argv[1:]:
+        path = codec_path(name)
+        with open(path, "w") as f:
+            f.write(generate(name))
+        print(f"Wrote {os.path.relpath(path)}")
@@ -0,0 +1,140 @@
+"""
+Post-event cleanup: delete Used / Cancelled ticket boxes with
+TicketManager.collect_tickets and report the minimum balance recovered.
+
+Used tickets survive as a bit in the app's "archive" box, so attendance can
+still be proven after the ticket box is gone. The archive holds one bit per
+ticket sold; the first group pays the app for its minimum balance (or for
+growing it, if tickets were sold since the last run).
+
+Usage:
+    python -m tools.collect_tickets --app-id 755123456 --dry-run
+    DEPLOYER_MNEMONIC="..." python -m tools.collect_tickets --app-id 755123456
+"""
+
+import argparse
+import time
+
+from tools.refund_event import REFUND_BOX, refund_state
+from tools.ticketing import (
+    CANCELLED,
+    USED,
+    asset_box_key,
+    box_mbr,
+    box_refs,
+    fetch_ticket,
+    get_algod_client,
+    get_signer,
+    list_ticket_versions,
+    load_contract,
+    pack_tickets,
+    read_box,
+    read_global_state,
+    submit_groups,
+    ticket_box_keys,
+    ticket_box_mbr,
+    ticket_read_size,
+)
+
+ARCHIVE_BOX = b"archive"
+ARCHIVE_HEADER = 24
+# collect_tickets reads the refund cursor of a cancelled event
+REFUND_SIZE = 24
+
+
+def archive_size(sold):
+    return ARCHIVE_HEADER + (sold + 7) // 8
+
+
+def archive_funding(current, sold):
+    """microAlgos the app needs for collect_tickets to create or grow the archive box."""
+    if current is None:
+        return box_mbr(len(ARCHIVE_BOX), archive_size(sold))
+    return 400 * max(0, archive_size(sold) - len(current))
+
+
+def plan(client, app_id):
+    state = read_global_state(client, app_id)
+    indexes = list_ticket_versions(client, app_id)
+    terminal = []
+    for index, version in indexes.items():
+        ticket = fetch_ticket(client, app_id, index, version)
+        if ticket is not None and ticket.status in (USED, CANCELLED):
+            terminal.append(ticket)
+
+    sold = state.get("Sold", 0)
+    # Besides its ticket box: the reverse-map box; per call: archive and refund
+    pages = pack_tickets(terminal, per_ticket_boxes=1, fixed_boxes=2, fixed_bytes=archive_size(sold) + REFUND_SIZE)
+    return {
+        "state": state,
+        "boxes": len(indexes),
+        "terminal": terminal,
+        "pages": pages,
+        "archive_funding": archive_funding(read_box(client, app_id, ARCHIVE_BOX), sold),
+        # Reverse-map boxes of claimed tickets come back on top of this
+        "estimated_recovery": sum(ticket_box_mbr(ticket.version) for ticket in terminal),
+    }
+
+
+def submit(client, sender, signer, app_id, pages, sold, funding=0):
+    def call_args(page):
+        return {
+            "method_args": [[ticket.index for ticket in page]],
+            "boxes": box_refs(
+                [ARCHIVE_BOX, REFUND_BOX]
+                + [key for ticket in page for key in ticket_box_keys(ticket.index, ticket.version)]
+                + [asset_box_key(ticket.asset_id) for ticket in page],
+                sum(ticket_read_size(ticket.version) + 8 for ticket in page) + archive_size(sold) + REFUND_SIZE,
+            ),
+        }
+
+    def fund(group):
+        # Only the first group creates or grows the archive
+        nonlocal funding
+        amount, funding = funding, 0
+        return amount or None
+
+    returns, mbr_change, elapsed = submit_groups(
+        client,
+        sender,
+        signer,
+        app_id,
+        load_contract("ticket_manager").get_method_by_name("collect_tickets"),
+        pages,
+        call_args,
+        fund=fund if funding else None,
+        progress=lambda number, _, returns: print(f"  group {number}: {sum(returns)} boxes collected"),
+    )
+    return sum(returns), -mbr_change, elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Delete terminal-state ticket boxes after an event")
+    parser.add_argument("--app-id", type=int, required=True, help="TicketManager app ID")
+    parser.add_argument("--dry-run", action="store_true", help="Only print the cleanup plan")
+    args = parser.parse_args()
+
+    client = get_algod_client()
+    p = plan(client, args.app_id)
+    print(f"App {args.app_id}: {p['boxes']} ticket boxes, {len(p['terminal'])} Used/Cancelled "
+          f"in {len(p['pages'])} pages")
+    print(f"Estimated MBR recovery: {p['estimated_recovery'] / 1_000_000:.6f} ALGO "
+          f"({ticket_box_mbr(1)} / {ticket_box_mbr(2)} microAlgos per v1 / v2 ticket box)")
+    if p["archive_funding"]:
+        print(f"Archive box minimum balance paid by the organizer: {p['archive_funding'] / 1_000_000:.6f} ALGO")
+
+    deadline = p["state"].get("Deadline", 0)
+    refund = refund_state(client, args.app_id)
+    if deadline > time.time():
+        print(f"Deadline {deadline} has not passed yet; collect_tickets will be rejected.")
+    elif refund is not None and refund["cursor"] < p["state"].get("Sold", 0):
+        print(f"Event is cancelled and refunds stop at ticket {refund['cursor']}; "
+              f"run tools.refund_event before collecting.")
+    elif not args.dry_run and p["pages"]:
+        sender, signer = get_signer()
+        collected, recovered, elapsed = submit(
+            client, sender, signer, args.app_id, p["pages"], p["state"].get("Sold", 0), p["archive_funding"]
+        )
+        print(f"Collected {collected} boxes in {elapsed:.1f}s; "
+              f"recovered {recovered / 1_000_000:.6f} ALGO of minimum balance (net of the archive box)")
+        print(f"Ticket boxes remaining: {p['boxes'] - collected}")
@@ -0,0 +1,194 @@
+"""
+EventFactory operator commands.
+
+  deploy          Create a new EventFactory app
+  upload-program  Compile TicketManager and store it in the factory's program boxes
+  create-event    Deploy, initialize, fund and register a TicketManager in one group
+
+Usage:
+    DEPLOYER_MNEMONIC="..." python -m tools.factory deploy
+    DEPLOYER_MNEMONIC="..." python -m tools.factory upload-program --factory-id 755000000
+    DEPLOYER_MNEMONIC="..." python -m tools.factory create-event --factory-id 755000000 \\
+        --name "Campus Fest" --price 1000000 --supply 100 --deadline 1767225600
+"""
+
+import argparse
+import base64
+import os
+
+from algosdk import transaction
+from algosdk.atomic_transaction_composer import AtomicTransactionComposer, TransactionWithSigner
+from algosdk.logic import get_application_address
+
+from algokit_contracts.ticket_manager import GLOBAL_NUM_BYTE_SLICES, GLOBAL_NUM_UINTS
+from tools.ticketing import (
+    CONTRACTS_DIR,
+    box_mbr,
+    box_refs,
+    get_algod_client,
+    get_signer,
+    load_contract,
+    read_box,
+    read_global_state,
+)
+
+APPROVAL_BOX = b"approval"
+CLEAR_BOX = b"clear"
+# [ApprovalWritten 8][ClearWritten 8]: create_event needs both programs complete
+UPLOAD_BOX = b"upload"
+UPLOAD_SIZE = 16
+
+# Leaves room for selector + bool + uint64 + length prefix under the 2048-byte arg limit
+CHUNK_SIZE = 2000
+
+# Default funding forwarded to the new event app (same as the create-event page)
+DEFAULT_FUNDING = 1_000_000
+
+
+def extra_pages(approval_len, clear_len):
+    # Extra pages cover approval and clear together
+    return (approval_len + clear_len - 1) // 2048
+
+
+def app_mbr(extra_pages, num_uints, num_byte_slices):
+    return 100_000 * (1 + extra_pages) + 28_500 * num_uints + 50_000 * num_byte_slices
+
+
+def compile_teal(client, name):
+    with open(os.path.join(CONTRACTS_DIR, f"{name}.teal")) as f:
+        return base64.b64decode(client.compile(f.read())["result"])
+
+
+def deploy(client, sender, signer):
+    approval = compile_teal(client, "event_factory_approval")
+    clear = compile_teal(client, "event_factory_clear")
+    txn = transaction.ApplicationCreateTxn(
+        sender,
+        client.suggested_params(),
+        transaction.OnComplete.NoOpOC,
+        approval,
+        clear,
+        transaction.StateSchema(num_uints=1, num_byte_slices=0),
+        transaction.StateSchema(num_uints=0, num_byte_slices=0),
+        extra_pages=extra_pages(len(approval), len(clear)),
+        note=b"Event Factory",
+    )
+    atc = AtomicTransactionComposer()
+    atc.add_transaction(TransactionWithSigner(txn, signer))
+    result = atc.execute(client, 4)
+    return client.pending_transaction_info(result.tx_ids[0])["application-index"]
+
+
+def upload_program(client, sender, signer, factory_id):
+    contract = load_contract("event_factory")
+    approval = compile_teal(client, "ticket_manager_approval")
+    clear = compile_teal(client, "ticket_manager_clear")
+    sp = client.suggested_params()
+
+    # Fund the box MBR and create both boxes at their final size
+    atc = AtomicTransactionComposer()
+    fund = transaction.PaymentTxn(
+        sender, sp, get_application_address(factory_id),
+        box_mbr(len(APPROVAL_BOX), len(approval)) + box_mbr(len(CLEAR_BOX), len(clear))
+        + box_mbr(len(UPLOAD_BOX), UPLOAD_SIZE),
+    )
+    atc.add_transaction(TransactionWithSigner(fund, signer))
+    atc.add_method_call(
+        factory_id,
+        contract.get_method_by_name("init_program"),
+        sender,
+        sp,
+        signer,
+        method_args=[len(approval), len(clear)],
+        boxes=box_refs([APPROVAL_BOX, CLEAR_BOX, UPLOAD_BOX], len(approval) + len(clear) + UPLOAD_SIZE),
+    )
+    atc.execute(client, 4)
+
+    # Chunks must land in order: the contract only accepts the next offset
+    write = contract.get_method_by_name("write_program")
+    for is_clear, name, program in ((False, APPROVAL_BOX, approval), (True, CLEAR_BOX, clear)):
+        atc = AtomicTransactionComposer()
+        for offset in range(0, len(program), CHUNK_SIZE):
+            if len(atc.txn_list) == AtomicTransactionComposer.MAX_GROUP_SIZE:
+                atc.execute(client, 4)
+                atc = AtomicTransactionComposer()
+            atc.add_method_call(
+                factory_id,
+                write,
+                sender,
+                sp,
+                signer,
+                method_args=[is_clear, offset, program[offset:offset + CHUNK_SIZE]],
+                boxes=box_refs([name, UPLOAD_BOX], len(program) + UPLOAD_SIZE),
+                # Identical chunks at different offsets still need distinct txids
+                note=offset.to_bytes(8, "big"),
+            )
+        atc.execute(client, 4)
+    return len(approval), len(clear)
+
+
+def create_event(client, sender, signer, factory_id, name, price, supply, deadline, funding=DEFAULT_FUNDING):
+    contract = load_contract("event_factory")
+    approval_len = len(read_box(client, factory_id, APPROVAL_BOX))
+    clear_len = len(read_box(client, factory_id, CLEAR_BOX))
+    count = read_global_state(client, factory_id).get("EventCount", 0)
+    registry_key = count.to_bytes(8, "big")
+    registry_len = 8 + len(name.encode())
+
+    mbr = app_mbr(extra_pages(approval_len, clear_len), GLOBAL_NUM_UINTS, GLOBAL_NUM_BYTE_SLICES) + box_mbr(len(registry_key), registry_len)
+
+    sp = client.suggested_params()
+    payment = transaction.PaymentTxn(sender, sp, get_application_address(factory_id), mbr + funding)
+
+    call_sp = client.suggested_params()
+    call_sp.flat_fee = True
+    call_sp.fee = 3 * sp.min_fee  # outer call + inner app create + inner funding payment
+
+    atc = AtomicTransactionComposer()
+    atc.add_method_call(
+        factory_id,
+        contract.get_method_by_name("create_event"),
+        sender,
+        call_sp,
+        signer,
+        method_args=[name, price, supply, deadline, TransactionWithSigner(payment, signer)],
+        boxes=box_refs(
+            [APPROVAL_BOX, CLEAR_BOX, UPLOAD_BOX, registry_key],
+            approval_len + clear_len + UPLOAD_SIZE + registry_len,
+        ),
+    )
+    result = atc.execute(client, 4)
+    return result.abi_results[0].return_value
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="EventFactory operator commands")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("deploy")
+
+    p = sub.add_parser("upload-program")
+    p.add_argument("--factory-id", type=int, required=True)
+
+    p = sub.add_parser("create-event")
+    p.add_argument("--factory-id", type=int, required=True)
+    p.add_argument("--name", required=True)
+    p.add_argument("--price", type=int, required=True, help="Ticket price in microAlgos")
+    p.add_argument("--supply", type=int, required=True)
+    p.add_argument("--deadline", type=int, required=True, help="Cancellation deadline (unix timestamp)")
+    p.add_argument("--funding", type=int, default=DEFAULT_FUNDING, help="microAlgos forwarded to the event app")
+
+    args = parser.parse_args()
+    client = get_algod_client()
+    sender, signer = get_signer()
+
+    if args.command == "deploy":
+        print(f"EventFactory deployed: {deploy(client, sender, signer)}")
+    elif args.command == "upload-program":
+        approval_len, clear_len = upload_program(client, sender, signer, args.factory_id)
+        print(f"Uploaded TicketManager program ({approval_len} + {clear_len} bytes) to factory {args.factory_id}")
+    elif args.command == "create-event":
+        app_id = create_event(
+            client, sender, signer, args.factory_id, args.name, args.price, args.supply, args.deadline, args.funding
+        )
+        print(f"Event created and registered: {app_id}")
@@ -0,0 +1,357 @@
+"""
+Sharded indexer for every TicketManager registered in an EventFactory.
+
+A coordinator lists the factory's registered app IDs and spreads them over N
+worker processes with a consistent-hash ring (virtual nodes per worker). Each
+worker has its own algod connection and syncs only its shard, writing one
+JSON snapshot per event (global state + ticket boxes) to --out/<app_id>.json.
+
+The coordinator polls the registry for new events and rebalances when a
+worker joins (SIGUSR1), leaves (SIGUSR2) or dies. Thanks to the ring only the
+apps whose owner changed are moved; every other worker keeps its shard.
+
+Workers only split the CPU side: every box is still one request to the same
+algod endpoint, so past a couple of workers throughput is bound by that node
+(and its rate limit), not by the worker count. --once reports apps/s to tune it.
+--once exits non-zero if any app failed to sync.
+
+Usage:
+    python -m tools.index_workers --factory-id 755000000 --workers 8 --out index/
+    python -m tools.index_workers --factory-id 755000000 --workers 8 --once
+"""
+
+import argparse
+import base64
+import bisect
+import hashlib
+import json
+import multiprocessing as mp
+import os
+import queue
+import signal
+import time
+
+from algosdk import encoding
+
+from tools.ticketing import (
+    fetch_ticket,
+    get_algod_client,
+    list_registered_events,
+    list_ticket_versions,
+    read_global_state,
+)
+
+
+class HashRing:
+    def __init__(self, nodes=(), replicas=160):
+        self.replicas = replicas
+        self._hashes = []
+        self._nodes = []
+        for node in nodes:
+            self.add(node)
+
+    @staticmethod
+    def _hash(value):
+        return int.from_bytes(hashlib.blake2b(str(value).encode(), digest_size=8).digest(), "big")
+
+    def add(self, node):
+        for replica in range(self.replicas):
+            h = self._hash(f"{node}#{replica}")
+            i = bisect.bisect(self._hashes, h)
+            self._hashes.insert(i, h)
+            self._nodes.insert(i, node)
+
+    def remove(self, node):
+        keep = [(h, n) for h, n in zip(self._hashes, self._nodes) if n != node]
+        self._hashes = [h for h, _ in keep]
+        self._nodes = [n for _, n in keep]
+
+    def owner(self, key):
+        if not self._hashes:
+            return None
+        return self._nodes[bisect.bisect(self._hashes, self._hash(key)) % len(self._hashes)]
+
+    def assign(self, keys):
+        shards = {node: set() for node in set(self._nodes)}
+        for key in keys:
+            if self._hashes:
+                shards[self.owner(key)].add(key)
+        return shards
+
+
+def _json_state(state):
+    out = {}
+    for key, value in state.items():
+        if isinstance(value, bytes):
+            value = encoding.encode_address(value) if len(value) == 32 else base64.b64encode(value).decode()
+        out[key] = value
+    return out
+
+
+def sync_app(client, app_id, out_dir):
+    state = read_global_state(client, app_id)
+    tickets = []
+    for index, version in list_ticket_versions(client, app_id).items():
+        ticket = fetch_ticket(client, app_id, index, version)
+        if ticket is not None:
+            tickets.append(ticket._asdict())
+
+    path = os.path.join(out_dir, f"{app_id}.json")
+    with open(path + ".tmp", "w") as f:
+        json.dump({"app_id": app_id, "synced_at": time.time(), "state": _json_state(state), "tickets": tickets}, f)
+    os.replace(path + ".tmp", path)
+    return len(tickets)
+
+
+def worker_main(worker_id, inbox, outbox, out_dir, interval, once):
+    # Own process, own algod connection
+    client = get_algod_client()
+    shard, stopping = [], False
+
+    def drain(timeout=None):
+        nonlocal shard, stopping
+        try:
+            message = inbox.get(timeout=timeout) if timeout else inbox.get_nowait()
+            while True:
+                kind, payload = message
+                if kind == "assign":
+                    shard = sorted(payload)
+                elif kind == "stop":
+                    stopping = True
+                message = inbox.get_nowait()
+        except queue.Empty:
+            pass
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # the coordinator owns shutdown
+    drain(timeout=interval)
+    while not stopping:
+        started = time.perf_counter()
+        synced = boxes = 0
+        for app_id in list(shard):
+            # Pick up a rebalance mid-pass rather than finishing stale work
+            drain()
+            if stopping:
+                break
+            if app_id not in shard:
+                continue
+            try:
+                boxes += sync_app(client, app_id, out_dir)
+                synced += 1
+            except Exception as e:
+                outbox.put(("error", worker_id, (app_id, str(e))))
+        outbox.put(("pass", worker_id, (synced, boxes, time.perf_counter() - started)))
+        if once:
+            break
+        drain(timeout=interval)
+
+
+class Coordinator:
+    def __init__(self, client, factory_id, out_dir, interval=30, replicas=160, once=False):
+        self.client = client
+        self.factory_id = factory_id
+        self.out_dir = out_dir
+        self.interval = interval
+        self.once = once
+        self.ring = HashRing(replicas=replicas)
+        self.apps = []
+        self.next_registry_index = 0
+        self.workers = {}  # worker_id -> (Process, inbox)
+        self.shards = {}
+        self.passes = {}  # worker_id -> (apps, boxes, seconds) of its last pass
+        self.errors = {}  # app_id -> last sync error
+        self.outbox = mp.Queue()
+        self._spawned = 0
+
+    def refresh_events(self):
+        events = list_registered_events(self.client, self.factory_id, self.next_registry_index)
+        if events:
+            self.apps.extend(app_id for _, app_id, _ in events)
+            self.next_registry_index = events[-1][0] + 1
+        return len(events)
+
+    def add_worker(self, on_ring=True):
+        worker_id = f"w{self._spawned}"
+        self._spawned += 1
+        inbox = mp.Queue()
+        process = mp.Process(
+            target=worker_main,
+            args=(worker_id, inbox, self.outbox, self.out_dir, self.interval, self.once),
+            name=f"index-{worker_id}",
+            daemon=True,
+        )
+        process.start()
+        self.workers[worker_id] = (process, inbox)
+        if on_ring:
+            self.ring.add(worker_id)
+        return worker_id
+
+    def remove_worker(self, worker_id):
+        process, inbox = self.workers.pop(worker_id)
+        self.ring.remove(worker_id)
+        self.shards.pop(worker_id, None)
+        self.passes.pop(worker_id, None)
+        if process.is_alive():
+            inbox.put(("stop", None))
+            process.join(timeout=self.interval + 5)
+            if process.is_alive():
+                process.terminate()
+
+    def assign(self, worker_id, shard):
+        self.workers[worker_id][1].put(("assign", sorted(shard)))
+        self.shards[worker_id] = set(shard)
+
+    def rebalance(self):
+        shards = self.ring.assign(self.apps)
+        moved = 0
+        for worker_id in self.workers:
+            shard = shards.get(worker_id, set())
+            previous = self.shards.get(worker_id, set())
+            if shard != previous or worker_id not in self.shards:
+                moved += len(shard - previous)
+                self.assign(worker_id, shard)
+        return moved
+
+    def reap(self):
+        """Remove crashed workers; returns {worker_id: shard it held}."""
+        # Exit code 0 is a --once worker that finished its pass
+        dead = {w: self.shards.get(w, set()) for w, (process, _) in self.workers.items() if process.exitcode not in (None, 0)}
+        for worker_id in dead:
+            print(f"Worker {worker_id} exited (code {self.workers[worker_id][0].exitcode})")
+            self.remove_worker(worker_id)
+        return dead
+
+    def handle(self, message):
+        kind, worker_id, payload = message
+        if kind == "pass":
+            self.passes[worker_id] = payload
+        elif kind == "error":
+            self.errors[payload[0]] = payload[1]
+            print(f"  {worker_id}: app {payload[0]} failed: {payload[1]}")
+
+    def throughput(self):
+        # Workers run in parallel: total rate is the sum of each one's rate
+        apps = sum(a / s for a, _, s in self.passes.values() if s > 0)
+        boxes = sum(b / s for _, b, s in self.passes.values() if s > 0)
+        return apps, boxes
+
+    def shutdown(self):
+        for worker_id in list(self.workers):
+            self.remove_worker(worker_id)
+
+
+def run_once(coordinator, workers, max_respawns=3):
+    coordinator.refresh_events()
+    for _ in range(workers):
+        coordinator.add_worker()
+    started = time.perf_counter()
+    coordinator.rebalance()
+    respawns = 0
+    unsynced = set()
+    while len(coordinator.passes) < len(coordinator.workers):
+        try:
+            coordinator.handle(coordinator.outbox.get(timeout=1))
+        except queue.Empty:
+            for worker_id, shard in coordinator.reap().items():
+                # The other workers may be done already: a rebalance would hand
+                # the shard to processes that never read their inbox again
+                if respawns == max_respawns:
+                    unsynced |= shard
+                    continue
+                respawns += 1
+                # The replacement syncs the whole shard again
+                for app_id in shard:
+                    coordinator.errors.pop(app_id, None)
+                replacement = coordinator.add_worker(on_ring=False)
+                coordinator.assign(replacement, shard)
+                print(f"  {replacement} took over {len(shard)} apps from {worker_id}")
+    elapsed = time.perf_counter() - started
+    passes = dict(coordinator.passes)
+    # A worker's "error" is queued before its "pass", so none are still in flight
+    unsynced |= set(coordinator.errors)
+    coordinator.shutdown()
+
+    total_apps = sum(p[0] for p in passes.values())
+    total_boxes = sum(p[1] for p in passes.values())
+    for worker_id, (apps, boxes, seconds) in sorted(passes.items()):
+        print(f"  {worker_id}: {apps} apps, {boxes} tickets in {seconds:.2f}s")
+    print(f"{total_apps} apps / {total_boxes} tickets with {workers} workers in {elapsed:.2f}s "
+          f"({total_apps / elapsed:.1f} apps/s, {total_boxes / elapsed:.1f} tickets/s)")
+    if unsynced:
+        print(f"Not synced: {', '.join(map(str, sorted(unsynced)))}")
+    return passes, unsynced
+
+
+def run_forever(coordinator, workers, poll, report):
+    joins, leaves = [], []
+    signal.signal(signal.SIGUSR1, lambda *_: joins.append(1))
+    signal.signal(signal.SIGUSR2, lambda *_: leaves.append(1))
+
+    coordinator.refresh_events()
+    for _ in range(workers):
+        coordinator.add_worker()
+    print(f"{len(coordinator.apps)} events over {workers} workers; moved {coordinator.rebalance()} apps")
+
+    next_poll = next_report = time.monotonic()
+    try:
+        while True:
+            changed = bool(coordinator.reap())
+            while joins:
+                joins.pop()
+                print(f"Worker {coordinator.add_worker()} joined")
+                changed = True
+            while leaves and len(coordinator.workers) > 1:
+                leaves.pop()
+                # Newest first: workers are kept in the order they joined
+                worker_id = next(reversed(coordinator.workers))
+                coordinator.remove_worker(worker_id)
+                print(f"Worker {worker_id} left")
+                changed = True
+            leaves.clear()
+
+            now = time.monotonic()
+            if now >= next_poll:
+                new = coordinator.refresh_events()
+                if new:
+                    print(f"{new} new events registered")
+                    changed = True
+                next_poll = now + poll
+            if changed:
+                print(f"Rebalanced: {coordinator.rebalance()} apps moved across {len(coordinator.workers)} workers")
+
+            if report and now >= next_report and coordinator.passes:
+                apps, boxes = coordinator.throughput()
+                print(f"[{time.strftime('%H:%M:%S')}] {len(coordinator.workers)} workers, "
+                      f"{apps:.1f} apps/s, {boxes:.1f} tickets/s")
+                next_report = now + report
+
+            try:
+                coordinator.handle(coordinator.outbox.get(timeout=1))
+            except queue.Empty:
+                pass
+    except KeyboardInterrupt:
+        pass
+    finally:
+        coordinator.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Index every registered event across N worker processes")
+    parser.add_argument("--factory-id", type=int, required=True, help="EventFactory app ID")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--out", default="index", help="Directory for per-event JSON snapshots")
+    parser.add_argument("--interval", type=float, default=30, help="Seconds between a worker's sync passes")
+    parser.add_argument("--poll", type=float, default=30, help="Seconds between registry polls")
+    parser.add_argument("--replicas", type=int, default=160, help="Virtual nodes per worker on the hash ring")
+    parser.add_argument("--report", type=float, default=60, help="Seconds between throughput lines (0 = off)")
+    parser.add_argument("--once", action="store_true", help="Sync every event once, report throughput and exit")
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    coordinator = Coordinator(get_algod_client(), args.factory_id, args.out, args.interval, args.replicas, args.once)
+    if args.once:
+        _, unsynced = run_once(coordinator, args.workers)
+        if unsynced:
+            raise SystemExit(1)
+    else:
+        print(f"Coordinator pid {os.getpid()}: SIGUSR1 adds a worker, SIGUSR2 removes one")
+        run_forever(coordinator, args.workers, args.poll, args.report)
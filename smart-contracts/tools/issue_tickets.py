@@ -0,0 +1,284 @@
+"""
+Bulk complimentary / sponsor ticket issuance with TicketManager.issue_tickets.
+
+Recipients come from a CSV (an "address" column, or the first column) and are
+cut into full atomic groups: one payment covering the new assets' and ticket
+boxes' minimum balance, then up to 15 issue_tickets calls of 8 recipients,
+120 tickets per group. Groups are signed on a process pool and sent strictly
+in order with up to --concurrency groups awaiting confirmation. algod's pool
+evaluates each group on top of the ones already sent, so the ticket indexes
+planned from Sold line up.
+
+Progress journal (next to the CSV unless --journal is given):
+    S <first_row> <end_row> <first_index> <txid> <last_valid>   group about to be sent
+    C <first_row> <end_row> <first_index>                       group confirmed
+    R <first_row>                                               group rejected by algod
+
+S is written (txid computed from the signed group) before the send, so a
+crash can never leave a landed group unjournaled. On restart confirmed rows
+are skipped, and S records with no C or R are resolved (ticket boxes
+checked, or last_valid waited out) before anything is issued again. A rejected send (e.g. a buy_ticket moved
+Sold) drains the in-flight groups, re-reads Sold and re-plans the rest.
+
+Usage:
+    DEPLOYER_MNEMONIC="..." python -m tools.issue_tickets --app-id 755123456 comps.csv
+"""
+
+import argparse
+import copy
+import csv
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from algosdk import encoding, transaction
+from algosdk.error import AlgodHTTPError
+from algosdk.logic import get_application_address
+
+from algokit_contracts.ticket_manager_codec import encode_issue_tickets
+from tools.ticketing import (
+    FUNDED_GROUP_CALLS,
+    MAX_BOX_REFS,
+    Journal,
+    fetch_ticket,
+    get_algod_client,
+    get_signer,
+    read_global_state,
+    ticket_box_key,
+    ticket_box_mbr,
+)
+
+# One new ticket box per recipient
+RECIPIENTS_PER_CALL = MAX_BOX_REFS
+TICKETS_PER_GROUP = RECIPIENTS_PER_CALL * FUNDED_GROUP_CALLS
+
+# The app account holds every minted ticket asset
+ASSET_MBR = 100_000
+TICKET_MBR = ASSET_MBR + ticket_box_mbr(2)
+
+
+def read_recipients(path):
+    with open(path, newline="") as f:
+        rows = [row for row in csv.reader(f) if row and row[0].strip()]
+    column = 0
+    if rows and not encoding.is_valid_address(rows[0][0].strip()):
+        header = [cell.strip().lower() for cell in rows.pop(0)]
+        column = header.index("address") if "address" in header else 0
+    recipients = [row[column].strip() for row in rows]
+    invalid = [(i, a) for i, a in enumerate(recipients) if not encoding.is_valid_address(a)]
+    if invalid:
+        raise ValueError(f"{len(invalid)} invalid addresses, first at data row {invalid[0][0]}: {invalid[0][1]!r}")
+    return recipients
+
+
+def replay(path):
+    """(confirmed rows, groups sent but not confirmed) from a progress journal."""
+    confirmed, sent = set(), {}
+    for parts in Journal.records(path):
+        if parts[:1] == ["S"] and len(parts) == 6:
+            start, end, first_index = map(int, parts[1:4])
+            sent[start] = (start, end, first_index, parts[4], int(parts[5]))
+        elif parts[:1] == ["C"] and len(parts) == 4:
+            start, end = int(parts[1]), int(parts[2])
+            confirmed.update(range(start, end))
+            sent.pop(start, None)
+        elif parts[:1] == ["R"] and len(parts) == 2:
+            sent.pop(int(parts[1]), None)
+    return confirmed, list(sent.values())
+
+
+def settle(client, txid, last_valid):
+    """Block until txid is confirmed (returns its round) or can no longer be."""
+    rnd = client.status()["last-round"]
+    while True:
+        try:
+            info = client.pending_transaction_info(txid)
+        except AlgodHTTPError:
+            info = {}
+        if info.get("confirmed-round"):
+            return info["confirmed-round"]
+        if info.get("pool-error"):
+            raise RuntimeError(info["pool-error"])
+        if rnd > last_valid:
+            raise RuntimeError(f"{txid} expired at round {last_valid}")
+        rnd = client.status_after_block(rnd)["last-round"]
+
+
+def landed(client, app_id, recipients, start, end, first_index):
+    # The group is atomic: its first and last tickets tell whether it applied
+    for row, index in ((start, first_index), (end - 1, first_index + end - 1 - start)):
+        ticket = fetch_ticket(client, app_id, index, 2)
+        if ticket is None or ticket.owner != recipients[row]:
+            return False
+    return True
+
+
+def resolve_sent(client, app_id, recipients, journal, sent):
+    """Settle groups a previous run sent but never saw confirmed."""
+    for start, end, first_index, txid, last_valid in sent:
+        if landed(client, app_id, recipients, start, end, first_index):
+            journal.append("C", start, end, first_index)
+            continue
+        try:
+            settle(client, txid, last_valid)
+            journal.append("C", start, end, first_index)
+        except (RuntimeError, AlgodHTTPError) as e:
+            print(f"  rows {start}-{end - 1} not issued ({e}); will retry")
+
+
+def build_group(app_id, sender, sp, first_index, addresses):
+    fund_sp = copy.copy(sp)
+    fund_sp.flat_fee = True
+    fund_sp.fee = sp.min_fee
+    txns = [transaction.PaymentTxn(sender, fund_sp, get_application_address(app_id), len(addresses) * TICKET_MBR)]
+    for offset in range(0, len(addresses), RECIPIENTS_PER_CALL):
+        chunk = addresses[offset:offset + RECIPIENTS_PER_CALL]
+        call_sp = copy.copy(sp)
+        call_sp.flat_fee = True
+        call_sp.fee = (1 + len(chunk)) * sp.min_fee  # outer call + one inner mint per recipient
+        # App args straight from the generated codec rather than the ATC's ABI walk
+        txns.append(transaction.ApplicationNoOpTxn(
+            sender,
+            call_sp,
+            app_id,
+            app_args=encode_issue_tickets(chunk),
+            boxes=[(0, ticket_box_key(first_index + offset + k)) for k in range(len(chunk))],
+        ))
+    return transaction.assign_group_id(txns)
+
+
+def sign_group(private_key, encoded):
+    # Runs in the process pool: only plain strings cross the process boundary
+    return [encoding.msgpack_encode(encoding.msgpack_decode(txn).sign(private_key)) for txn in encoded]
+
+
+def plan(rows, sold):
+    # Groups cover contiguous CSV rows so a journal line is a plain range
+    groups, chunk = [], []
+    for row in rows:
+        if chunk and (len(chunk) == TICKETS_PER_GROUP or row != chunk[-1] + 1):
+            groups.append(chunk)
+            chunk = []
+        chunk.append(row)
+    if chunk:
+        groups.append(chunk)
+
+    planned, next_index = [], sold
+    for chunk in groups:
+        planned.append((chunk, next_index))
+        next_index += len(chunk)
+    return planned
+
+
+def issue(client, app_id, sender, signer, recipients, journal, pending, concurrency=4, workers=None, retries=3):
+    issued = 0
+    stalled = 0
+    started = time.perf_counter()
+
+    with ProcessPoolExecutor(workers) as signers, ThreadPoolExecutor(concurrency) as waiters:
+        while pending:
+            state = read_global_state(client, app_id)
+            sold, supply = state.get("Sold", 0), state.get("Supply", 0)
+            if sold + len(pending) > supply:
+                raise RuntimeError(f"{len(pending)} tickets do not fit: Sold {sold}, Supply {supply}")
+
+            sp = client.suggested_params()
+            groups = plan(pending, sold)
+            # Signing runs ahead of sending; the window only bounds confirmations
+            signed = [
+                signers.submit(
+                    sign_group,
+                    signer.private_key,
+                    [encoding.msgpack_encode(t) for t in build_group(
+                        app_id, sender, sp, first_index, [recipients[r] for r in rows]
+                    )],
+                )
+                for rows, first_index in groups
+            ]
+
+            inflight = deque()
+            done = set()
+
+            def finish(entry):
+                nonlocal issued
+                rows, first_index, future = entry
+                try:
+                    future.result()
+                except (RuntimeError, AlgodHTTPError) as e:
+                    print(f"  rows {rows[0]}-{rows[-1]} failed: {e}")
+                    return
+                journal.append("C", rows[0], rows[-1] + 1, first_index)
+                done.update(rows)
+                issued += len(rows)
+                elapsed = time.perf_counter() - started
+                print(f"  {issued} tickets issued ({issued / elapsed:.1f} tickets/s)")
+
+            for (rows, first_index), future in zip(groups, signed):
+                while len(inflight) >= concurrency:
+                    finish(inflight.popleft())
+                stxns = [encoding.msgpack_decode(s) for s in future.result()]
+                # Journal the group before it can land, so a crash mid-send
+                # leaves an S line for the next run to resolve
+                txid = stxns[0].get_txid()
+                journal.append("S", rows[0], rows[-1] + 1, first_index, txid, sp.last)
+                try:
+                    client.send_transactions(stxns)
+                except AlgodHTTPError as e:
+                    if e.code == 400:
+                        # Rejected by the node: the group can never land
+                        journal.append("R", rows[0])
+                        print(f"  send rejected at rows {rows[0]}-{rows[-1]}: {e}; re-planning")
+                        break
+                    # Unknown outcome: wait it out like any other sent group
+                    print(f"  send of rows {rows[0]}-{rows[-1]} failed ({e}); waiting for round {sp.last}")
+                inflight.append((rows, first_index, waiters.submit(settle, client, txid, sp.last)))
+            while inflight:
+                finish(inflight.popleft())
+
+            for future in signed:
+                future.cancel()
+            stalled = 0 if done else stalled + 1
+            if stalled > retries:
+                raise RuntimeError(f"No group confirmed in {stalled} passes; stopping (re-run to resume)")
+            pending = [r for r in pending if r not in done]
+
+    return issued, time.perf_counter() - started
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Issue complimentary tickets to a CSV of recipients")
+    parser.add_argument("--app-id", type=int, required=True, help="TicketManager app ID")
+    parser.add_argument("recipients", help="CSV with an 'address' column (or addresses in the first column)")
+    parser.add_argument("--journal", help="Progress journal (default: <csv>.<app-id>.progress)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Groups awaiting confirmation at once")
+    parser.add_argument("--workers", type=int, help="Signing processes (default: CPU count)")
+    parser.add_argument("--dry-run", action="store_true", help="Only print the plan")
+    args = parser.parse_args()
+
+    recipients = read_recipients(args.recipients)
+    journal_path = args.journal or f"{args.recipients}.{args.app_id}.progress"
+    confirmed, sent = replay(journal_path)
+
+    client = get_algod_client()
+    journal = Journal(journal_path)
+    if sent and not args.dry_run:
+        print(f"Resolving {len(sent)} groups sent by a previous run...")
+        resolve_sent(client, args.app_id, recipients, journal, sent)
+        journal.close()
+        confirmed, _ = replay(journal_path)
+        journal = Journal(journal_path)
+
+    pending = [row for row in range(len(recipients)) if row not in confirmed]
+    groups = -(-len(pending) // TICKETS_PER_GROUP)
+    print(f"{len(recipients)} recipients, {len(confirmed)} already issued, {len(pending)} to issue "
+          f"in {groups} groups of up to {TICKETS_PER_GROUP}")
+    print(f"Organizer funds {len(pending) * TICKET_MBR / 1_000_000:.6f} ALGO of minimum balance "
+          f"({TICKET_MBR} microAlgos per ticket)")
+
+    if not args.dry_run and pending:
+        sender, signer = get_signer()
+        issued, elapsed = issue(
+            client, args.app_id, sender, signer, recipients, journal, pending, args.concurrency, args.workers
+        )
+        print(f"Issued {issued} tickets in {elapsed:.1f}s ({issued / elapsed:.1f} tickets/s)")
+    journal.close()
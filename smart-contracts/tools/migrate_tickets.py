@@ -0,0 +1,110 @@
+"""
+Rewrite v1 ticket boxes ('tickets' + Itob(index), 49 bytes) in the compact v2
+layout ('t' + 4-byte index, 41 bytes + resale price only while Listed) with
+TicketManager.migrate_tickets, one page of tickets per app call.
+
+Already-migrated indexes are skipped by the contract, so an interrupted run
+can simply be started again. Reports the minimum balance freed and how much
+smaller each ticket read becomes.
+
+Usage:
+    python -m tools.migrate_tickets --app-id 755123456 --dry-run
+    DEPLOYER_MNEMONIC="..." python -m tools.migrate_tickets --app-id 755123456
+"""
+
+import argparse
+
+from tools.ticketing import (
+    LISTED,
+    MAX_BOX_REFS,
+    RESALE_PRICE_SIZE,
+    TICKET_RECORD_SIZE,
+    TICKET_RECORD_SIZE_V1,
+    box_refs,
+    fetch_ticket,
+    get_algod_client,
+    get_signer,
+    list_ticket_versions,
+    load_contract,
+    submit_groups,
+    ticket_box_keys,
+    ticket_box_mbr,
+)
+
+# v1 and v2 key per ticket
+TICKETS_PER_CALL = MAX_BOX_REFS // 2
+
+
+def v2_size(ticket):
+    return TICKET_RECORD_SIZE + RESALE_PRICE_SIZE * (ticket.status == LISTED)
+
+
+def plan(client, app_id):
+    versions = list_ticket_versions(client, app_id)
+    legacy = []
+    for index, version in versions.items():
+        if version == 1:
+            ticket = fetch_ticket(client, app_id, index, 1)
+            if ticket is not None:
+                legacy.append(ticket)
+
+    savings = sum(ticket_box_mbr(1) - ticket_box_mbr(2, t.status == LISTED) for t in legacy)
+    return {
+        "boxes": len(versions),
+        "legacy": legacy,
+        "pages": [legacy[i:i + TICKETS_PER_CALL] for i in range(0, len(legacy), TICKETS_PER_CALL)],
+        "estimated_savings": savings,
+        "bytes_before": len(legacy) * TICKET_RECORD_SIZE_V1,
+        "bytes_after": sum(v2_size(t) for t in legacy),
+    }
+
+
+def submit(client, sender, signer, app_id, pages, max_groups=None):
+    def call_args(page):
+        return {
+            "method_args": [[ticket.index for ticket in page]],
+            "boxes": box_refs(
+                [key for ticket in page for key in ticket_box_keys(ticket.index, 1)],
+                sum(TICKET_RECORD_SIZE_V1 + v2_size(ticket) for ticket in page),
+            ),
+        }
+
+    returns, mbr_change, elapsed = submit_groups(
+        client,
+        sender,
+        signer,
+        app_id,
+        load_contract("ticket_manager").get_method_by_name("migrate_tickets"),
+        pages,
+        call_args,
+        max_groups=max_groups,
+        progress=lambda number, groups, returns: print(f"  group {number}/{groups}: {sum(returns)} tickets migrated"),
+    )
+    return sum(returns), -mbr_change, elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rewrite v1 ticket boxes in the compact v2 layout")
+    parser.add_argument("--app-id", type=int, required=True, help="TicketManager app ID")
+    parser.add_argument("--dry-run", action="store_true", help="Only print the migration plan")
+    parser.add_argument("--max-groups", type=int, help="Stop after this many transaction groups")
+    args = parser.parse_args()
+
+    client = get_algod_client()
+    p = plan(client, args.app_id)
+    legacy = len(p["legacy"])
+    print(f"App {args.app_id}: {p['boxes']} ticket boxes, {legacy} in the v1 layout "
+          f"({len(p['pages'])} pages of up to {TICKETS_PER_CALL})")
+    print(f"Per ticket: {ticket_box_mbr(1)} -> {ticket_box_mbr(2)} microAlgos of MBR "
+          f"({ticket_box_mbr(1) - ticket_box_mbr(2)} saved, {ticket_box_mbr(2, True)} while Listed), "
+          f"{TICKET_RECORD_SIZE_V1} -> {TICKET_RECORD_SIZE} bytes per read")
+    if legacy:
+        print(f"Estimated MBR freed: {p['estimated_savings'] / 1_000_000:.6f} ALGO; "
+              f"ticket bytes {p['bytes_before']} -> {p['bytes_after']} "
+              f"({1 - p['bytes_after'] / p['bytes_before']:.1%} less to read)")
+
+    if not args.dry_run and p["pages"]:
+        sender, signer = get_signer()
+        migrated, freed, elapsed = submit(client, sender, signer, args.app_id, p["pages"], args.max_groups)
+        print(f"Migrated {migrated} tickets in {elapsed:.1f}s; "
+              f"freed {freed / 1_000_000:.6f} ALGO of minimum balance")
@@ -0,0 +1,374 @@
+"""
+Per-line opcode cost profiler for TicketManager / EventFactory execution traces.
+
+Input is a trace captured from algod, either a simulate response with
+exec-trace enabled (see capture_simulate) or a dryrun response. Every executed
+pc is mapped back to its TEAL line and contract source line:
+
+  PyTeal build  pc -> TEAL line   algod compile source map (or --pc-map file)
+                TEAL -> source    <name>_approval.teal.map (tools/sourcemaps.py)
+  Puya build    pc -> source      artifacts/<name>/<Contract>.approval.puya.map
+
+Reports per-line and per-method opcode cost, box reads/writes and inner
+transactions as a table, and optionally as collapsed stacks for flamegraph.pl
+or speedscope. Op costs come from a go-algorand langspec (--langspec) or are
+1 each; the budget a simulate/dryrun trace reports is the ground truth, and
+any remainder is shown as <unattributed>.
+
+Traces are filtered to one app with --app-id; simulate traces are walked into
+inner app calls, so a TicketManager created by EventFactory.create_event is
+profiled by passing the new app's ID.
+
+Usage:
+    python -m tools.profiler trace.json --contract ticket_manager --app-id 1234
+    python -m tools.profiler dryrun.json --dryrun-request request.json --app-id 1234
+    python -m tools.profiler trace.json --contract ticket_manager --puya --collapsed out.folded
+"""
+
+import argparse
+import base64
+import json
+import os
+from collections import defaultdict
+
+from algosdk.abi import Contract
+from algosdk.v2client.models import SimulateRequest, SimulateTraceConfig
+
+from tools.ticketing import CONTRACTS_DIR, get_algod_client, load_contract
+
+ARTIFACTS_DIR = os.path.join(CONTRACTS_DIR, "artifacts")
+PUYA_NAMES = {"ticket_manager": "TicketManager", "event_factory": "EventFactory"}
+
+# Algorand Python sources of the artifacts/ builds. The maps name the file as
+# it was called at build time (ticket_manager.py, now the PyTeal contract).
+PUYA_SOURCES = {"ticket_manager": "ticket_manager_backup.py"}
+
+BOX_READS = {"box_get", "box_extract", "box_len"}
+BOX_WRITES = {"box_put", "box_replace", "box_create", "box_del", "box_splice", "box_resize"}
+# One inner transaction per itxn_begin / itxn_next
+INNER_TXNS = {"itxn_begin", "itxn_next"}
+
+BASE64 = {c: i for i, c in enumerate("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/")}
+
+
+def decode_mappings(mappings):
+    """Decode a v3 source map into one (source index, source line) per generated line."""
+    lines = []
+    source, source_line = 0, 0
+    for group in mappings.split(";"):
+        first = None
+        for segment in group.split(","):
+            if not segment:
+                continue
+            fields, value, shift = [], 0, 0
+            for char in segment:
+                digit = BASE64[char]
+                value += (digit & 31) << shift
+                if digit & 32:
+                    shift += 5
+                else:
+                    fields.append(-(value >> 1) if value & 1 else value >> 1)
+                    value, shift = 0, 0
+            if len(fields) >= 4:
+                source += fields[1]
+                source_line += fields[2]
+                if first is None:
+                    first = (source, source_line)
+        lines.append(first)
+    return lines
+
+
+class SourceMap:
+    def __init__(self, data, base_dir):
+        self.sources = [os.path.normpath(os.path.join(base_dir, data.get("sourceRoot", ""), s)) for s in data["sources"]]
+        self.lines = decode_mappings(data["mappings"])
+        self.raw = data
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls(json.load(f), os.path.dirname(os.path.abspath(path)))
+
+    def lookup(self, generated_line):
+        if 0 <= generated_line < len(self.lines) and self.lines[generated_line] is not None:
+            source, line = self.lines[generated_line]
+            return self.sources[source], line + 1
+        return None, None
+
+
+class ProgramMap:
+    """Resolves a pc to (opcode, TEAL line, source file, source line)."""
+
+    def __init__(self, ops, teal_lines, sources, contract_files):
+        self.ops = ops
+        self.teal_lines = teal_lines
+        self.sources = sources
+        # Lines outside the contract files are Router-generated dispatch code
+        self.contract_files = contract_files
+        self._text = {}
+
+    @classmethod
+    def pyteal(cls, name, client=None, pc_map_path=None):
+        teal_path = os.path.join(CONTRACTS_DIR, f"{name}_approval.teal")
+        with open(teal_path) as f:
+            teal = f.read()
+        if pc_map_path:
+            pc_map = SourceMap.load(pc_map_path)
+        else:
+            pc_map = SourceMap(client.compile(teal, source_map=True)["sourcemap"], CONTRACTS_DIR)
+        teal_map = SourceMap.load(teal_path + ".map")
+        teal_source = teal.splitlines()
+
+        ops, teal_lines, sources = {}, {}, {}
+        for pc, entry in enumerate(pc_map.lines):
+            if entry is None:
+                continue
+            teal_line = entry[1]
+            ops[pc] = teal_source[teal_line].split()[0] if teal_line < len(teal_source) else "?"
+            teal_lines[pc] = teal_line + 1
+            sources[pc] = teal_map.lookup(teal_line)
+        return cls(ops, teal_lines, sources, {os.path.join(CONTRACTS_DIR, f"{name}.py")})
+
+    @classmethod
+    def puya(cls, name, source=None):
+        contract = PUYA_NAMES[name]
+        path = os.path.join(ARTIFACTS_DIR, name, f"{contract}.approval.puya.map")
+        source_map = SourceMap.load(path)
+        if source is None:
+            if name not in PUYA_SOURCES:
+                raise ValueError(f"The Algorand Python source of the {contract} Puya build is not in the tree; pass --source")
+            source = os.path.join(CONTRACTS_DIR, PUYA_SOURCES[name])
+        source = os.path.abspath(source)
+        with open(source) as f:
+            length = len(f.read().splitlines())
+        mapped = max((line + 1 for _, line in filter(None, source_map.lines)), default=0)
+        if mapped > length:
+            raise ValueError(f"{path} maps to line {mapped} but {source} has {length} lines; wrong --source?")
+        source_map.sources = [source] * len(source_map.sources)
+        offset = source_map.raw.get("op_pc_offset", 0)
+        ops, sources = {}, {}
+        for pc, event in source_map.raw.get("pc_events", {}).items():
+            pc = int(pc) + offset
+            ops[pc] = event["op"].split()[0]
+            sources[pc] = source_map.lookup(pc - offset)
+        return cls(ops, {}, sources, {source})
+
+    def source_text(self, path, line):
+        if path not in self._text:
+            try:
+                with open(path) as f:
+                    self._text[path] = f.read().splitlines()
+            except OSError:
+                self._text[path] = []
+        lines = self._text[path]
+        return lines[line - 1].strip() if 0 < line <= len(lines) else ""
+
+    def frame(self, pc):
+        path, line = self.sources.get(pc, (None, None))
+        if path is None:
+            return "<unmapped>", None
+        if path not in self.contract_files:
+            return "<router>", None
+        return f"{os.path.basename(path)}:{line}", (path, line)
+
+
+def method_names(contract):
+    return {m.get_selector(): m.name for m in contract.methods}
+
+
+def app_args(txn):
+    # Simulate responses carry base64 strings; a dictified algosdk request carries bytes
+    return [a if isinstance(a, bytes) else base64.b64decode(a) for a in txn.get("apaa", [])]
+
+
+def selector_of(txn):
+    args = app_args(txn)
+    return args[0][:4] if args else None
+
+
+def walk_simulate(result, trace, consumed=None):
+    """(app ID, selector, pcs, budget) for an app call and every app call it made."""
+    txn = result["txn"]["txn"]
+    steps = trace.get("approval-program-trace")
+    if steps:
+        # apid is 0 on creation; the created ID sits on the result
+        app_id = txn.get("apid") or result.get("application-index")
+        yield app_id, selector_of(txn), [step["pc"] for step in steps], consumed
+    # inner-trace has one entry per inner transaction, in order
+    for inner, inner_trace in zip(result.get("inner-txns", []), trace.get("inner-trace", [])):
+        yield from walk_simulate(inner, inner_trace or {})
+
+
+def iter_traces(response, app_id=None, request=None):
+    """Yield (selector, pcs, budget_consumed) for every traced call to app_id (every app if None).
+
+    Simulate traces include inner app calls, e.g. init_event inside
+    EventFactory.create_event. A dryrun response does not carry the app args,
+    so those are read from the dryrun request's txns when it is given.
+    """
+    if "txn-groups" in response:
+        traces = (
+            trace
+            for group in response["txn-groups"]
+            for result in group.get("txn-results", [])
+            for trace in walk_simulate(result["txn-result"], result.get("exec-trace", {}), result.get("app-budget-consumed"))
+        )
+    else:
+        if app_id is not None and request is None:
+            raise ValueError("Filtering a dryrun trace by app ID needs the dryrun request")
+        txns = [t.get("txn", t) for t in request["txns"]] if request else []
+        traces = []
+        for i, txn in enumerate(response.get("txns", [])):
+            steps = txn.get("app-call-trace")
+            if steps:
+                sent = txns[i] if i < len(txns) else {}
+                traces.append((sent.get("apid"), selector_of(sent), [step["pc"] for step in steps], txn.get("budget-consumed")))
+    for traced_app, selector, pcs, consumed in traces:
+        if app_id is None or traced_app == app_id:
+            yield selector, pcs, consumed
+
+
+def load_opcode_costs(path):
+    """Opcode -> cost from a go-algorand langspec JSON (data/transactions/logic/langspec_v*.json).
+
+    Ops whose cost depends on their arguments are left out and counted as 1;
+    the simulate budget reconciles the difference.
+    """
+    with open(path) as f:
+        spec = json.load(f)
+    return {op["Name"]: op["Cost"] for op in spec["Ops"] if isinstance(op.get("Cost"), int)}
+
+
+def new_row():
+    return {"count": 0, "cost": 0, "box_reads": 0, "box_writes": 0, "inner_txns": 0}
+
+
+def profile(response, program, names, app_id=None, request=None, costs=None):
+    """Per-line and per-method cost of every traced call.
+
+    Each op costs costs.get(op, 1): every opcode the contracts compile to
+    costs 1 in AVM v10. When the trace carries the budget a call consumed,
+    anything the op costs do not account for is reported on an
+    <unattributed> line, so totals always match the node.
+    """
+    costs = costs or {}
+    by_line = defaultdict(new_row)
+    by_method = defaultdict(new_row)
+    collapsed = defaultdict(int)
+    calls = defaultdict(int)
+    budget = defaultdict(int)
+
+    for selector, pcs, consumed in iter_traces(response, app_id, request):
+        method = names.get(selector, "bare/unknown") if selector else "bare/unknown"
+        calls[method] += 1
+        total = 0
+        for pc in pcs:
+            op = program.ops.get(pc, "?")
+            label, location = program.frame(pc)
+            key = (label, location, program.teal_lines.get(pc))
+            cost = costs.get(op, 1)
+            total += cost
+            for row in (by_line[key], by_method[method]):
+                row["count"] += 1
+                row["cost"] += cost
+                row["box_reads"] += op in BOX_READS
+                row["box_writes"] += op in BOX_WRITES
+                row["inner_txns"] += op in INNER_TXNS
+            frame = label
+            if location:
+                frame += " " + program.source_text(*location).replace(";", ",")
+            collapsed[f"{method};{frame}"] += cost
+        if consumed:
+            budget[method] += consumed
+            if consumed != total:
+                by_line[("<unattributed>", None, None)]["cost"] += consumed - total
+                by_method[method]["cost"] += consumed - total
+                collapsed[f"{method};<unattributed>"] += consumed - total
+
+    return {"by_line": by_line, "by_method": by_method, "collapsed": collapsed, "calls": calls, "budget": budget}
+
+
+def format_table(headers, rows):
+    widths = [max(len(str(h)), *(len(str(r[i])) for r in rows)) if rows else len(str(h)) for i, h in enumerate(headers)]
+    out = ["  ".join(str(h).ljust(w) for h, w in zip(headers, widths))]
+    out.append("  ".join("-" * w for w in widths))
+    out.extend("  ".join(str(c).ljust(w) for c, w in zip(r, widths)) for r in rows)
+    return "\n".join(out)
+
+
+def report(result, program, top=None):
+    columns = ["count", "cost", "box_reads", "box_writes", "inner_txns"]
+
+    rows = []
+    for method, row in sorted(result["by_method"].items(), key=lambda kv: -kv[1]["cost"]):
+        calls = result["calls"][method]
+        rows.append([method, calls, *(row[c] for c in columns), result["budget"].get(method, "")])
+    print(format_table(["method", "calls", "ops", "cost", "box_r", "box_w", "itxns", "simulate_budget"], rows))
+    print()
+
+    rows = []
+    for (label, location, teal_line), row in sorted(result["by_line"].items(), key=lambda kv: -kv[1]["cost"])[:top]:
+        text = program.source_text(*location)[:60] if location else ""
+        rows.append([label, teal_line or "", *(row[c] for c in columns), text])
+    print(format_table(["source", "teal", "ops", "cost", "box_r", "box_w", "itxns", "code"], rows))
+
+
+def capture_simulate(atc, client, path):
+    """Simulate an AtomicTransactionComposer with exec-trace on and save the raw response."""
+    request = SimulateRequest(
+        txn_groups=[],
+        allow_empty_signatures=True,
+        exec_trace_config=SimulateTraceConfig(enable=True),
+    )
+    response = atc.simulate(client, request).simulate_response
+    with open(path, "w") as f:
+        json.dump(response, f, indent=4)
+    return response
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-line opcode cost profiler for contract traces")
+    parser.add_argument("trace", help="Simulate (exec-trace) or dryrun response JSON")
+    parser.add_argument("--contract", default="ticket_manager", choices=sorted(PUYA_NAMES))
+    parser.add_argument("--app-id", type=int, help="Only profile calls to this app (inner calls included)")
+    parser.add_argument("--dryrun-request", help="Dryrun request JSON the trace came from (method names for dryrun)")
+    parser.add_argument("--puya", action="store_true", help="Trace is from the Puya build in artifacts/")
+    parser.add_argument("--pc-map", help="Saved algod compile source map (skips the compile call)")
+    parser.add_argument("--source", help="Algorand Python source the Puya build came from (default: PUYA_SOURCES)")
+    parser.add_argument("--langspec", help="go-algorand langspec JSON for opcode costs (default: 1 per op)")
+    parser.add_argument("--collapsed", help="Write collapsed stacks to this file")
+    parser.add_argument("--top", type=int, default=30, help="Lines to show in the per-line table")
+    args = parser.parse_args()
+
+    with open(args.trace) as f:
+        trace = json.load(f)
+    request = None
+    if args.dryrun_request:
+        with open(args.dryrun_request) as f:
+            request = json.load(f)
+
+    costs = load_opcode_costs(args.langspec) if args.langspec else None
+    if args.puya:
+        try:
+            program = ProgramMap.puya(args.contract, args.source)
+        except ValueError as e:
+            raise SystemExit(e)
+        path = os.path.join(ARTIFACTS_DIR, args.contract, f"{PUYA_NAMES[args.contract]}.arc56.json")
+        with open(path) as f:
+            arc56 = json.load(f)
+        contract = Contract.undictify({"name": arc56["name"], "methods": arc56["methods"]})
+    else:
+        program = ProgramMap.pyteal(args.contract, None if args.pc_map else get_algod_client(), args.pc_map)
+        contract = load_contract(args.contract)
+
+    try:
+        result = profile(trace, program, method_names(contract), args.app_id, request, costs)
+    except ValueError as e:
+        raise SystemExit(e)
+    report(result, program, args.top)
+
+    if args.collapsed:
+        with open(args.collapsed, "w") as f:
+            for stack, cost in sorted(result["collapsed"].items()):
+                f.write(f"{stack} {cost}\n")
+        print(f"\nWrote collapsed stacks to {args.collapsed}")
@@ -0,0 +1,268 @@
+"""
+Mass refund for a called-off event: TicketManager.cancel_event, then
+refund_batch pages in index order until every ticket is Cancelled.
+
+refund_batch needs, for each ticket in its range, the ticket box (v2 key, plus
+the v1 key when the ticket is not migrated or the box is gone) and, for
+tickets still to refund, the ticket ASA and its owner's account. Pages are
+packed to fit one call's references, sixteen calls per group. After the
+cursor reaches Sold, a sweep re-reads every ticket and refunds any stragglers.
+Collected tickets (no box left) are still paged so the cursor can pass them:
+withdraw_funds and collect_tickets are blocked until it reaches Sold.
+
+A group the contract rejects is split down to its pages, then to single
+tickets, so one unpayable ticket (e.g. an owner account that can no longer
+receive the payment) is reported instead of stalling every run at its page.
+
+Refund box: 'refund' -> [Cursor 8][Refunded 8][RefundedAmount 8]
+
+Usage:
+    python -m tools.refund_event --app-id 755123456 --dry-run
+    DEPLOYER_MNEMONIC="..." python -m tools.refund_event --app-id 755123456 --cancel
+"""
+
+import argparse
+import time
+
+from algosdk.atomic_transaction_composer import AtomicTransactionComposer
+from algosdk.logic import get_application_address
+
+from tools.ticketing import (
+    CANCELLED,
+    CLAIMED,
+    LISTED,
+    MAX_BOX_REFS,
+    USED,
+    fetch_ticket,
+    get_algod_client,
+    get_signer,
+    is_logic_rejection,
+    list_ticket_versions,
+    load_contract,
+    read_box,
+    read_global_state,
+    send_group,
+    ticket_box_keys,
+)
+
+REFUND_BOX = b"refund"
+# Foreign accounts are capped separately from the shared reference limit
+MAX_ACCOUNT_REFS = 4
+# Backoff for node or network errors; logic rejections are isolated instead
+RETRY_DELAY = 1.0
+MAX_RETRIES = 5
+
+
+def refund_state(client, app_id):
+    value = read_box(client, app_id, REFUND_BOX)
+    if value is None:
+        return None
+    return {
+        "cursor": int.from_bytes(value[0:8], "big"),
+        "refunded": int.from_bytes(value[8:16], "big"),
+        "amount": int.from_bytes(value[16:24], "big"),
+    }
+
+
+def load_tickets(client, app_id, indexes):
+    versions = list_ticket_versions(client, app_id)
+    tickets = {}
+    for index in indexes:
+        version = versions.get(index)
+        tickets[index] = fetch_ticket(client, app_id, index, version) if version else None
+    return tickets
+
+
+def pending_refund(ticket):
+    return ticket is not None and ticket.status != CANCELLED
+
+
+class Page:
+    def __init__(self, start):
+        self.start = start
+        self.count = 0
+        self.boxes = [REFUND_BOX]
+        self.accounts = []
+        self.assets = []
+        self.refunds = 0
+        self.inner_txns = 0
+        self.tickets = []
+
+    def refs(self):
+        return len(self.boxes) + len(self.accounts) + len(self.assets)
+
+    def try_add(self, index, ticket):
+        boxes = ticket_box_keys(index, ticket.version if ticket else None)
+        accounts, assets = [], []
+        if pending_refund(ticket):
+            accounts = [ticket.owner] if ticket.owner not in self.accounts else []
+            assets = [ticket.asset_id]
+        if (
+            self.refs() + len(boxes) + len(accounts) + len(assets) > MAX_BOX_REFS
+            or len(self.accounts) + len(accounts) > MAX_ACCOUNT_REFS
+        ):
+            return False
+        self.boxes += boxes
+        self.accounts += accounts
+        self.assets += assets
+        self.count += 1
+        self.tickets.append((index, ticket))
+        if pending_refund(ticket):
+            self.refunds += 1
+            # Clawback if the owner holds the ASA, then the refund payment
+            self.inner_txns += 1 + (ticket.status in (CLAIMED, LISTED, USED))
+        return True
+
+
+def plan(tickets):
+    """Pack sorted ticket indexes into pages of contiguous indexes."""
+    pages = []
+    page = None
+    for index in sorted(tickets):
+        ticket = tickets[index]
+        if page is None or index != page.start + page.count or not page.try_add(index, ticket):
+            page = Page(index)
+            if not page.try_add(index, ticket):
+                raise ValueError(f"Ticket {index} does not fit in one call's references")
+            pages.append(page)
+    return pages
+
+
+def single_pages(page):
+    pages = []
+    for index, ticket in page.tickets:
+        pages.append(Page(index))
+        pages[-1].try_add(index, ticket)
+    return pages
+
+
+def cancel_event(client, sender, signer, app_id):
+    atc = AtomicTransactionComposer()
+    atc.add_method_call(
+        app_id,
+        load_contract("ticket_manager").get_method_by_name("cancel_event"),
+        sender,
+        client.suggested_params(),
+        signer,
+        boxes=[(0, REFUND_BOX)],
+    )
+    atc.execute(client, 4)
+
+
+def refund_call(page):
+    return {
+        "method_args": [page.start, page.count],
+        "boxes": [(0, name) for name in page.boxes],
+        "accounts": page.accounts,
+        "foreign_assets": page.assets,
+        "inner_txns": page.inner_txns,
+    }
+
+
+def try_group(client, sender, signer, app_id, method, pages):
+    """(refund cursor, None) once the group commits, or (None, error) if the contract rejects it."""
+    for retry in range(MAX_RETRIES + 1):
+        try:
+            result = send_group(client, sender, signer, app_id, method, pages, refund_call)
+            return result.abi_results[-1].return_value, None
+        except Exception as e:
+            if is_logic_rejection(e):
+                return None, e
+            if retry == MAX_RETRIES:
+                raise
+            delay = RETRY_DELAY * 2 ** retry
+            print(f"  {e}; retrying in {delay:.0f}s")
+            time.sleep(delay)
+
+
+def submit(client, sender, signer, app_id, pages):
+    """Send pages sixteen calls per group; returns the ticket indexes the contract rejected."""
+    method = load_contract("ticket_manager").get_method_by_name("refund_batch")
+    failed = []
+    for group_start in range(0, len(pages), AtomicTransactionComposer.MAX_GROUP_SIZE):
+        group = pages[group_start:group_start + AtomicTransactionComposer.MAX_GROUP_SIZE]
+        cursor, error = try_group(client, sender, signer, app_id, method, group)
+        if error is not None:
+            if len(group) > 1:
+                # One bad page fails the whole group; isolate it
+                for page in group:
+                    failed += submit(client, sender, signer, app_id, [page])
+            elif group[0].count > 1:
+                failed += submit(client, sender, signer, app_id, single_pages(group[0]))
+            else:
+                print(f"  refund_batch({group[0].start}, 1) rejected: {error}")
+                failed.append(group[0].start)
+            continue
+        print(f"  {len(group)} pages from ticket {group[0].start}, refund cursor at {cursor}")
+    return failed
+
+
+def settle(client, sender, signer, app_id, max_passes=3):
+    started = time.perf_counter()
+    failed = set()
+    for attempt in range(max_passes + 1):
+        state = refund_state(client, app_id)
+        sold = read_global_state(client, app_id).get("Sold", 0)
+        # First pass walks from the cursor; later passes sweep every ticket
+        first = state["cursor"] if attempt == 0 else 0
+        tickets = load_tickets(client, app_id, range(first, sold))
+        # Rejected tickets are reported, not retried every pass. Settled and
+        # collected tickets past the cursor are still paged, since the cursor
+        # only moves over pages that cover it and withdraw_funds waits on it
+        tickets = {
+            i: t for i, t in tickets.items()
+            if i not in failed and (pending_refund(t) or (i >= state["cursor"] and not failed))
+        }
+        if attempt > 0:
+            if not tickets:
+                return state, sorted(failed), time.perf_counter() - started
+            if attempt == max_passes:
+                raise RuntimeError(f"{len(tickets)} tickets still unrefunded after {max_passes} passes")
+        pages = plan(tickets)
+        if pages:
+            print(f"Pass {attempt + 1}: {sum(p.refunds for p in pages)} tickets to refund in {len(pages)} pages")
+            failed.update(submit(client, sender, signer, app_id, pages))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cancel an event and refund every ticket")
+    parser.add_argument("--app-id", type=int, required=True, help="TicketManager app ID")
+    parser.add_argument("--cancel", action="store_true", help="Call cancel_event first (organizer)")
+    parser.add_argument("--dry-run", action="store_true", help="Only print the refund plan")
+    args = parser.parse_args()
+
+    client = get_algod_client()
+    global_state = read_global_state(client, args.app_id)
+    price, sold = global_state.get("Price", 0), global_state.get("Sold", 0)
+    state = refund_state(client, args.app_id)
+
+    tickets = load_tickets(client, args.app_id, range(state["cursor"] if state else 0, sold))
+    outstanding = sum(pending_refund(t) for t in tickets.values())
+    print(f"App {args.app_id}: {sold} tickets sold, {outstanding} still to refund "
+          f"({'cancelled, cursor ' + str(state['cursor']) if state else 'not cancelled'})")
+
+    account = client.account_info(get_application_address(args.app_id))
+    spendable = account["amount"] - account["min-balance"]
+    # Upper bound: complimentary tickets are settled without a payment
+    if outstanding * price > spendable:
+        print(f"Warning: refunds need up to {outstanding * price / 1_000_000:.6f} ALGO, "
+              f"app can spend {spendable / 1_000_000:.6f} ALGO; fund it before refunding")
+
+    if args.dry_run:
+        print(f"{len(plan(tickets))} pages of refund_batch")
+    elif state is None and not args.cancel:
+        print("Event is not cancelled; pass --cancel to call cancel_event first")
+    else:
+        sender, signer = get_signer()
+        if state is None:
+            cancel_event(client, sender, signer, args.app_id)
+            print("Event cancelled; sales closed")
+        final, failed, elapsed = settle(client, sender, signer, args.app_id)
+        print(f"Settled in {elapsed:.1f}s: {final['refunded']} tickets refunded, "
+              f"{final['amount'] / 1_000_000:.6f} ALGO paid back")
+        if failed:
+            print(f"{len(failed)} tickets were rejected by refund_batch and need manual settlement: "
+                  f"{', '.join(map(str, failed))}")
+        if final["cursor"] < sold:
+            print(f"Refund cursor stopped at {final['cursor']} of {sold}; withdraw_funds and "
+                  f"collect_tickets stay blocked until it reaches Sold")
@@ -0,0 +1,68 @@
+"""
+Write PyTeal source maps (TEAL line -> contract source line) next to the
+compiled artifacts, as <name>_approval.teal.map / <name>_clear.teal.map.
+
+PyTeal only records source locations when the feature gate is enabled before
+pyteal is imported, so this runs as its own process (compile.py calls it).
+The sourcemap build allocates scratch slots differently, so the map is only
+written if its TEAL matches the artifact line for line apart from slot numbers.
+
+Usage:
+    python -m tools.sourcemaps ticket_manager event_factory
+"""
+
+import importlib
+import json
+import os
+import re
+import sys
+
+from feature_gates import FeatureGates
+
+FeatureGates.set_sourcemap_enabled(True)
+
+from tools.ticketing import CONTRACTS_DIR  # noqa: E402
+
+SLOT_OPS = re.compile(r"^(load|store) \d+$")
+
+
+def _structure(teal):
+    return [SLOT_OPS.sub(r"\1 #", line.strip()) for line in teal.splitlines()]
+
+
+def _relative_map(r3, map_path):
+    data = r3.to_json()
+    root = data.pop("sourceRoot", "") or ""
+    map_dir = os.path.dirname(map_path)
+    data["sources"] = [os.path.relpath(os.path.join(root, source), map_dir) for source in data["sources"]]
+    data["file"] = os.path.basename(map_path)[: -len(".map")]
+    return data
+
+
+def write_sourcemaps(name):
+    module = importlib.import_module(f"algokit_contracts.{name}")
+    approval_path = os.path.join(CONTRACTS_DIR, f"{name}_approval.teal")
+    with open(approval_path) as f:
+        version = int(f.readline().split()[-1])  # "#pragma version N"
+
+    results = module.router.compile(version=version, with_sourcemaps=True)
+    written = []
+    for kind, teal, sourcemap in (
+        ("approval", results.approval_teal, results.approval_sourcemap),
+        ("clear", results.clear_teal, results.clear_sourcemap),
+    ):
+        teal_path = os.path.join(CONTRACTS_DIR, f"{name}_{kind}.teal")
+        with open(teal_path) as f:
+            if _structure(f.read()) != _structure(teal):
+                raise RuntimeError(f"{teal_path} is out of date; run compile.py first")
+        map_path = teal_path + ".map"
+        with open(map_path, "w") as f:
+            json.dump(_relative_map(sourcemap.r3_sourcemap, map_path), f, indent=4)
+        written.append(map_path)
+    return written
+
+
+if __name__ == "__main__":
+    for contract_name in sys.argv[1:]:
+        for path in write_sourcemaps(contract_name):
+            print(f"Wrote {os.path.relpath(path)}")
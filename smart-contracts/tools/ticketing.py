@@ -0,0 +1,344 @@
+"""
+Shared helpers for the off-chain tooling around TicketManager / EventFactory.
+
+Box layouts mirror the contracts in algokit_contracts/:
+  TicketManager box  't' + 4-byte index (v2)
+                     -> [AssetID 8][Owner 32][Status 1] (+ [ResalePrice 8] while Listed)
+                     'tickets' + Itob(index) (v1, until migrate_tickets)
+                     -> [AssetID 8][Owner 32][Status 1][ResalePrice 8]
+                     'asset' + Itob(asset_id) -> Itob(index)
+  EventFactory box   Itob(index) -> [AppID 8][Name]
+
+Bulk tools share a fsynced progress Journal and submit_groups, which packs
+one method call per page into atomic groups (optionally behind an MBR
+payment) and measures the app's minimum balance before and after.
+"""
+
+import base64
+import copy
+import os
+import time
+from collections import namedtuple
+
+from algosdk import encoding, mnemonic, transaction
+from algosdk.abi import Contract
+from algosdk.atomic_transaction_composer import (
+    AccountTransactionSigner,
+    AtomicTransactionComposer,
+    TransactionWithSigner,
+)
+from algosdk.error import AlgodHTTPError
+from algosdk.logic import get_application_address
+from algosdk.v2client import algod
+
+CONTRACTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "algokit_contracts")
+
+# Same public node the frontend uses (frontend/utils/algorand.ts)
+DEFAULT_ALGOD_SERVER = "https://testnet-api.algonode.cloud"
+
+# Ticket status byte (offset 40 of the ticket box)
+PENDING = 0
+CLAIMED = 1
+USED = 2
+LISTED = 3
+CANCELLED = 4
+
+STATUS_NAMES = {
+    PENDING: "pending",
+    CLAIMED: "claimed",
+    USED: "used",
+    LISTED: "listed",
+    CANCELLED: "cancelled",
+}
+
+# Compact (v2) ticket boxes; v1 boxes are read until migrated
+TICKETS_PREFIX = b"t"
+TICKET_INDEX_SIZE = 4
+TICKET_RECORD_SIZE = 41
+RESALE_PRICE_SIZE = 8
+
+TICKETS_PREFIX_V1 = b"tickets"
+TICKET_RECORD_SIZE_V1 = 49
+
+# Reverse map written by claim_ticket: 'asset' + Itob(asset_id) -> Itob(index)
+ASSET_PREFIX = b"asset"
+
+# Box I/O quota is 1KB per box reference; an app call carries at most 8
+BOX_IO_BUDGET = 1024
+MAX_BOX_REFS = 8
+
+# A group that opens with an MBR payment has one slot fewer for app calls
+FUNDED_GROUP_CALLS = AtomicTransactionComposer.MAX_GROUP_SIZE - 1
+
+# algod's wording when the program itself failed (assert, err, reject, panic).
+# Anything else (5xx, connection errors, confirmation timeouts) is transient.
+LOGIC_REJECTIONS = ("logic eval error", "rejected by logic")
+
+Ticket = namedtuple("Ticket", ["index", "asset_id", "owner", "status", "resale_price", "version"], defaults=(2,))
+
+
+def get_algod_client():
+    server = os.environ.get("ALGOD_SERVER", DEFAULT_ALGOD_SERVER)
+    token = os.environ.get("ALGOD_TOKEN", "")
+    return algod.AlgodClient(token, server)
+
+
+def get_signer():
+    # Same variable the frontend deploy scripts read
+    phrase = os.environ.get("DEPLOYER_MNEMONIC")
+    if not phrase:
+        raise RuntimeError("Please set DEPLOYER_MNEMONIC")
+    private_key = mnemonic.to_private_key(phrase)
+    return encoding.encode_address(base64.b64decode(private_key)[32:]), AccountTransactionSigner(private_key)
+
+
+def load_contract(name):
+    with open(os.path.join(CONTRACTS_DIR, f"{name}_contract.json")) as f:
+        return Contract.from_json(f.read())
+
+
+def box_mbr(name_len, size):
+    return 2500 + 400 * (name_len + size)
+
+
+def box_refs(named, total_bytes):
+    # Pad with empty references until the quota covers total_bytes
+    needed = max(len(named), -(-total_bytes // BOX_IO_BUDGET))
+    if needed > MAX_BOX_REFS:
+        raise ValueError(f"{total_bytes} box bytes need {needed} box references (max {MAX_BOX_REFS})")
+    return [(0, name) for name in named] + [(0, b"")] * (needed - len(named))
+
+
+def ticket_box_key(index):
+    return TICKETS_PREFIX + index.to_bytes(TICKET_INDEX_SIZE, "big")
+
+
+def ticket_box_key_v1(index):
+    return TICKETS_PREFIX_V1 + index.to_bytes(8, "big")
+
+
+def ticket_box_keys(index, version=None):
+    # The contract probes the v2 key first and falls back to v1, so anything
+    # not known to be migrated needs both references
+    if version == 2:
+        return [ticket_box_key(index)]
+    return [ticket_box_key(index), ticket_box_key_v1(index)]
+
+
+def pack_tickets(tickets, per_ticket_boxes=1, fixed_boxes=0, fixed_bytes=0):
+    """Split tickets into consecutive pages whose calls fit the box reference
+    and I/O quota. Each ticket takes its ticket box keys (one when known to be
+    v2) plus per_ticket_boxes 8-byte boxes; every call also takes fixed_boxes
+    references holding fixed_bytes.
+    """
+    def fits(page):
+        named = fixed_boxes + sum(len(ticket_box_keys(t.index, t.version)) + per_ticket_boxes for t in page)
+        size = fixed_bytes + sum(ticket_read_size(t.version) + 8 * per_ticket_boxes for t in page)
+        return max(named, -(-size // BOX_IO_BUDGET)) <= MAX_BOX_REFS
+
+    pages = []
+    for ticket in tickets:
+        if pages and fits(pages[-1] + [ticket]):
+            pages[-1].append(ticket)
+        elif fits([ticket]):
+            pages.append([ticket])
+        else:
+            raise ValueError(f"Ticket {ticket.index} does not fit in one call's box references "
+                             f"next to {fixed_bytes} bytes of other boxes")
+    return pages
+
+
+def ticket_box_mbr(version=2, listed=False):
+    if version == 1:
+        return box_mbr(len(TICKETS_PREFIX_V1) + 8, TICKET_RECORD_SIZE_V1)
+    return box_mbr(len(TICKETS_PREFIX) + TICKET_INDEX_SIZE, TICKET_RECORD_SIZE + RESALE_PRICE_SIZE * listed)
+
+
+def ticket_read_size(version=None):
+    # Largest ticket box: a Listed v2 box, or any v1 box
+    if version == 2:
+        return TICKET_RECORD_SIZE + RESALE_PRICE_SIZE
+    return TICKET_RECORD_SIZE_V1
+
+
+def parse_ticket_box_name(name):
+    # (index, version) for a ticket box name, None for any other box
+    if name.startswith(TICKETS_PREFIX_V1) and len(name) == len(TICKETS_PREFIX_V1) + 8:
+        return int.from_bytes(name[len(TICKETS_PREFIX_V1):], "big"), 1
+    if name.startswith(TICKETS_PREFIX) and len(name) == len(TICKETS_PREFIX) + TICKET_INDEX_SIZE:
+        return int.from_bytes(name[len(TICKETS_PREFIX):], "big"), 2
+    return None
+
+
+def asset_box_key(asset_id):
+    return ASSET_PREFIX + asset_id.to_bytes(8, "big")
+
+
+def decode_ticket(index, value, version=2):
+    return Ticket(
+        index=index,
+        asset_id=int.from_bytes(value[0:8], "big"),
+        owner=encoding.encode_address(value[8:40]),
+        status=value[40],
+        # Absent from v2 boxes that are not Listed
+        resale_price=int.from_bytes(value[41:49], "big"),
+        version=version,
+    )
+
+
+def is_logic_rejection(error):
+    return isinstance(error, AlgodHTTPError) and any(m in str(error) for m in LOGIC_REJECTIONS)
+
+
+def read_global_state(client, app_id):
+    state = {}
+    for entry in client.application_info(app_id)["params"].get("global-state", []):
+        key = base64.b64decode(entry["key"]).decode("utf-8", errors="replace")
+        value = entry["value"]
+        state[key] = base64.b64decode(value["bytes"]) if value["type"] == 1 else value["uint"]
+    return state
+
+
+def read_box(client, app_id, name):
+    try:
+        return base64.b64decode(client.application_box_by_name(app_id, name)["value"])
+    except AlgodHTTPError as e:
+        if e.code == 404:
+            return None
+        raise
+
+
+def list_ticket_versions(client, app_id):
+    versions = {}
+    for box in client.application_boxes(app_id)["boxes"]:
+        parsed = parse_ticket_box_name(base64.b64decode(box["name"]))
+        if parsed is not None:
+            versions[parsed[0]] = parsed[1]
+    return dict(sorted(versions.items()))
+
+
+def list_ticket_indexes(client, app_id):
+    return list(list_ticket_versions(client, app_id))
+
+
+def fetch_ticket(client, app_id, index, version=None):
+    # Unknown version: try v2 first, as the contract does
+    for v, key in ((2, ticket_box_key(index)), (1, ticket_box_key_v1(index))):
+        if version in (None, v):
+            value = read_box(client, app_id, key)
+            if value is not None:
+                return decode_ticket(index, value, v)
+    return None
+
+
+def fetch_index_by_asset(client, app_id, asset_id):
+    value = read_box(client, app_id, asset_box_key(asset_id))
+    return int.from_bytes(value, "big") if value is not None else None
+
+
+def decode_event_name(raw):
+    # Stored raw; like the frontend's decodeEventName, also accept an ABI length prefix
+    if len(raw) >= 2 and int.from_bytes(raw[:2], "big") == len(raw) - 2:
+        raw = raw[2:]
+    return raw.decode("utf-8", errors="replace")
+
+
+def list_registered_events(client, factory_id, start=0):
+    """(registry index, app ID, name) for every event registered from start on."""
+    events = []
+    count = read_global_state(client, factory_id).get("EventCount", 0)
+    for index in range(start, count):
+        value = read_box(client, factory_id, index.to_bytes(8, "big"))
+        if value is not None:
+            events.append((index, int.from_bytes(value[:8], "big"), decode_event_name(value[8:])))
+    return events
+
+
+def fetch_tickets(client, app_id, start=0, stop=None):
+    if stop is None:
+        stop = read_global_state(client, app_id).get("Sold", 0)
+    tickets = []
+    for index in range(start, stop):
+        ticket = fetch_ticket(client, app_id, index)
+        if ticket is not None:
+            tickets.append(ticket)
+    return tickets
+
+
+class Journal:
+    """Append-only progress log: one line of space-separated fields per record."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "a")
+
+    @staticmethod
+    def records(path):
+        """Split lines of the journal at path; none if it does not exist yet."""
+        if not os.path.exists(path):
+            return []
+        with open(path) as f:
+            # A torn last line from a crash has no newline and is ignored
+            return [line.split() for line in f if line.endswith("\n")]
+
+    def write(self, data):
+        # Durable before returning: callers act on the record right after
+        self._file.write(data)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def append(self, *fields):
+        self.write(" ".join(map(str, fields)) + "\n")
+
+    def close(self):
+        self._file.close()
+
+
+def app_min_balance(client, app_id):
+    return client.account_info(get_application_address(app_id))["min-balance"]
+
+
+def send_group(client, sender, signer, app_id, method, pages, call_args, fund=None):
+    """Execute one atomic group: a payment of fund microAlgos to the app (if
+    given), then one method call per page.
+
+    call_args(page) returns add_method_call keywords (method_args, boxes, ...),
+    plus optionally inner_txns, which pays the call's inner transactions fees.
+    """
+    sp = client.suggested_params()
+    atc = AtomicTransactionComposer()
+    if fund is not None:
+        payment = transaction.PaymentTxn(sender, sp, get_application_address(app_id), fund)
+        atc.add_transaction(TransactionWithSigner(payment, signer))
+    for page in pages:
+        kwargs = call_args(page)
+        call_sp = sp
+        inner_txns = kwargs.pop("inner_txns", 0)
+        if inner_txns:
+            call_sp = copy.copy(sp)
+            call_sp.flat_fee = True
+            call_sp.fee = (1 + inner_txns) * sp.min_fee
+        atc.add_method_call(app_id, method, sender, call_sp, signer, **kwargs)
+    return atc.execute(client, 4)
+
+
+def submit_groups(client, sender, signer, app_id, method, pages, call_args, fund=None, max_groups=None, progress=None):
+    """Send one call per page, sixteen per group, or fifteen behind a payment of
+    fund(group pages) microAlgos. progress(number, groups, returns) runs after
+    each group confirms.
+
+    Returns (ABI return values, change in the app's minimum balance, seconds).
+    """
+    per_group = FUNDED_GROUP_CALLS if fund else AtomicTransactionComposer.MAX_GROUP_SIZE
+    groups = [pages[i:i + per_group] for i in range(0, len(pages), per_group)][:max_groups]
+    mbr_before = app_min_balance(client, app_id)
+    returns = []
+    started = time.perf_counter()
+    for number, group in enumerate(groups, 1):
+        result = send_group(
+            client, sender, signer, app_id, method, group, call_args, fund(group) if fund else None
+        )
+        returns += [r.return_value for r in result.abi_results]
+        if progress:
+            progress(number, len(groups), returns)
+    return returns, app_min_balance(client, app_id) - mbr_before, time.perf_counter() - started